@@ -0,0 +1,67 @@
+"""Benchmark of formatting giant notes with `NoteFormatter`.
+
+Content of a note is shown in `display.max_lines` lines, so formatting a note
+should take time proportional to the number of lines shown rather than size
+of the note. `TextWrapper` used previously wraps the whole content before
+truncating it.
+
+Usage:
+    $ python benchmarks/bench_formatting.py [--n-notes 20] [--size 1000000]
+"""
+import argparse
+import os.path as osp
+import random
+import sys
+import textwrap as tw
+import time
+
+sys.path.insert(0, osp.join(osp.dirname(__file__), '..'))
+
+from qnote.config import AppConfig
+from qnote.objects import Note, Tags
+from qnote.utils.text import NoteFormatter
+
+
+def generate_content(size, seed):
+    rng = random.Random(seed)
+    words = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur-adipiscing']
+    lines, length = [], 0
+    while length < size:
+        line = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 30)))
+        lines.append(line)
+        length += len(line) + 1
+    return '\n'.join(lines)[:size]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n-notes', type=int, default=20)
+    parser.add_argument('--size', type=int, default=1000000, help='Size of content (in characters)')
+    args = parser.parse_args()
+
+    print('Generating %s notes of %s characters...' % (args.n_notes, args.size))
+    notes = [
+        Note.create('note %s' % i, generate_content(args.size, i), Tags(['#foo']))
+        for i in range(args.n_notes)
+    ]
+
+    config = AppConfig()
+    formatter = NoteFormatter(config, tw_config={})
+    t_start = time.perf_counter()
+    outputs = [formatter(note) for note in notes]
+    t_new = time.perf_counter() - t_start
+
+    # Previous implementation: the whole content is wrapped
+    formatter.text_wrapper = tw.TextWrapper(**formatter.tw_config)
+    t_start = time.perf_counter()
+    expected = [formatter(note) for note in notes]
+    t_old = time.perf_counter() - t_start
+
+    assert outputs == expected
+    print('Wrapping whole content:   %.3f s' % t_old)
+    print('Wrapping shown lines:     %.3f s' % t_new)
+    print('Speedup: %.1fx' % (t_old / t_new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark of fuzzy search (`qnote.utils.FuzzySearch`) on synthetic notes.
+
+Pattern is typed character by character as it is in interactive mode, and
+the best results are kept in a bounded heap (`n_results`) rather than sorting
+all matched notes.
+
+Usage:
+    $ python benchmarks/bench_fuzzy_search.py [--n-notes 100000] [--n-results 200]
+"""
+import argparse
+import os.path as osp
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, osp.join(osp.dirname(__file__), '..'))
+
+from qnote.objects import NoteHeader, Tags
+from qnote.utils import FuzzySearch
+
+
+PATTERNS = ['meeting', 'mtng', 'todo']
+
+
+def generate_headers(n_notes, seed=0):
+    rng = random.Random(seed)
+    words = [
+        ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+        for _ in range(20000)
+    ]
+    words.extend(['meeting', 'notes', 'todo', 'project'])
+    headers = []
+    for i in range(n_notes):
+        title = ' '.join(rng.choices(words, k=4))
+        preview = ' '.join(rng.choices(words, k=170))[:NoteHeader.preview_length]
+        tags = Tags(['#tag_%s' % (i % 100)])
+        headers.append(NoteHeader('%032x' % i, 0, 0, title, preview, tags))
+    return headers
+
+
+def type_pattern(headers, pattern, n_results):
+    searcher = FuzzySearch(headers, n_results=n_results)
+    searcher._build_index()     # built once per session, measured separately
+    elapsed = []
+    for i in range(1, len(pattern) + 1):
+        t_start = time.perf_counter()
+        result = searcher.search(pattern[:i])
+        elapsed.append(time.perf_counter() - t_start)
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n-notes', type=int, default=100000)
+    parser.add_argument('--n-results', type=int, default=200)
+    args = parser.parse_args()
+
+    print('Generating %s notes...' % args.n_notes)
+    headers = generate_headers(args.n_notes)
+
+    t_start = time.perf_counter()
+    FuzzySearch(headers)._build_index()
+    print('Building index: %.1f ms' % ((time.perf_counter() - t_start) * 1000))
+
+    for pattern in PATTERNS:
+        result_heap, t_heap = type_pattern(headers, pattern, args.n_results)
+        result_sort, t_sort = type_pattern(headers, pattern, None)
+        assert result_heap == result_sort[:args.n_results]
+
+        print('Pattern %r, %s matched notes' % (pattern, len(result_sort)))
+        print('  top %s by heap (ms per keystroke): %s, total: %.1f' % (
+            args.n_results, ', '.join(['%.1f' % (v * 1000) for v in t_heap]),
+            sum(t_heap) * 1000,
+        ))
+        print('  sorting all    (ms per keystroke): %s, total: %.1f' % (
+            ', '.join(['%.1f' % (v * 1000) for v in t_sort]), sum(t_sort) * 1000,
+        ))
+
+
+if __name__ == '__main__':
+    main()
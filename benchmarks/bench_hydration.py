@@ -0,0 +1,63 @@
+"""Benchmark of creating notes from rows loaded from storage.
+
+`Note.from_dict()` takes rows converted by fields of models (UUID objects
+and datetimes), while `Note.from_row()` takes raw rows returned by SQLite.
+
+Usage:
+    $ python benchmarks/bench_hydration.py [--n-rows 1000000]
+"""
+import argparse
+from datetime import datetime as cls_dt
+import os.path as osp
+import sys
+import time
+from uuid import uuid4
+
+sys.path.insert(0, osp.join(osp.dirname(__file__), '..'))
+
+from qnote.objects import Note
+
+
+def make_rows(n_rows):
+    timestamp = int(cls_dt.now().timestamp())
+    raw_rows, dict_rows = [], []
+    for i in range(n_rows):
+        uuid = uuid4()
+        title, content, tags = 'note %s' % i, 'content of note %s' % i, '#foo,#bar'
+        raw_rows.append((uuid.hex, timestamp, timestamp, title, content, tags))
+        dict_rows.append({
+            'id': i, 'uuid': uuid, 'title': title, 'content': content,
+            'create_time': cls_dt.fromtimestamp(timestamp),
+            'update_time': cls_dt.fromtimestamp(timestamp),
+            'tags': tags,
+        })
+    return raw_rows, dict_rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n-rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    print('Generating %s rows...' % args.n_rows)
+    raw_rows, dict_rows = make_rows(args.n_rows)
+
+    t_start = time.perf_counter()
+    notes = [Note.from_dict(v) for v in dict_rows]
+    t_dict = time.perf_counter() - t_start
+    del notes
+
+    t_start = time.perf_counter()
+    notes = [Note.from_row(*v) for v in raw_rows]
+    t_row = time.perf_counter() - t_start
+    del notes
+
+    print('%-16s %10s %14s' % ('method', 'total (s)', 'per row (us)'))
+    for name, elapsed in [('from_dict', t_dict), ('from_row', t_row)]:
+        print('%-16s %10.2f %14.2f' % (
+            name, elapsed, elapsed / args.n_rows * 1e6
+        ))
+
+
+if __name__ == '__main__':
+    main()
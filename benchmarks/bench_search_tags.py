@@ -0,0 +1,91 @@
+"""Benchmark of searching notes by tags (`SQLiteStorer.get_notes_by_tags`).
+
+All notes are tagged with `#popular`, and a few of them are tagged with rare
+tags of different sizes. Searching `#popular` along with a rare tag should
+take time proportional to the number of found notes, rather than number of
+notes tagged with `#popular`.
+
+Usage:
+    $ python benchmarks/bench_search_tags.py [--n-notes 100000]
+"""
+import argparse
+import os.path as osp
+import sys
+import tempfile
+import time
+
+import peewee as pw
+
+sys.path.insert(0, osp.join(osp.dirname(__file__), '..'))
+
+from qnote.config import AppConfig
+from qnote.objects import Note, Tags
+from qnote.storage import get_storer, close_storer
+from qnote.storage.sqlite.models import Note as PwNote, Tag, NoteToTag
+
+
+RARE_SIZES = [10, 100, 1000, 10000]
+
+
+def generate_notes(n_notes):
+    for i in range(n_notes):
+        tags = ['#popular']
+        tags.extend(['#rare_%s' % v for v in RARE_SIZES if i < v])
+        yield Note.create('note %s' % i, 'content of note %s' % i, Tags(tags))
+
+
+def get_notes_by_tags_in_python(tags):
+    """Previous implementation: notes with any of the given tags are fetched,
+    then filtered in Python."""
+    str_tags = [str(v) for v in tags]
+    query = (
+        Tag
+        .select(
+            PwNote,
+            pw.fn.group_concat(Tag.name).alias('tags'),
+            pw.fn.count(Tag.name).alias('tag_count')
+        )
+        .where(Tag.name.in_(str_tags))
+        .join(NoteToTag)
+        .join(PwNote)
+        .group_by(PwNote.uuid)
+    )
+    result = [v for v in query.dicts() if v['tag_count'] >= len(tags)]
+    return [Note.from_dict(v) for v in result]
+
+
+def measure(func, *args, repeat=3):
+    elapsed = []
+    for _ in range(repeat):
+        t_start = time.perf_counter()
+        result = func(*args)
+        elapsed.append(time.perf_counter() - t_start)
+    return min(elapsed), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n-notes', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dir_root:
+        config = AppConfig(storage={'dir_root': dir_root})
+        storer = get_storer(config)
+
+        print('Creating %s notes...' % args.n_notes)
+        storer.create_notes(generate_notes(args.n_notes), '[DEFAULT]')
+
+        print('%-24s %8s %12s %12s' % ('tags', 'found', 'SQL (ms)', 'Python (ms)'))
+        for size in [v for v in RARE_SIZES if v <= args.n_notes]:
+            tags = Tags(['#popular', '#rare_%s' % size])
+            t_sql, found = measure(storer.get_notes_by_tags, tags)
+            t_py, _ = measure(get_notes_by_tags_in_python, tags)
+            print('%-24s %8s %12.2f %12.2f' % (
+                str(tags), len(found), t_sql * 1000, t_py * 1000
+            ))
+
+        close_storer(config)
+
+
+if __name__ == '__main__':
+    main()
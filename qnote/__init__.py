@@ -1,14 +1,30 @@
-from . import commands
-from . import config
-from . import editor
-from . import manager
-from .manager import *
-from . import objects
-from .objects import *
-from . import utils
-from . import storage
-
-__all__ = []
-__all__.extend(['commands', 'config', 'editor', 'utils', 'storage'])
-__all__.extend(objects.__all__)
-__all__.extend(manager.__all__)
+import importlib
+
+
+# Submodules are imported lazily when they are accessed as attributes (PEP
+# 562), so that running a command doesn't need to import modules (and their
+# dependencies) of all the other commands.
+_submodules = ['commands', 'config', 'editor', 'manager', 'objects', 'utils', 'storage']
+
+# Submodules whose public names are also exported by this package
+_exporting_submodules = ['objects', 'manager']
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module('.%s' % name, __name__)
+    if name == '__all__':
+        names = ['commands', 'config', 'editor', 'utils', 'storage']
+        for v in _exporting_submodules:
+            names.extend(__getattr__(v).__all__)
+        return names
+    if not name.startswith('__'):
+        for v in _exporting_submodules:
+            module = __getattr__(v)
+            if name in module.__all__:
+                return getattr(module, name)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__getattr__('__all__')))
@@ -1,9 +1,17 @@
 from __future__ import absolute_import
 
-from qnote.app import Application
+import sys
 
 
 def main():
+    # Try to run command in daemon first, so that modules for running
+    # commands are imported only when it's necessary.
+    from qnote.daemon import run_in_daemon
+    exit_code = run_in_daemon(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from qnote.app import Application
     app = Application()
     app.run()
 
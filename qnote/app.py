@@ -1,32 +1,54 @@
 from __future__ import absolute_import
+import importlib
 import re, sys
 
 from qnote.cli.parser import CustomArgumentParser, PassableHelpAction, ARG_SUPPRESS
+from qnote.commands.base_command import Command
 from qnote.config import AppConfig
-from qnote.internal.exceptions import StorageCheckException
-from qnote.storage import get_storer
-import qnote.commands as cmds
 
 
-__all__ = ['Application']
+__all__ = ['Application', 'run_command']
 
 
+# Subcommands and the classes implementing them. Module of a subcommand is
+# imported only when it's invoked (or usage of all subcommands is required),
+# so that startup time won't grow as more subcommands are added.
 subcommands = {
-    'add': cmds.AddCommand('add'),
-    'clear': cmds.ClearCommand('clear'),
-    'edit': cmds.EditCommand('edit'),
-    'list': cmds.ListCommand('list'),
-    'move': cmds.MoveCommand('move'),
-    'notebook': cmds.NotebookCommand('notebook'),
-    'open': cmds.OpenCommand('open'),
-    'remove': cmds.RemoveCommand('remove'),
-    'status': cmds.StatusCommand('status'),
-    'search': cmds.SearchCommand('search'),
-    'select': cmds.SelectCommand('select'),
-    'tag': cmds.TagCommand('tag'),
+    'add': 'qnote.commands.add.AddCommand',
+    'batch': 'qnote.commands.batch.BatchCommand',
+    'clear': 'qnote.commands.clear.ClearCommand',
+    'daemon': 'qnote.commands.daemon.DaemonCommand',
+    'edit': 'qnote.commands.edit.EditCommand',
+    'list': 'qnote.commands.list.ListCommand',
+    'move': 'qnote.commands.move.MoveCommand',
+    'notebook': 'qnote.commands.notebook.NotebookCommand',
+    'open': 'qnote.commands.open.OpenCommand',
+    'remove': 'qnote.commands.remove.RemoveCommand',
+    'status': 'qnote.commands.status.StatusCommand',
+    'search': 'qnote.commands.search.SearchCommand',
+    'select': 'qnote.commands.select.SelectCommand',
+    'storage': 'qnote.commands.storage.StorageCommand',
+    'tag': 'qnote.commands.tag.TagCommand',
 }
 
 
+def get_subcommand(name):
+    """Import and create a subcommand.
+
+    Parameters
+    ----------
+    name : str
+        Name of subcommand, it should be one of the keys in `subcommands`.
+
+    Returns
+    -------
+    command : an instance of a subclass of `qnote.commands.Command`
+    """
+    module_name, cls_name = subcommands[name].rsplit('.', 1)
+    module = importlib.import_module(module_name)
+    return getattr(module, cls_name)(name)
+
+
 def _process_usage(usage, delimiter='\n', skip_row=1, left_padding=0):
     splitted = usage.split(delimiter)
     padding_spaces = ' '*left_padding if left_padding >= 0 else ''
@@ -41,7 +63,7 @@ def prepare_usage():
     sub_usages = [
         '<prog> %s' % (
             _process_usage(sc.usage.lstrip(), left_padding=n_padding)
-        ) for sc in subcommands.values()
+        ) for sc in map(get_subcommand, subcommands)
     ]
     msg_subs = '\n'.join(sub_usages)
     msg += msg_subs
@@ -50,7 +72,22 @@ def prepare_usage():
     return msg
 
 
-class CommandEntry(cmds.Command):
+class EntryArgumentParser(CustomArgumentParser):
+    """Parser of entry command. Usage of all subcommands is prepared only
+    when it's going to be shown, since all of them have to be imported."""
+
+    @property
+    def usage(self):
+        if self._usage is None:
+            self._usage = prepare_usage()
+        return self._usage
+
+    @usage.setter
+    def usage(self, value):
+        self._usage = value
+
+
+class CommandEntry(Command):
     """qnote - Take notes quickly
 
     A command line note-taking tool.
@@ -61,13 +98,13 @@ class CommandEntry(cmds.Command):
 
     def run(self, parsed_args, config):
         known_args, unknown_args = parsed_args
-        runner = subcommands[known_args.pop('cmd')]
+        runner = get_subcommand(known_args.pop('cmd'))
         runner.parent = self
         runner.main(unknown_args, config)
 
     def prepare_parser(self):
-        parser = CustomArgumentParser(
-            prog='qnote', usage=prepare_usage(), add_help=False,
+        parser = EntryArgumentParser(
+            prog='qnote', add_help=False,
             description=self.__doc__,
         )
         parser.add_argument(
@@ -82,6 +119,38 @@ class CommandEntry(cmds.Command):
         return parser
 
 
+def run_command(argv, config):
+    """Run a command in current process without exiting it.
+
+    Parameters
+    ----------
+    argv : list of str
+        Arguments of command, e.g. `['search', 'tags', '#foo']`.
+    config : qnote.config.AppConfig
+
+    Returns
+    -------
+    exit_code : int
+        Exit code the command would exit with. Traceback of unhandled
+        exception is printed to stderr, and 1 is returned for it.
+    """
+    import traceback
+
+    try:
+        CommandEntry('qnote').main(argv, config)
+    except SystemExit as ex:
+        if ex.code is None:
+            return 0
+        if isinstance(ex.code, int):
+            return ex.code
+        print(ex.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
 class Application(object):
     def __init__(self):
         self.initialize()
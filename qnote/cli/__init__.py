@@ -1,5 +1,12 @@
-from . import parser
-from . import operator
+import importlib
 
-__all__ = []
-__all__.extend(['parser', 'operator'])
+
+__all__ = ['parser', 'operator']
+
+
+def __getattr__(name):
+    # `operator` is imported lazily since it depends on lots of modules, but
+    # commands only need `parser` to parse arguments.
+    if name in __all__:
+        return importlib.import_module('.%s' % name, __name__)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
@@ -9,7 +9,8 @@ from qnote.internal.exceptions import (
     UserCancelledException, SafeExitException,
 )
 from qnote.utils import (
-    query_yes_no, NoteFormatter, show_notes as utils_show_notes
+    query_yes_no, NoteFormatter, FuzzySearch, IncrementalSearch, fold_case,
+    open_render_cache, show_notes as utils_show_notes
 )
 
 
@@ -20,6 +21,9 @@ note_template = """# Note content (this line can be removed)
 
 """
 
+# Maximal number of notes listed in interactive mode with fuzzy search
+N_FUZZY_RESULTS = 200
+
 
 class NoteOperator(object):
     def __init__(self, config):
@@ -170,26 +174,48 @@ class NotebookOperator(object):
         )
 
     def select_notes(self, notes, multiple=False, show_date=False, show_uuid=False,
-        clear_after_exit=False):
-        """Interactive mode for selecting note from a list."""
+        clear_after_exit=False, search_notes=None):
+        """Interactive mode for selecting note from a list.
+
+        Parameters
+        ----------
+        notes : list or iterator of `qnote.objects.Note` or `NoteHeader`
+            Notes to be listed. If it's an iterator, notes are consumed page
+            by page while the list is scrolled down.
+        search_notes : callable, optional
+            Function searching notes containing the given pattern, and
+            returning them as an iterator (e.g. a query of database). Case of
+            ASCII letters should be ignored, see also `qnote.utils.fold_case`.
+            If it's not given (or fuzzy search is enabled), patterns are
+            searched within `notes`, which are loaded entirely at the first
+            search.
+        """
         from qnote.vendor.inquirer import (
-            DefaultTheme, ListBoxRender, ListBoxQuestion, prompt
+            DefaultTheme, ListBoxRender, ListBoxQuestion, PagedChoices, prompt
         )
 
         tw_config = {
             'witdh': self.config.display.width,
             'max_lines': self.config.display.max_lines,
         }
+        render_cache = open_render_cache(self.config)
         formatter = NoteFormatter(
-            self.config, tw_config=tw_config, show_date=show_date, show_uuid=show_uuid
+            self.config, tw_config=tw_config, show_date=show_date, show_uuid=show_uuid,
+            render_cache=render_cache,
         )
 
-        # TODO: if `multiple` is True, use `CheckBoxQuestion` instead.
+        if isinstance(notes, list):
+            choices = [(i, v) for i, v in enumerate(notes)]
+        else:
+            choices = PagedChoices(enumerate(notes))
+
+        if multiple:
+            message = 'List of notes (press "/" to search, tab to check)'
+        else:
+            message = 'List of notes (press "/" to search)'
         questions = [
             ListBoxQuestion(
-                'selected',
-                message='List of notes',
-                choices=[(i, v) for i, v in enumerate(notes)]
+                'selected', message=message, choices=choices, multiple=multiple,
             )
         ]
 
@@ -198,22 +224,60 @@ class NotebookOperator(object):
             # https://github.com/magmax/python-inquirer/blob/5412d53/inquirer/questions.py#L111-L117
             return '\n%s\n' % formatter(message.value)
 
-        def choices_searcher(choices, pattern):
-            notes = [v.value for v in choices]
-            contents = [str(v.content) for v in notes]
-            regex = re.compile(re.escape(pattern))
-            idx_matched = [i for i, v in enumerate(contents) if regex.search(v) is not None]
-            return [choices[i] for i in idx_matched]
+        # Notes are ranked by fuzzy search in memory, which requires all of them
+        is_fuzzy = self.config.display.search_mode == 'fuzzy'
+        if search_notes is not None and not is_fuzzy:
+            # Stack of (pattern, searched choices) like `IncrementalSearch`.
+            # Once all notes matched by a pattern are loaded, a pattern
+            # extended from it is searched within them instead of storage.
+            results = []
+
+            def choices_searcher(choices, pattern):
+                pattern = fold_case(pattern)
+                while results and not pattern.startswith(results[-1][0]):
+                    results.pop()
+
+                if results and results[-1][0] == pattern:
+                    return results[-1][1]
+                if results and results[-1][1].is_exhausted:
+                    loaded = [v.value for v in results[-1][1]]
+                    indices = IncrementalSearch(loaded).search(pattern)
+                    searched = PagedChoices(enumerate([loaded[i] for i in indices]))
+                else:
+                    searched = PagedChoices(enumerate(search_notes(pattern)))
+                results.append((pattern, searched))
+                return searched
+        else:
+            # NOTE: `choices` are always all notes in the same order, since
+            # patterns are searched as user types rather than within results
+            # of the previous search.
+            searcher = None
+
+            def choices_searcher(choices, pattern):
+                nonlocal searcher
+                if searcher is None:
+                    if isinstance(choices, PagedChoices):
+                        choices.load(float('inf'))
+                    all_notes = [v.value for v in choices]
+                    if is_fuzzy:
+                        searcher = FuzzySearch(all_notes, n_results=N_FUZZY_RESULTS)
+                    else:
+                        searcher = IncrementalSearch(all_notes)
+                return [choices[i] for i in searcher.search(pattern)]
 
         theme = DefaultTheme()
         render_config = {
             'message_handler': message_handler,
             'choices_searcher': choices_searcher,
+            # Searched notes are new objects, so checked notes are identified
+            # by UUID.
+            'choice_key': lambda choice: choice.value.uuid,
             'clear_after_exit': clear_after_exit,
         }
         render = ListBoxRender(theme=theme, render_config=render_config)
         try:
-            retval = prompt(questions, render=render, raise_keyboard_interrupt=True)
+            with render_cache:
+                retval = prompt(questions, render=render, raise_keyboard_interrupt=True)
             result = retval['selected']
         except KeyboardInterrupt as ex:
             raise UserCancelledException() from ex
@@ -1,10 +1,15 @@
-from argparse import ArgumentParser, Action
+from argparse import ArgumentParser, ArgumentTypeError, Action
 from argparse import SUPPRESS as ARG_SUPPRESS
 from gettext import gettext as _
 import sys as _sys
 
+from qnote.utils.output import OUTPUT_FORMATS
 
-__all__ = ['CustomArgumentParser', 'PassableHelpAction', 'ARG_SUPPRESS']
+
+__all__ = [
+    'CustomArgumentParser', 'PassableHelpAction', 'ARG_SUPPRESS',
+    'add_format_argument', 'positive_int',
+]
 
 
 class CustomArgumentParser(ArgumentParser):
@@ -104,3 +109,27 @@ class PassableHelpAction(Action):
             parser.exit()
         else:
             setattr(namespace, self.dest, True)
+
+
+def add_format_argument(parser):
+    """Add `--format` option for writing machine-readable output."""
+    parser.add_argument(
+        '--format', dest='format', metavar='<format>', default=None,
+        choices=OUTPUT_FORMATS,
+        help=(
+            'Write notes in a machine-readable format instead, one of {%s}. '
+            'Output is streamed without text wrapping and pager.'
+            % ', '.join(OUTPUT_FORMATS)
+        )
+    )
+
+
+def positive_int(value):
+    """Type of arguments which should be a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ArgumentTypeError(_('%r is not a positive integer') % value)
+    return number
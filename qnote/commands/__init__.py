@@ -1,33 +1,32 @@
-from .base_command import *
-from .add import *
-from .clear import *
-from .edit import *
-from .list import *
-from .move import *
-from .notebook import *
-from .open import *
-from .remove import *
-from .status import *
-from .search import *
-from .select import *
-from .tag import *
+import importlib
 
 
-__all__ = []
-__all__.extend(base_command.__all__)
-__all__.extend(add.__all__)
-__all__.extend(clear.__all__)
-__all__.extend(edit.__all__)
-__all__.extend(list.__all__)
-__all__.extend(move.__all__)
-__all__.extend(notebook.__all__)
-__all__.extend(open.__all__)
-__all__.extend(remove.__all__)
-__all__.extend(status.__all__)
-__all__.extend(search.__all__)
-__all__.extend(select.__all__)
+# Commands and the modules implementing them. Modules are imported lazily
+# when commands are accessed, see also `qnote.app.subcommands`.
+_command_modules = {
+    'Command': 'base_command',
+    'AddCommand': 'add',
+    'BatchCommand': 'batch',
+    'ClearCommand': 'clear',
+    'DaemonCommand': 'daemon',
+    'EditCommand': 'edit',
+    'ListCommand': 'list',
+    'MoveCommand': 'move',
+    'NotebookCommand': 'notebook',
+    'OpenCommand': 'open',
+    'RemoveCommand': 'remove',
+    'StatusCommand': 'status',
+    'SearchCommand': 'search',
+    'SelectCommand': 'select',
+    'StorageCommand': 'storage',
+    'TagCommand': 'tag',
+}
 
-del (
-    base_command, add, clear, edit, list, move, notebook,
-    open, remove, status, search, select, tag,
-)
+__all__ = list(_command_modules.keys())
+
+
+def __getattr__(name):
+    if name in _command_modules:
+        module = importlib.import_module('.%s' % _command_modules[name], __name__)
+        return getattr(module, name)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
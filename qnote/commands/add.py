@@ -1,6 +1,7 @@
-from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
+import sys
+
+from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS, positive_int
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NoteManager
 
 from .base_command import Command
 
@@ -11,22 +12,32 @@ class AddCommand(Command):
     """Add a new note."""
 
     _usage = """
-    <prog> [-t | --title <title>] [-c | --content <content>] [-t | --tags <tags>]"""
+    <prog> [-t | --title <title>] [-c | --content <content>] [-t | --tags <tags>]
+    <prog> --from-ndjson <file> [--batch-size <size>]"""
 
     def __init__(self, *args, **kwargs):
         super(AddCommand, self).__init__(*args, **kwargs)
         self.no_more_subcommands = True
 
     def run(self, parsed_args, config):
+        from qnote.manager.note import NoteManager
         kwargs, _ = parsed_args
         try:
-            NoteManager(config).create_note(
-                kwargs['title'],
-                kwargs['content'],
-                kwargs['tags']
-            )
+            if kwargs['from_ndjson'] is not None:
+                NoteManager(config).import_notes(
+                    kwargs['from_ndjson'],
+                    batch_size=kwargs['batch_size'],
+                )
+            else:
+                NoteManager(config).create_note(
+                    kwargs['title'],
+                    kwargs['content'],
+                    kwargs['tags']
+                )
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -50,6 +61,21 @@ class AddCommand(Command):
                 'e.g. --tags \"#tag1, #tag2, ...\"'
             )
         )
+        parser.add_argument(
+            '--from-ndjson', dest='from_ndjson', metavar='<file>', default=None,
+            help=(
+                'Import notes from a file (use "-" to read from stdin), each '
+                'line of it should be a JSON object like '
+                '{"title": ..., "content": ..., "tags": "#tag1, #tag2"}. '
+                'Title is optional and will be the first line of content if '
+                'it is not given.'
+            )
+        )
+        parser.add_argument(
+            '--batch-size', dest='batch_size', metavar='<size>', type=positive_int,
+            default=500,
+            help='Number of notes to be imported in a transaction.'
+        )
         parser.add_argument(
             '-h', '--help', action='help',
             default=ARG_SUPPRESS,
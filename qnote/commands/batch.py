@@ -0,0 +1,70 @@
+import sys
+
+from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
+from qnote.internal.exceptions import SafeExitException
+
+from .base_command import Command
+
+__all__ = ['BatchCommand']
+
+
+class BatchCommand(Command):
+    """Run commands in a single process, so that storage is opened only once
+    and changes are committed in a few transactions. Commands are read from a
+    file (or stdin), either as lines of commands or as a JSON list, and status
+    of each command is written to stderr."""
+
+    _usage = """
+    <prog> [<file>] [--commit-every <n>] [--stop-on-error]"""
+
+    def __init__(self, *args, **kwargs):
+        super(BatchCommand, self).__init__(*args, **kwargs)
+        self.no_more_subcommands = True
+
+    def run(self, parsed_args, config):
+        from qnote.manager.batch import BatchManager
+        kwargs, _ = parsed_args
+
+        try:
+            BatchManager(config).run_commands(
+                kwargs['file'],
+                commit_every=kwargs['commit_every'],
+                stop_on_error=kwargs['stop_on_error'],
+            )
+        except SafeExitException as ex:
+            print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
+
+    def prepare_parser(self):
+        parser = CustomArgumentParser(
+            prog=self.name, usage=self.usage, add_help=False,
+            description=self.__doc__,
+        )
+        parser.add_argument(
+            'file', metavar='<file>', nargs='?', default='-',
+            help=(
+                'File containing commands, one command per line (without the '
+                'leading "qnote"), or a JSON list of commands. Commands are '
+                'read from stdin if it is "-" or not given.'
+            )
+        )
+        parser.add_argument(
+            '--commit-every', dest='commit_every', metavar='<n>', type=int,
+            default=100,
+            help=(
+                'Number of commands to run in a transaction, 0 to run all of '
+                'them in a single transaction. Changes made by a failed '
+                'command are always rolled back. (default: 100)'
+            )
+        )
+        parser.add_argument(
+            '--stop-on-error', dest='stop_on_error', action='store_true',
+            help='Skip remaining commands once a command failed.'
+        )
+        parser.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+        return parser
@@ -1,7 +1,7 @@
+import sys
+
 from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NotebookManager
-from qnote.utils import query_yes_no
 
 from .base_command import Command
 
@@ -19,6 +19,7 @@ class ClearCommand(Command):
         super(ClearCommand, self).__init__(*args, **kwargs)
 
     def run(self, defined_args, config):
+        from qnote.manager.notebook import NotebookManager
         kwargs, reminder = defined_args
         yes = kwargs.pop('yes')
 
@@ -26,6 +27,8 @@ class ClearCommand(Command):
             NotebookManager(config).clear_trash_can(skip_confirmation=yes)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -0,0 +1,98 @@
+import sys
+
+from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
+from qnote.internal.exceptions import SafeExitException
+
+from .base_command import Command
+
+__all__ = ['DaemonCommand']
+
+
+class DaemonCommand(Command):
+    """Manage daemon which serves commands with warm storage and caches.
+    Non-interactive commands (e.g. `list`, `status`, `search`) are sent to
+    daemon automatically while it's running, unless environment variable
+    `QNOTE_NO_DAEMON` is set."""
+
+    _usage = """
+    <prog> start [--foreground]
+    <prog> stop
+    <prog> status"""
+
+    def __init__(self, *args, **kwargs):
+        super(DaemonCommand, self).__init__(*args, **kwargs)
+        self.no_more_subcommands = True
+
+    def run(self, parsed_args, config):
+        kwargs, _ = parsed_args
+        cmd = kwargs.pop('cmd')
+        runner = getattr(self, '_run_%s' % cmd, None)
+        if runner is None:
+            raise RuntimeError('Invalid command: %s' % cmd)
+
+        try:
+            runner(kwargs, config)
+        except SafeExitException as ex:
+            print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
+
+    def prepare_parser(self):
+        parser = CustomArgumentParser(
+            prog=self.name, usage=self.usage, add_help=False,
+            description=self.__doc__,
+        )
+        subparsers = parser.add_subparsers(dest='cmd', required=True)
+        parser.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+
+        parser_start = subparsers.add_parser(
+            'start', prog='start', add_help=False,
+            description='Start daemon in background.'
+        )
+        parser_start.add_argument(
+            '--foreground', action='store_true',
+            help='Run daemon in foreground until it is interrupted.'
+        )
+        parser_start.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+
+        parser_stop = subparsers.add_parser(
+            'stop', prog='stop', add_help=False,
+            description='Stop running daemon.'
+        )
+        parser_stop.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+
+        parser_status = subparsers.add_parser(
+            'status', prog='status', add_help=False,
+            description='Show status of daemon.'
+        )
+        parser_status.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+        return parser
+
+    def _run_start(self, parsed_kwargs, config):
+        from qnote.manager.daemon import DaemonManager
+        foreground = parsed_kwargs['foreground']
+        DaemonManager(config).start(foreground=foreground)
+
+    def _run_stop(self, parsed_kwargs, config):
+        from qnote.manager.daemon import DaemonManager
+        DaemonManager(config).stop()
+
+    def _run_status(self, parsed_kwargs, config):
+        from qnote.manager.daemon import DaemonManager
+        DaemonManager(config).show_status()
@@ -1,8 +1,9 @@
+import sys
+
 from qnote.cli.parser import (
     CustomArgumentParser, PassableHelpAction, ARG_SUPPRESS
 )
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NoteManager
 
 from .base_command import Command
 
@@ -31,6 +32,8 @@ class EditCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -73,11 +76,13 @@ class EditCommand(Command):
         return parser
 
     def _run_edit(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         uuid = parsed_kwargs['uuid']
         editor_name = parsed_kwargs['editor_name']
         NoteManager(config).edit_note(uuid, editor_name=editor_name)
 
     def _run_selected(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         editor_name = parsed_kwargs['editor_name']
         NoteManager(config).edit_note_from_selected(editor_name=editor_name)
 
@@ -1,6 +1,9 @@
-from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
+import sys
+
+from qnote.cli.parser import (
+    CustomArgumentParser, ARG_SUPPRESS, add_format_argument, positive_int,
+)
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NotebookManager
 
 from .base_command import Command
 
@@ -12,13 +15,14 @@ class ListCommand(Command):
     """List all notes in current notebook."""
 
     _usage = """
-    <prog> [--date] [--uuid]"""
+    <prog> [--date] [--uuid] [--limit <n>] [--after <note_uuid>] [--format <format>]"""
 
     def __init__(self, *args, **kwargs):
         super(ListCommand, self).__init__(*args, **kwargs)
         self.no_more_subcommands = True
 
     def run(self, parsed_args, config):
+        from qnote.manager.notebook import NotebookManager
         kwargs, _ = parsed_args
         show_date = kwargs['date']
         show_uuid = kwargs['uuid']
@@ -27,9 +31,14 @@ class ListCommand(Command):
             NotebookManager(config).show_all_notes(
                 show_date=show_date,
                 show_uuid=show_uuid,
+                n_limit=kwargs['limit'],
+                after=kwargs['after'],
+                fmt=kwargs['format'],
             )
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -44,6 +53,18 @@ class ListCommand(Command):
             '--uuid', action='store_true',
             help='Show uuid of notes.'
         )
+        parser.add_argument(
+            '--limit', dest='limit', metavar='<n>', type=positive_int, default=None,
+            help='Maximum number of notes to list.'
+        )
+        parser.add_argument(
+            '--after', dest='after', metavar='<note_uuid>', default=None,
+            help=(
+                'List notes after the one with given UUID, e.g. the last one '
+                'listed by previous `qnote list --limit <n> --uuid`.'
+            )
+        )
+        add_format_argument(parser)
         parser.add_argument(
             '-h', '--help', action='help', default=ARG_SUPPRESS,
             help='Show this help message and exit.'
@@ -1,9 +1,10 @@
+import sys
+
 from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
 from qnote.internal.exceptions import (
     SafeExitException,
     StorageCheckException,
 )
-from qnote.manager import NoteManager
 
 from .base_command import Command
 
@@ -30,6 +31,8 @@ class MoveCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -69,19 +72,21 @@ class MoveCommand(Command):
         return parser
 
     def _run_move(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         uuid = parsed_kwargs['uuid']
         nb_name = parsed_kwargs['notebook']
         try:
             NoteManager(config).move_note(uuid, nb_name)
         except StorageCheckException as ex:
-            raise SafeExitException(str(ex))
+            raise SafeExitException(str(ex), exit_code=1) from ex
 
     def _run_selected(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         nb_name = parsed_kwargs['notebook']
         try:
             NoteManager(config).move_note_from_selected(nb_name)
         except StorageCheckException as ex:
-            raise SafeExitException(str(ex))
+            raise SafeExitException(str(ex), exit_code=1) from ex
 
     # alias
     _run_sel = _run_selected
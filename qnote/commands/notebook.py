@@ -1,6 +1,7 @@
+import sys
+
 from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NotebookManager
 
 from .base_command import Command
 
@@ -33,6 +34,8 @@ class NotebookCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -115,14 +118,17 @@ class NotebookCommand(Command):
         return parser
 
     def _run_create(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         name = parsed_kwargs['name']
         NotebookManager(config).create_notebook(name)
 
     def _run_open(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         name = parsed_kwargs['name']
         NotebookManager(config).open_notebook(name)
 
     def _run_list(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         show_date = parsed_kwargs['date']
         show_all = parsed_kwargs['all']
         NotebookManager(config).list_all_notebooks(
@@ -133,11 +139,13 @@ class NotebookCommand(Command):
         raise NotImplementedError
 
     def _run_rename(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         old_name = parsed_kwargs['old_name']
         new_name = parsed_kwargs['new_name']
         NotebookManager(config).rename_notebook(old_name, new_name)
 
     def _run_delete(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         name = parsed_kwargs['name']
         forcibly = parsed_kwargs['force']
         yes = parsed_kwargs['yes']
@@ -1,8 +1,8 @@
 from argparse import SUPPRESS as ARG_SUPPRESS
+import sys
 
 from qnote.cli.parser import CustomArgumentParser, PassableHelpAction
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NoteManager
 
 from .base_command import Command
 
@@ -31,6 +31,8 @@ class OpenCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -66,11 +68,13 @@ class OpenCommand(Command):
         return parser
 
     def _run_open(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         uuid = parsed_kwargs['uuid']
         # If no uuid is given, enter interactive to select note from current notebook
         NoteManager(config).show_note(uuid)
 
     def _run_selected(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         NoteManager(config).show_note_from_selected()
 
     # alias
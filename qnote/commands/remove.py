@@ -1,6 +1,7 @@
+import sys
+
 from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NoteManager
 
 from .base_command import Command
 
@@ -27,6 +28,8 @@ class RemoveCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -62,11 +65,13 @@ class RemoveCommand(Command):
         return parser
 
     def _run_remove(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         uuid = parsed_kwargs['uuid']
         # If no uuid is given, enter interactive to select note from current notebook
         NoteManager(config).remove_note(uuid)
 
     def _run_selected(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         NoteManager(config).remove_note_from_selected()
 
     # alias
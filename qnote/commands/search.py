@@ -1,6 +1,9 @@
-from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
+import sys
+
+from qnote.cli.parser import (
+    CustomArgumentParser, ARG_SUPPRESS, add_format_argument, positive_int,
+)
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NoteManager
 
 from .base_command import Command
 
@@ -11,10 +14,11 @@ class SearchCommand(Command):
     """Search note by given pattern of UUID, title, content, tag."""
 
     _usage = """
-    <prog> uuid <pattern_of_uuid>
-    <prog> title <pattern_of_title>
-    <prog> content <pattern_of_content>
-    <prog> tags <tags>"""
+    <prog> uuid <pattern_of_uuid> [--format <format>]
+    <prog> title <pattern_of_title> [-r | --regex] [--format <format>]
+    <prog> content <pattern_of_content> [-r | --regex] [--format <format>]
+    <prog> tags <tags> [--format <format>]
+    <prog> fuzzy <pattern> [--limit <n>] [--format <format>]"""
 
     def __init__(self, *args, **kwargs):
         super(SearchCommand, self).__init__(*args, **kwargs)
@@ -30,6 +34,8 @@ class SearchCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -55,6 +61,7 @@ class SearchCommand(Command):
             'uuid', metavar='<pattern_of_uuid>',
             help='Pattern of UUID to search.'
         )
+        add_format_argument(parser_uuid)
         parser_uuid.add_argument(
             '-h', '--help', action='help',
             default=ARG_SUPPRESS,
@@ -63,12 +70,21 @@ class SearchCommand(Command):
 
         parser_title = subparsers.add_parser(
             'title', prog='title', add_help=False,
-            description='Search note by pattern of title.'
+            description=(
+                'Search note by pattern of title. By default, pattern is a '
+                'full-text query consisting of words, "quoted phrases" and '
+                'prefixes (e.g. `note*`).'
+            )
         )
         parser_title.add_argument(
             'title', metavar='<pattern_of_title>',
             help='Pattern of title to search.'
         )
+        parser_title.add_argument(
+            '-r', '--regex', action='store_true',
+            help='Treat pattern as a regular expression.'
+        )
+        add_format_argument(parser_title)
         parser_title.add_argument(
             '-h', '--help', action='help',
             default=ARG_SUPPRESS,
@@ -77,12 +93,21 @@ class SearchCommand(Command):
 
         parser_content = subparsers.add_parser(
             'content', prog='content', add_help=False,
-            description='Search note by pattern of content.'
+            description=(
+                'Search note by pattern of content. By default, pattern is a '
+                'full-text query consisting of words, "quoted phrases" and '
+                'prefixes (e.g. `note*`).'
+            )
         )
         parser_content.add_argument(
             'content', metavar='<pattern_of_content>',
             help='Pattern of content to search.'
         )
+        parser_content.add_argument(
+            '-r', '--regex', action='store_true',
+            help='Treat pattern as a regular expression.'
+        )
+        add_format_argument(parser_content)
         parser_content.add_argument(
             '-h', '--help', action='help',
             default=ARG_SUPPRESS,
@@ -96,30 +121,74 @@ class SearchCommand(Command):
         parser_tag.add_argument(
             'tags', metavar='<tags>',
             help=(
-                'Tag to search. If multiple values are given, they should be '
-                'separated by commas and enclosed by quotation marks. e.g. '
-                '"#tag_name_1, #tag_name_2, ..."'
+                'Tags to search. It can be a boolean expression of tags '
+                'combined by AND, OR, NOT and parentheses, and it should be '
+                'enclosed by quotation marks. e.g. '
+                '"#work AND (#urgent OR #review) AND NOT #done". Commas work '
+                'as AND, e.g. "#tag_name_1, #tag_name_2, ..."'
             )
         )
+        add_format_argument(parser_tag)
         parser_tag.add_argument(
             '-h', '--help', action='help',
             default=ARG_SUPPRESS,
             help='Show this help message and exit.'
         )
+
+        parser_fuzzy = subparsers.add_parser(
+            'fuzzy', prog='fuzzy', add_help=False,
+            description=(
+                'Search note by fuzzy matching (like fzf) on title, tags and '
+                'the beginning of content. Characters of pattern should '
+                'appear in order, but not necessarily consecutively. Notes '
+                'are sorted by how well they are matched.'
+            )
+        )
+        parser_fuzzy.add_argument(
+            'pattern', metavar='<pattern>',
+            help='Pattern to search, it is case-insensitive.'
+        )
+        parser_fuzzy.add_argument(
+            '--limit', dest='limit', metavar='<n>', type=positive_int, default=20,
+            help='Maximal number of notes to show. (default: 20)'
+        )
+        add_format_argument(parser_fuzzy)
+        parser_fuzzy.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
         return parser
 
     def _run_uuid(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         uuid = parsed_kwargs['uuid']
-        NoteManager(config).search_note_by_uuid(uuid)
+        NoteManager(config).search_note_by_uuid(uuid, fmt=parsed_kwargs['format'])
 
     def _run_title(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         title = parsed_kwargs['title']
-        NoteManager(config).search_note_by_title(title)
+        use_regex = parsed_kwargs['regex']
+        NoteManager(config).search_note_by_title(
+            title, use_regex=use_regex, fmt=parsed_kwargs['format']
+        )
 
     def _run_content(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         content = parsed_kwargs['content']
-        NoteManager(config).search_note_by_content(content)
+        use_regex = parsed_kwargs['regex']
+        NoteManager(config).search_note_by_content(
+            content, use_regex=use_regex, fmt=parsed_kwargs['format']
+        )
 
     def _run_tags(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
         tags = parsed_kwargs['tags']
-        NoteManager(config).search_note_by_tags(tags)
+        NoteManager(config).search_note_by_tags(tags, fmt=parsed_kwargs['format'])
+
+    def _run_fuzzy(self, parsed_kwargs, config):
+        from qnote.manager.note import NoteManager
+        NoteManager(config).search_note_by_fuzzy_pattern(
+            parsed_kwargs['pattern'], n_limit=parsed_kwargs['limit'],
+            fmt=parsed_kwargs['format']
+        )
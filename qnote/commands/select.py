@@ -1,6 +1,7 @@
-from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
+import sys
+
+from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS, add_format_argument
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NotebookManager
 
 from .base_command import Command
 
@@ -9,12 +10,17 @@ __all__ = ['SelectCommand']
 
 class SelectCommand(Command):
     """Select a note. If no argument is given, interactive mode will start
-    with an opened notebook."""
+    with an opened notebook.
+
+    Press "/" in interactive mode to search notes as you type. Only title,
+    tags and preview (the first 1024 characters) of content are searched, so
+    that text beyond the preview is not found. Use `qnote search content` to
+    search the whole content instead."""
 
     _usage = """
     <prog> [--multiple] [--date] [--uuid]
     <prog> clear
-    <prog> list [--date] [--uuid]"""
+    <prog> list [--date] [--uuid] [--format <format>]"""
 
     def __init__(self, *args, **kwargs):
         super(SelectCommand, self).__init__(*args, **kwargs)
@@ -31,6 +37,8 @@ class SelectCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -81,6 +89,7 @@ class SelectCommand(Command):
             '--uuid', action='store_true',
             help='Show uuid of notes.'
         )
+        add_format_argument(parser_list)
         parser_list.add_argument(
             '-h', '--help', action='help',
             default=ARG_SUPPRESS,
@@ -89,6 +98,7 @@ class SelectCommand(Command):
         return parser
 
     def _run_select(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         select_multiple = parsed_kwargs['multiple']
         show_date = parsed_kwargs['date']
         show_uuid = parsed_kwargs['uuid']
@@ -100,14 +110,17 @@ class SelectCommand(Command):
         )
 
     def _run_clear(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         NotebookManager(config).clear_selected_notes()
 
     def _run_list(self, parsed_kwargs, config):
+        from qnote.manager.notebook import NotebookManager
         show_date = parsed_kwargs['date']
         show_uuid = parsed_kwargs['uuid']
         NotebookManager(config).list_selected_notes(
             show_date=show_date,
             show_uuid=show_uuid,
+            fmt=parsed_kwargs['format'],
         )
 
     _run_ls = _run_list
@@ -1,8 +1,8 @@
 from argparse import SUPPRESS as ARG_SUPPRESS
+import sys
 
-from qnote.cli.parser import CustomArgumentParser
+from qnote.cli.parser import CustomArgumentParser, add_format_argument
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import NotebookManager
 
 from .base_command import Command
 
@@ -15,20 +15,23 @@ class StatusCommand(Command):
     current notebook (which is pointed by `HEAD`) will be shown."""
 
     _usage = """
-    <prog> [<notebook_name>]"""
+    <prog> [<notebook_name>] [--format <format>]"""
 
     def __init__(self, *args, **kwargs):
         super(StatusCommand, self).__init__(*args, **kwargs)
         self.no_more_subcommands = True
 
     def run(self, parsed_args, config):
+        from qnote.manager.notebook import NotebookManager
         kwargs, _ = parsed_args
         name = kwargs.get('name', None)
 
         try:
-            NotebookManager(config).show_status(name)
+            NotebookManager(config).show_status(name, fmt=kwargs['format'])
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -39,6 +42,7 @@ class StatusCommand(Command):
             'name', metavar='<notebook_name>', nargs='?', default=None,
             help='Name of notebook.'
         )
+        add_format_argument(parser)
         parser.add_argument(
             '-h', '--help', action='help',
             default=ARG_SUPPRESS,
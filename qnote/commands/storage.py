@@ -0,0 +1,72 @@
+import sys
+
+from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
+from qnote.internal.exceptions import SafeExitException
+
+from .base_command import Command
+
+__all__ = ['StorageCommand']
+
+
+class StorageCommand(Command):
+    """Manage storage."""
+
+    _usage = """
+    <prog> migrate [--dry-run]"""
+
+    def __init__(self, *args, **kwargs):
+        super(StorageCommand, self).__init__(*args, **kwargs)
+        self.no_more_subcommands = True
+
+    def run(self, parsed_args, config):
+        kwargs, _ = parsed_args
+        cmd = kwargs.pop('cmd')
+        runner = getattr(self, '_run_%s' % cmd, None)
+        if runner is None:
+            raise RuntimeError('Invalid command: %s' % cmd)
+
+        try:
+            runner(kwargs, config)
+        except SafeExitException as ex:
+            print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
+
+    def prepare_parser(self):
+        parser = CustomArgumentParser(
+            prog=self.name, usage=self.usage, add_help=False,
+            description=self.__doc__,
+        )
+        subparsers = parser.add_subparsers(dest='cmd', required=True)
+        parser.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+
+        parser_migrate = subparsers.add_parser(
+            'migrate', prog='migrate', add_help=False,
+            description=(
+                'Upgrade schema of storage to the latest version. Note that '
+                'storage is also upgraded automatically when it is opened by '
+                'other commands.'
+            )
+        )
+        parser_migrate.add_argument(
+            '--dry-run', dest='dry_run', action='store_true',
+            help=(
+                'Show pending migrations and how long they take by applying '
+                'them to a copy of storage. Nothing would be written to storage.'
+            )
+        )
+        parser_migrate.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+        return parser
+
+    def _run_migrate(self, parsed_kwargs, config):
+        from qnote.manager.storage import StorageManager
+        dry_run = parsed_kwargs['dry_run']
+        StorageManager(config).migrate(dry_run=dry_run)
@@ -1,6 +1,7 @@
+import sys
+
 from qnote.cli.parser import CustomArgumentParser, ARG_SUPPRESS
 from qnote.internal.exceptions import SafeExitException
-from qnote.manager import TagManager
 
 from .base_command import Command
 
@@ -13,7 +14,9 @@ class TagCommand(Command):
     _usage = """
     <prog> list
     <prog> clear_empty
-    <prog> rename <old_name> <new_name>"""
+    <prog> rename <old_name> <new_name>
+    <prog> add <tags>
+    <prog> remove <tags>"""
 
     def __init__(self, *args, **kwargs):
         super(TagCommand, self).__init__(*args, **kwargs)
@@ -30,6 +33,8 @@ class TagCommand(Command):
             runner(kwargs, config)
         except SafeExitException as ex:
             print(ex)
+            if ex.exit_code != 0:
+                sys.exit(ex.exit_code)
 
     def prepare_parser(self):
         parser = CustomArgumentParser(
@@ -83,19 +88,68 @@ class TagCommand(Command):
             default=ARG_SUPPRESS,
             help='Show this help message and exit.'
         )
+
+        parser_add = subparsers.add_parser(
+            'add', prog='add', add_help=False,
+            description=(
+                'Add tags to selected notes (see also `qnote select`). Note '
+                'that tags should be quoted because the hash mark "#" '
+                'indicating a comment in bash shell.'
+            )
+        )
+        parser_add.add_argument(
+            'tags', metavar='<tags>',
+            help='Tags to add, e.g. "#foo, #bar".'
+        )
+        parser_add.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
+
+        parser_remove = subparsers.add_parser(
+            'remove', prog='remove', aliases=['rm'], add_help=False,
+            description=(
+                'Remove tags from selected notes (see also `qnote select`). '
+                'Tags are kept even if no notes are tagged by them, use '
+                '`qnote tag clear_empty` to clear them.'
+            )
+        )
+        parser_remove.add_argument(
+            'tags', metavar='<tags>',
+            help='Tags to remove, e.g. "#foo, #bar".'
+        )
+        parser_remove.add_argument(
+            '-h', '--help', action='help',
+            default=ARG_SUPPRESS,
+            help='Show this help message and exit.'
+        )
         return parser
 
     def _run_list(self, parsed_kwargs, config):
+        from qnote.manager.tag import TagManager
         TagManager(config).list_tags()
 
     _run_ls = _run_list
 
     def _run_clear_empty(self, parsed_kwargs, config):
+        from qnote.manager.tag import TagManager
         TagManager(config).clear_empty_tags()
 
     _run_cle = _run_clear_empty
 
     def _run_rename(self, parsed_kwargs, config):
+        from qnote.manager.tag import TagManager
         old_name = parsed_kwargs['old_name']
         new_name = parsed_kwargs['new_name']
         TagManager(config).rename_tag(old_name, new_name)
+
+    def _run_add(self, parsed_kwargs, config):
+        from qnote.manager.tag import TagManager
+        TagManager(config).add_tags_to_selected_notes(parsed_kwargs['tags'])
+
+    def _run_remove(self, parsed_kwargs, config):
+        from qnote.manager.tag import TagManager
+        TagManager(config).remove_tags_from_selected_notes(parsed_kwargs['tags'])
+
+    _run_rm = _run_remove
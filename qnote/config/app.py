@@ -64,6 +64,10 @@ class AppDefaults(Defaults):
 class AppConfig(ConfigBase):
     name = 'app'
 
+    # Loaded config and the state of config file it's loaded from, see also
+    # `load()`.
+    _cache = None
+
     def __init__(self, **kwargs):
         super(AppConfig, self).__init__()
         if kwargs is None:
@@ -91,6 +95,30 @@ class AppConfig(ConfigBase):
 
     @classmethod
     def load(cls):
+        """Load config from file.
+
+        Loaded config is cached in process, and it will be reused until the
+        config file is modified (checked by its mtime and size). So that the
+        returned instance is shared, and it should not be modified.
+        """
+        state = cls._get_file_state()
+        if state is not None and cls._cache is not None and cls._cache[0] == state:
+            return cls._cache[1]
+
+        config = cls._load()
+        cls._cache = (cls._get_file_state(), config)
+        return config
+
+    @classmethod
+    def _get_file_state(cls):
+        try:
+            stat = os.stat(AppDefaults.fn_config)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def _load(cls):
         if not osp.exists(AppDefaults.fn_config):
             # Config file does not exist, so we create it with default values
             config = cls()
@@ -100,9 +128,14 @@ class AppConfig(ConfigBase):
             with open(AppDefaults.fn_config, 'r') as f:
                 content = json.load(f)
 
-            # Update config file if there are missing keys
+            # Update config file if there are missing keys, or pager is just
+            # detected. So that detection won't be done again next time.
             config = cls(**content)
-            if not check_all_keys_exist(config.to_dict(), content):
+            is_outdated = (
+                not check_all_keys_exist(config.to_dict(), content) or
+                config.display.pager != content[DisplayConfig.name]['pager']
+            )
+            if is_outdated:
                 config.write()
             return config
 
@@ -135,20 +168,35 @@ class DisplayDefaults(Defaults):
 
     # Pager
     default_pager = 'less'
+    fallback_pager = 'pydoc'
     pager = ''
 
+    # Save formatted notes in a file, so that they can be reused by later
+    # processes. (formatted notes are always cached in memory)
+    render_cache = False
+    fn_render_cache = osp.join(AppDefaults.dir_config, 'render_cache.db')
+
+    # Search mode of interactive mode, "exact" (substring) or "fuzzy"
+    valid_search_modes = ['exact', 'fuzzy']
+    search_mode = 'exact'
+
 
 class DisplayConfig(ConfigBase):
     name = 'display'
     keys = [
         'width', 'max_lines', 'tabsize', 'replace_whitespace', 'drop_whitespace',
         'placeholder', 'initial_indent', 'subsequent_indent', 'pager',
+        'render_cache', 'search_mode',
     ]
 
     def __init__(self, **kwargs):
         super(DisplayConfig, self).__init__()
         for k in self.keys:
             setattr(self, k, kwargs.pop(k, getattr(DisplayDefaults, k)))
+        self.fn_render_cache = DisplayDefaults.fn_render_cache
+        if self.search_mode not in DisplayDefaults.valid_search_modes:
+            raise ValueError('Search mode "%s" is not supported, possible'
+                ' choices: %s' % (self.search_mode, DisplayDefaults.valid_search_modes))
 
         # Detect pager only when it's not defined yet
         if self.pager == '':
@@ -162,6 +210,9 @@ class DisplayConfig(ConfigBase):
                 if which('more') is not None:
                     self.pager = 'more'     # should be a builtin app on Windows
 
+            if self.pager == '':
+                self.pager = DisplayDefaults.fallback_pager
+
         self._check_remaining_kwargs(**kwargs)
 
 
@@ -0,0 +1,322 @@
+"""Daemon serving commands over a Unix socket.
+
+A daemon keeps config, storer (database connection) and other caches warm in
+memory, so that commands invoked by `qnote` don't have to pay for importing
+modules and opening storage every time. `qnote` connects to the daemon when
+one is running and the command can be served by it (see `can_serve()`), and
+it falls back to running the command in process otherwise.
+
+Messages are JSON objects sent as frames prefixed by their length (4-byte
+unsigned integer in big-endian):
+- request: `{"op": "run", "argv": [...]}`, `{"op": "status"}` or
+  `{"op": "stop"}`
+- response: `{"code": <exit code>, "stdout": "...", "stderr": "..."}` for
+  "run", and a dict of daemon status for the others.
+
+Note that this module is imported by the client, so it should not import any
+heavy module at module level.
+"""
+import json
+import os
+import os.path as osp
+import socket
+import struct
+import sys
+
+from qnote.config.app import AppDefaults
+
+
+__all__ = [
+    'DAEMON_COMMANDS', 'DaemonServer', 'can_serve', 'get_socket_path',
+    'is_interactive', 'request_daemon', 'run_in_daemon',
+]
+
+
+# Commands served by daemon, and their subcommands which can be served (None
+# means all of them). Those which might need a terminal are never served, see
+# also `is_interactive()`.
+DAEMON_COMMANDS = {
+    'list': None,
+    'move': None,
+    'notebook': ['create', 'list', 'open', 'rename'],
+    'open': None,
+    'remove': None,
+    'search': None,
+    'select': ['clear', 'list', 'ls'],
+    'status': None,
+    'tag': ['add', 'list', 'ls', 'remove', 'rename', 'rm'],
+}
+
+# Interval (in seconds) of checking whether daemon should be stopped while it's
+# waiting for requests
+ACCEPT_TIMEOUT = 0.5
+
+# Environment variable to bypass daemon
+ENV_NO_DAEMON = 'QNOTE_NO_DAEMON'
+
+_header = struct.Struct('>I')
+
+
+def get_socket_path():
+    return osp.join(AppDefaults.dir_config, 'daemon.sock')
+
+
+def _has_option(args, *names):
+    return any([v in names or v.split('=', 1)[0] in names for v in args])
+
+
+def is_interactive(argv):
+    """Check whether a command might need a terminal, i.e. it selects notes
+    interactively, launches an editor or asks for confirmation.
+
+    Parameters
+    ----------
+    argv : list of str
+        Arguments passed to `qnote`, e.g. `['remove', '--uuid', '<uuid>']`.
+    """
+    if len(argv) == 0:
+        return False
+    cmd, args = argv[0], argv[1:]
+    subcommand = args[0] if len(args) > 0 else None
+
+    if cmd == 'edit':
+        return True
+    if cmd == 'add':
+        return not _has_option(args, '-c', '--content', '--from-ndjson')
+    if cmd in ['move', 'open', 'remove']:
+        # Notes are selected interactively unless a UUID is given
+        is_selected = subcommand in ['selected', 'sel']
+        return not is_selected and not _has_option(args, '--uuid')
+    if cmd == 'select':
+        return subcommand not in ['clear', 'list', 'ls']
+    if cmd == 'clear' or (cmd == 'notebook' and subcommand == 'delete'):
+        return not _has_option(args, '-y', '--yes')
+    if cmd == 'tag':
+        return subcommand in ['clear_empty', 'cle']
+    return False
+
+
+def can_serve(argv):
+    """Check whether a command can be served by daemon.
+
+    Parameters
+    ----------
+    argv : list of str
+        Arguments passed to `qnote`, e.g. `['search', 'tags', '#foo']`.
+    """
+    if len(argv) == 0 or is_interactive(argv):
+        return False
+    cmd, args = argv[0], argv[1:]
+    if cmd not in DAEMON_COMMANDS:
+        return False
+    subcommands = DAEMON_COMMANDS[cmd]
+    return subcommands is None or (len(args) > 0 and args[0] in subcommands)
+
+
+def write_message(f, message):
+    data = json.dumps(message).encode('utf-8')
+    f.write(_header.pack(len(data)) + data)
+    f.flush()
+
+
+def read_message(f):
+    header = f.read(_header.size)
+    if len(header) < _header.size:
+        raise EOFError('Connection closed before a message was received.')
+    size, = _header.unpack(header)
+    data = f.read(size)
+    if len(data) < size:
+        raise EOFError('Connection closed while a message was being received.')
+    return json.loads(data.decode('utf-8'))
+
+
+def request_daemon(message, timeout=None):
+    """Send a request to daemon and wait for its response.
+
+    Parameters
+    ----------
+    message : dict
+    timeout : float, optional
+        Timeout (in seconds) of connecting to daemon.
+
+    Returns
+    -------
+    response : dict or None
+        None if daemon is not running.
+    """
+    fn_socket = get_socket_path()
+    if not hasattr(socket, 'AF_UNIX') or not osp.exists(fn_socket):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(fn_socket)
+        except OSError:
+            # Socket is left by a daemon which is not running anymore
+            return None
+        sock.settimeout(None)
+        with sock.makefile('rwb') as f:
+            write_message(f, message)
+            return read_message(f)
+    finally:
+        sock.close()
+
+
+def run_in_daemon(argv):
+    """Run a command in daemon if it's possible.
+
+    Commands are run in daemon only when output is not written to a terminal,
+    since paging and prompts need a terminal of the client.
+
+    Returns
+    -------
+    exit_code : int or None
+        None if the command is not run in daemon.
+    """
+    if os.getenv(ENV_NO_DAEMON) or sys.stdout.isatty() or not can_serve(argv):
+        return None
+
+    try:
+        response = request_daemon({'op': 'run', 'argv': argv}, timeout=1.0)
+    except (OSError, EOFError):
+        return None
+    if response is None:
+        return None
+
+    sys.stdout.write(response['stdout'])
+    sys.stdout.flush()
+    sys.stderr.write(response['stderr'])
+    sys.stderr.flush()
+    return response['code']
+
+
+class DaemonServer(object):
+    """Server handling requests one by one in the current thread.
+
+    Parameters
+    ----------
+    fn_socket : str, optional
+        Path of socket to listen on. Default: `get_socket_path()`.
+    """
+    def __init__(self, fn_socket=None):
+        self.fn_socket = get_socket_path() if fn_socket is None else fn_socket
+        self.sock = None
+        self.start_time = None
+        self.n_served = 0
+        self.running = False
+
+        # Config loaded from file, and its copy used to run commands
+        self._configs = (None, None)
+
+    def get_config(self):
+        """Get config for running commands. Output is always written to the
+        client without paging, so `pydoc` (which writes output directly when
+        it's not connected to a terminal) is used as pager."""
+        from qnote.config import AppConfig
+
+        loaded = AppConfig.load()
+        if self._configs[0] is not loaded:
+            config = AppConfig(**loaded.to_dict())
+            config.display.pager = 'pydoc'
+            self._configs = (loaded, config)
+        return self._configs[1]
+
+    def run_command(self, argv):
+        from contextlib import redirect_stdout, redirect_stderr
+        from io import StringIO
+
+        from qnote.app import run_command
+
+        if not can_serve(argv):
+            return {
+                'code': 2, 'stdout': '',
+                'stderr': 'Command is not supported by daemon: %s\n' % ' '.join(argv),
+            }
+
+        stdout, stderr = StringIO(), StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            code = run_command(argv, self.get_config())
+        return {'code': code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    def get_status(self):
+        return {
+            'pid': os.getpid(),
+            'start_time': self.start_time,
+            'n_served': self.n_served,
+            'socket': self.fn_socket,
+        }
+
+    def handle(self, conn):
+        with conn.makefile('rwb') as f:
+            try:
+                request = read_message(f)
+            except (EOFError, ValueError):
+                return
+
+            op = request.get('op')
+            if op == 'run':
+                response = self.run_command(request.get('argv', []))
+                self.n_served += 1
+            elif op == 'status':
+                response = self.get_status()
+            elif op == 'stop':
+                response = self.get_status()
+                self.running = False
+            else:
+                response = {'error': 'Unknown operation: %s' % op}
+            write_message(f, response)
+
+    def serve_forever(self):
+        import signal
+        import time
+        from qnote.storage import close_all_storers
+
+        # Stop (and remove socket) properly when daemon is killed. Raising an
+        # exception here doesn't work, since it might be caught by the command
+        # being run, so the loop below checks the flag periodically instead.
+        def stop(signum, frame):
+            self.running = False
+
+        self.running = True
+        signal.signal(signal.SIGTERM, stop)
+
+        # Commands should never wait for input from the terminal daemon is
+        # started from.
+        sys.stdin = open(os.devnull, 'r')
+
+        if osp.exists(self.fn_socket):
+            os.remove(self.fn_socket)
+        os.makedirs(osp.dirname(self.fn_socket), exist_ok=True)
+
+        # Socket is created with permission 0600, so that it's never
+        # accessible by other users.
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self.sock.bind(self.fn_socket)
+        finally:
+            os.umask(old_umask)
+        self.sock.listen()
+        self.sock.settimeout(ACCEPT_TIMEOUT)
+        self.start_time = int(time.time())
+
+        try:
+            while self.running:
+                try:
+                    conn, _ = self.sock.accept()
+                except socket.timeout:
+                    continue
+                try:
+                    self.handle(conn)
+                except OSError:
+                    # Client is disconnected
+                    pass
+                finally:
+                    conn.close()
+        finally:
+            self.sock.close()
+            if osp.exists(self.fn_socket):
+                os.remove(self.fn_socket)
+            close_all_storers()
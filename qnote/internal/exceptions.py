@@ -9,6 +9,7 @@ __all__ = [
     'EditorNotSupportedException',
     'UserCancelledException',
     'StorageCheckException',
+    'DuplicateUUIDException',
     'StorageExecutionException',
     'StorageRuntimeError',
     'SafeExitException',
@@ -36,6 +37,24 @@ class StorageCheckException(Exception):
     pass
 
 
+class DuplicateUUIDException(StorageCheckException):
+    """Exceptions raised when notes to be created have UUIDs which are
+    already taken by existing notes, or repeated in the notes themselves.
+
+    Parameters
+    ----------
+    uuids : list of uuid.UUID
+        Duplicate UUIDs.
+    """
+    def __init__(self, uuids):
+        self.uuids = uuids
+        msg = 'Duplicate UUID%s of notes: %s' % (
+            's' if len(uuids) > 1 else '',
+            ', '.join([str(v) for v in uuids]),
+        )
+        super(DuplicateUUIDException, self).__init__(msg)
+
+
 class StorageExecutionException(Exception):
     """Exceptions related to failure of operating storage."""
     pass
@@ -50,5 +69,14 @@ class StorageRuntimeError(RuntimeError):
 
 class SafeExitException(Exception):
     """Exceptions indicating application should be terminated safely instead
-    of showing traceback."""
-    pass
+    of showing traceback.
+
+    Parameters
+    ----------
+    exit_code : int, optional
+        Exit code of application. It should be non-zero if the operation is
+        failed, e.g. a given note or notebook does not exist. Default: 0.
+    """
+    def __init__(self, *args, exit_code=0):
+        super(SafeExitException, self).__init__(*args)
+        self.exit_code = exit_code
@@ -1,8 +1,22 @@
-from .note import *
-from .notebook import *
-from .tag import *
-
-__all__ = []
-__all__.extend(note.__all__)
-__all__.extend(notebook.__all__)
-__all__.extend(tag.__all__)
+import importlib
+
+
+# Managers and the modules implementing them. Modules are imported lazily, so
+# that a command only imports the manager it needs.
+_manager_modules = {
+    'BatchManager': 'batch',
+    'DaemonManager': 'daemon',
+    'NoteManager': 'note',
+    'NotebookManager': 'notebook',
+    'StorageManager': 'storage',
+    'TagManager': 'tag',
+}
+
+__all__ = list(_manager_modules.keys())
+
+
+def __getattr__(name):
+    if name in _manager_modules:
+        module = importlib.import_module('.%s' % _manager_modules[name], __name__)
+        return getattr(module, name)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
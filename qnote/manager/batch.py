@@ -0,0 +1,204 @@
+import json
+import os
+import os.path as osp
+import shlex
+import sys
+import time
+
+from qnote.internal.exceptions import SafeExitException
+from qnote.storage import get_storer
+
+
+__all__ = ['BatchManager', 'parse_commands']
+
+
+# Commands which cannot be run in batch, those might need a terminal are also
+# refused (see also `qnote.daemon.is_interactive()`).
+EXCLUDED_COMMANDS = ['batch', 'daemon']
+
+
+def parse_commands(text):
+    """Parse commands to be run in batch.
+
+    Commands can be given as:
+    - lines of commands, which are splitted like arguments in shell. Empty
+      lines and comments (lines starting with "#") are skipped.
+    - a JSON list, each element of it is either a string of command or a
+      list of arguments.
+
+    Parameters
+    ----------
+    text : str
+
+    Returns
+    -------
+    commands : list of list of str
+
+    Raises
+    ------
+    ValueError
+        If `text` is not valid.
+    """
+    if text.lstrip().startswith('['):
+        content = json.loads(text)
+        commands = []
+        for v in content:
+            if isinstance(v, str):
+                commands.append(shlex.split(v))
+            elif isinstance(v, list) and all([isinstance(x, str) for x in v]):
+                commands.append(v)
+            else:
+                raise ValueError('Invalid command: %s' % json.dumps(v))
+    else:
+        commands = []
+        for line in text.splitlines():
+            line = line.strip()
+            if line == '' or line.startswith('#'):
+                continue
+            commands.append(shlex.split(line))
+    return [v for v in commands if len(v) > 0]
+
+
+class BatchManager(object):
+    def __init__(self, config):
+        self.config = config
+
+    def run_commands(self, fn, commit_every=100, stop_on_error=False):
+        """Run commands in a process with a shared storer.
+
+        Parameters
+        ----------
+        fn : str
+            Path of file containing commands (see also `parse_commands()`).
+            Commands are read from stdin if it's "-".
+        commit_every : int
+            Number of commands to run in a transaction. If it's 0, all
+            commands are run in a single transaction. Each command is also
+            run in a savepoint, so that changes made by a failed command are
+            rolled back without affecting other commands. So are HEAD and
+            selected notes (`qnote select`) changed by a failed command.
+        stop_on_error : bool
+            Stop running remaining commands once a command failed.
+        """
+        if commit_every < 0:
+            msg = '`commit_every` should not be negative.'
+            raise SafeExitException(msg, exit_code=1)
+
+        try:
+            if fn == '-':
+                text = sys.stdin.read()
+            else:
+                with open(fn, 'r') as f:
+                    text = f.read()
+        except OSError as ex:
+            msg = 'Failed to read commands: %s' % ex
+            raise SafeExitException(msg, exit_code=1) from ex
+
+        try:
+            commands = parse_commands(text)
+        except ValueError as ex:
+            raise SafeExitException('Invalid commands: %s' % ex, exit_code=1) from ex
+
+        if len(commands) == 0:
+            raise SafeExitException('No command to run.', exit_code=1)
+
+        storer = get_storer(self.config)
+        group_size = len(commands) if commit_every == 0 else commit_every
+
+        n_succeeded, n_failed = 0, 0
+        for start in range(0, len(commands), group_size):
+            with storer.transaction():
+                group = commands[start:start + group_size]
+                for i, argv in enumerate(group, start + 1):
+                    t_start = time.perf_counter()
+                    code = self._run_command(storer, argv, stdin_used=(fn == '-'))
+                    elapsed = time.perf_counter() - t_start
+
+                    print('[%s] %s: %s (%.2f ms)' % (
+                        'ok' if code == 0 else 'failed, exit code: %s' % code,
+                        i, ' '.join([shlex.quote(v) for v in argv]), elapsed * 1000
+                    ), file=sys.stderr)
+
+                    if code == 0:
+                        n_succeeded += 1
+                    else:
+                        n_failed += 1
+                        if stop_on_error:
+                            break
+            if n_failed > 0 and stop_on_error:
+                break
+
+        n_skipped = len(commands) - n_succeeded - n_failed
+        print('%s of %s command%s succeeded, %s failed, %s skipped.' % (
+            n_succeeded, len(commands), 's' if len(commands) > 1 else '',
+            n_failed, n_skipped
+        ), file=sys.stderr)
+        if n_failed > 0:
+            sys.exit(1)
+
+    def _run_command(self, storer, argv, stdin_used=False):
+        from qnote.app import run_command
+        from qnote.daemon import is_interactive
+
+        if argv[0] in EXCLUDED_COMMANDS:
+            print('Command `%s` cannot be run in batch.' % argv[0], file=sys.stderr)
+            return 2
+        if is_interactive(argv):
+            msg = (
+                'Command `%s` is interactive, it cannot be run in batch. Notes '
+                'should be specified by `--uuid` or `selected`, and '
+                'confirmation should be skipped by `--yes`.' % ' '.join(argv)
+            )
+            print(msg, file=sys.stderr)
+            return 2
+        if stdin_used and _reads_stdin(argv):
+            msg = (
+                'Command `%s` cannot read stdin, which commands are read from '
+                'already.' % ' '.join(argv)
+            )
+            print(msg, file=sys.stderr)
+            return 2
+
+        # Changes made by a failed command are rolled back, including those
+        # of files which are not in storage.
+        state = self._read_state()
+        with storer.transaction() as savepoint:
+            code = run_command(argv, self.config)
+            if code != 0:
+                savepoint.rollback()
+                self._restore_state(state)
+        return code
+
+    def _read_state(self):
+        """Read files of HEAD and selected notes."""
+        state = {}
+        for fn in [self.config.notebook.fn_head, self.config.fn_cached_note_uuid]:
+            try:
+                with open(fn, 'r') as f:
+                    state[fn] = f.read()
+            except FileNotFoundError:
+                state[fn] = None
+        return state
+
+    def _restore_state(self, state):
+        for fn, content in state.items():
+            if content is None:
+                if osp.exists(fn):
+                    os.remove(fn)
+            else:
+                with open(fn, 'w') as f:
+                    f.write(content)
+
+
+def _reads_stdin(argv):
+    """Check whether a command reads stdin, i.e. `add --from-ndjson -`."""
+    if argv[0] != 'add':
+        return False
+    args = argv[1:]
+    for i, v in enumerate(args):
+        # Options can be abbreviated by argparse
+        name, sep, value = v.partition('=')
+        if len(name) > 2 and '--from-ndjson'.startswith(name):
+            if (value if sep else ''.join(args[i + 1:i + 2])) == '-':
+                return True
+    return False
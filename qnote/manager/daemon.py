@@ -0,0 +1,85 @@
+from datetime import datetime as cls_dt
+import os
+import os.path as osp
+import subprocess
+import sys
+import time
+
+from qnote.config.app import AppDefaults
+from qnote.daemon import DaemonServer, get_socket_path, request_daemon
+from qnote.internal.exceptions import SafeExitException
+
+
+__all__ = ['DaemonManager']
+
+
+class DaemonManager(object):
+    # Time (in seconds) to wait for a daemon started in background
+    startup_timeout = 10.0
+
+    def __init__(self, config):
+        self.config = config
+
+    def _get_status(self):
+        try:
+            return request_daemon({'op': 'status'}, timeout=1.0)
+        except (OSError, EOFError):
+            return None
+
+    def start(self, foreground=False):
+        status = self._get_status()
+        if status is not None:
+            msg = 'Daemon is already running (pid: %s).' % status['pid']
+            raise SafeExitException(msg, exit_code=1)
+
+        if foreground:
+            print('Daemon is listening on %s' % get_socket_path())
+            try:
+                DaemonServer().serve_forever()
+            except KeyboardInterrupt:
+                pass
+            return
+
+        # Start daemon in a new session, so that it won't be terminated along
+        # with the terminal it's started from.
+        fn_log = osp.join(AppDefaults.dir_config, 'daemon.log')
+        os.makedirs(AppDefaults.dir_config, exist_ok=True)
+        with open(fn_log, 'a') as f_log:
+            proc = subprocess.Popen(
+                [sys.executable, '-m', 'qnote', 'daemon', 'start', '--foreground'],
+                stdin=subprocess.DEVNULL, stdout=f_log, stderr=f_log,
+                start_new_session=True,
+            )
+
+        t_start = time.time()
+        while time.time() - t_start < self.startup_timeout:
+            status = self._get_status()
+            if status is not None:
+                print('Daemon is started (pid: %s).' % status['pid'])
+                return
+            if proc.poll() is not None:
+                break
+            time.sleep(0.05)
+
+        msg = 'Failed to start daemon, see also %s' % fn_log
+        raise SafeExitException(msg, exit_code=1)
+
+    def stop(self):
+        try:
+            status = request_daemon({'op': 'stop'}, timeout=1.0)
+        except (OSError, EOFError):
+            status = None
+        if status is None:
+            raise SafeExitException('Daemon is not running.', exit_code=1)
+        print('Daemon is stopped (pid: %s).' % status['pid'])
+
+    def show_status(self):
+        status = self._get_status()
+        if status is None:
+            raise SafeExitException('Daemon is not running.', exit_code=1)
+
+        start_time = cls_dt.fromtimestamp(status['start_time'])
+        print('Daemon is running (pid: %s).' % status['pid'])
+        print('Socket: %s' % status['socket'])
+        print('Started: %s' % start_time.strftime('%Y-%m-%d %H:%M:%S'))
+        print('Served commands: %s' % status['n_served'])
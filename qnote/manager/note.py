@@ -1,13 +1,22 @@
-from qnote.cli.operator import NoteOperator, NotebookOperator
+import json
+import sys
+from uuid import UUID
+
+from qnote.cli.operator import NoteOperator, NotebookOperator, parse_title
 from qnote.internal.exceptions import (
     UserCancelledException,
     StorageCheckException,
+    StorageExecutionException,
+    DuplicateUUIDException,
     SafeExitException,
 )
 from qnote.objects import Note, Tags
 from qnote.storage import get_storer
 from qnote.status import HEAD, CachedNoteUUIDs
-from qnote.utils import show_notes as utils_show_notes
+from qnote.utils import (
+    FuzzySearch, parse_tag_query, show_notes as utils_show_notes, write_records,
+)
+from qnote.manager.notebook import select_notes_from_notebook
 
 
 __all__ = ['NoteManager']
@@ -18,7 +27,7 @@ class NoteManager(object):
         self.config = config
 
     def create_note(self, raw_title, raw_content, raw_tags):
-        nb_name = HEAD.get()
+        nb_name = HEAD.get(self.config)
         storer = get_storer(self.config)
 
         if not storer.check_notebook_exist(nb_name):
@@ -33,100 +42,234 @@ class NoteManager(object):
 
         storer.create_note(note, nb_name)
 
+    def import_notes(self, fn, batch_size=500):
+        """Create notes from a NDJSON file, each line of it is a JSON object
+        of a note with fields: `content`, `title` (optional) and `tags`
+        (optional, a string like "#tag1, #tag2" or a list of tag names).
+        Notes exported with `uuid`, `create_time` and `update_time` fields
+        are also accepted.
+
+        Parameters
+        ----------
+        fn : str
+            Path of file. Notes are read from stdin if it's "-".
+        batch_size : int
+            Number of notes to be committed in a transaction.
+        """
+        nb_name = HEAD.get(self.config)
+        storer = get_storer(self.config)
+
+        if not storer.check_notebook_exist(nb_name):
+            msg = 'Notebook `%s` does not exist' % nb_name
+            raise StorageCheckException(msg)
+
+        # Line numbers of notes which are not committed yet, for reporting
+        # the line of a note with duplicate UUID.
+        line_numbers = {}
+        n_created = 0
+
+        def report(n):
+            nonlocal n_created
+            n_created = n
+            line_numbers.clear()
+            sys.stderr.write('\r%s notes imported...' % n_created)
+            sys.stderr.flush()
+
+        f = sys.stdin if fn == '-' else open(fn, 'r')
+        try:
+            notes = self._read_ndjson_notes(f, line_numbers=line_numbers)
+            n_created = storer.create_notes(
+                notes, nb_name, batch_size=batch_size, callback=report
+            )
+        except DuplicateUUIDException as ex:
+            line, uuid = min([(line_numbers[v], v) for v in ex.uuids])
+            msg = 'Failed to import note at line %s, its UUID is duplicate: %s\n%s' % (
+                line, uuid, self._format_imported(n_created, nb_name),
+            )
+            raise SafeExitException(
+                '\r%s' % msg if n_created > 0 else msg, exit_code=1
+            ) from ex
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+        msg = self._format_imported(n_created, nb_name)
+        print('\r%s' % msg if n_created > 0 else msg)
+
+    def _format_imported(self, n_created, nb_name):
+        return '%s note%s ha%s been imported into notebook "%s".' % (
+            n_created,
+            's' if n_created > 1 else '',
+            've' if n_created > 1 else 's',
+            nb_name
+        )
+
+    def _read_ndjson_notes(self, f, line_numbers=None):
+        for i, line in enumerate(f, 1):
+            if line.strip() == '':
+                continue
+            try:
+                record = json.loads(line)
+                note = self._note_from_record(record)
+            except (ValueError, TypeError, KeyError) as ex:
+                msg = 'Failed to parse note at line %s: %s' % (i, ex)
+                raise SafeExitException(msg, exit_code=1) from ex
+            if line_numbers is not None:
+                # The last line is kept for a repeated UUID, which is the
+                # one to be reported.
+                line_numbers[note.uuid] = i
+            yield note
+
+    def _note_from_record(self, record):
+        if not isinstance(record, dict):
+            raise TypeError('a JSON object is required')
+
+        content = record['content']
+        if not isinstance(content, str):
+            raise TypeError('`content` should be a string')
+
+        raw_tags = record.get('tags', None) or []
+        if isinstance(raw_tags, str):
+            tags = Tags.from_string_content(raw_tags)
+        else:
+            tags = Tags(raw_tags)
+
+        title = record.get('title', None)
+        if title is None:
+            title = parse_title(content, self.config)
+
+        note = Note.create(title, content, tags)
+        if 'uuid' in record:
+            note.uuid = UUID(record['uuid'])
+        for attr_name in ['create_time', 'update_time']:
+            if attr_name in record:
+                setattr(note, attr_name, int(record[attr_name]))
+        return note
+
+    def _get_note_by_uuid(self, storer, uuid):
+        try:
+            return storer.get_note(uuid)
+        except StorageExecutionException as ex:
+            raise SafeExitException(str(ex), exit_code=1) from ex
+
     def show_note(self, uuid):
         storer = get_storer(self.config)
 
         if uuid is None:
             # Enter interactive mode and let user select note from current notebook
-            nb_name = HEAD.get()
-            notes = storer.get_notes_from_notebook(nb_name, n_limit=None)
-
+            nb_name = HEAD.get(self.config)
             try:
-                selected_notes = NotebookOperator(self.config).select_notes(
-                    notes, multiple=False, show_date=True, show_uuid=True,
-                    clear_after_exit=True,
+                selected_notes = select_notes_from_notebook(
+                    self.config, nb_name, multiple=False, show_date=True,
+                    show_uuid=True, clear_after_exit=True,
                 )
 
-                assert len(selected_notes) == 1
-                note = selected_notes[0]
+                if len(selected_notes) == 0:
+                    raise SafeExitException('No note was selected.')
             except UserCancelledException:
                 raise SafeExitException()
+
+            # Only headers are listed, so the full note is fetched here
+            note = storer.get_note(selected_notes[0].uuid)
         else:
-            note = storer.get_note(uuid)
+            note = self._get_note_by_uuid(storer, uuid)
 
         tw_config = {'max_lines': None}     # show all content
         utils_show_notes([note], self.config, tw_config)
 
     def show_note_from_selected(self):
-        uuids = CachedNoteUUIDs.get()
+        uuids = CachedNoteUUIDs.get(self.config)
 
         if len(uuids) == 0:
-            raise SafeExitException('No selected note.')
-        if len(uuids) > 1:
-            # TODO: enter interactive mode
-            raise NotImplementedError
-        else:
-            uuid = uuids[0]
+            raise SafeExitException('No selected note.', exit_code=1)
 
+        # All selected notes are shown, and they are fetched while they are
+        # being written to pager.
         storer = get_storer(self.config)
-        note = storer.get_note(uuid)
+        notes = (storer.get_note(v) for v in uuids)
         tw_config = {'max_lines': None}     # show all content
-        utils_show_notes([note], self.config, tw_config)
+        utils_show_notes(notes, self.config, tw_config)
 
-    def search_note_by_uuid(self, pattern_uuid):
+    def search_note_by_uuid(self, pattern_uuid, fmt=None):
         storer = get_storer(self.config)
         notes = storer.get_notes_by_uuid(pattern_uuid)
 
-        tw_config = {'max_lines': 3}
-        utils_show_notes(notes, self.config, tw_config)
+        self._show_found_notes(notes, fmt=fmt)
 
-    def search_note_by_title(self, pattern_title):
+    def search_note_by_title(self, pattern_title, use_regex=False, fmt=None):
         storer = get_storer(self.config)
-        notes = storer.get_notes_by_title(pattern_title)
+        try:
+            notes = storer.get_notes_by_title(pattern_title, use_regex=use_regex)
+        except ValueError as ex:
+            raise SafeExitException(str(ex), exit_code=1) from ex
 
-        tw_config = {'max_lines': 3}
-        utils_show_notes(notes, self.config, tw_config)
+        self._show_found_notes(notes, fmt=fmt)
 
-    def search_note_by_content(self, pattern_content):
+    def search_note_by_content(self, pattern_content, use_regex=False, fmt=None):
         storer = get_storer(self.config)
-        notes = storer.get_notes_by_content(pattern_content)
+        try:
+            notes = storer.get_notes_by_content(pattern_content, use_regex=use_regex)
+        except ValueError as ex:
+            raise SafeExitException(str(ex), exit_code=1) from ex
 
-        tw_config = {'max_lines': 3}
-        utils_show_notes(notes, self.config, tw_config)
+        self._show_found_notes(notes, fmt=fmt)
 
-    def search_note_by_tags(self, raw_tags):
-        n_desired_tags = len(raw_tags.split(','))
-        tags = Tags.from_string_content(raw_tags)
-        if len(tags) != n_desired_tags:
-            msg = 'Tags should be in the format of "#tag_name_1, #tag_name_2", ...'
-            raise SafeExitException(msg)
+    def search_note_by_tags(self, raw_query, fmt=None):
+        try:
+            query = parse_tag_query(raw_query)
+        except ValueError as ex:
+            raise SafeExitException('Invalid tag query: %s' % ex, exit_code=1) from ex
 
         storer = get_storer(self.config)
-        notes = storer.get_notes_by_tags(tags)
+        notes = storer.get_notes_by_tag_query(query)
 
-        tw_config = {'max_lines': 3}
-        utils_show_notes(notes, self.config, tw_config)
+        self._show_found_notes(notes, fmt=fmt)
+
+    def search_note_by_fuzzy_pattern(self, pattern, n_limit=20, fmt=None):
+        if pattern.strip() == '':
+            msg = 'Pattern should not be only whitespace characters.'
+            raise SafeExitException(msg, exit_code=1)
+        if n_limit <= 0:
+            msg = '`n_limit` should be a positive integer.'
+            raise SafeExitException(msg, exit_code=1)
+
+        # Notes are ranked with their headers, and only the best ones are
+        # fetched as a whole.
+        storer = get_storer(self.config)
+        headers = storer.get_note_headers()
+        indices = FuzzySearch(headers, n_results=n_limit).search(pattern)
+        notes = (storer.get_note(headers[i].uuid) for i in indices)
+
+        self._show_found_notes(notes, fmt=fmt)
+
+    def _show_found_notes(self, notes, fmt=None):
+        if fmt is not None:
+            write_records((v.to_dict() for v in notes), fmt)
+        else:
+            tw_config = {'max_lines': 3}
+            utils_show_notes(notes, self.config, tw_config)
 
     def edit_note(self, uuid, editor_name=None):
         storer = get_storer(self.config)
 
         if uuid is None:
             # Enter interactive mode and let user select note from current notebook
-            nb_name = HEAD.get()
-            notes = storer.get_notes_from_notebook(nb_name, n_limit=None)
-
+            nb_name = HEAD.get(self.config)
             try:
-                selected_notes = NotebookOperator(self.config).select_notes(
-                    notes, multiple=False, show_date=True, show_uuid=True,
-                    clear_after_exit=True,
+                selected_notes = select_notes_from_notebook(
+                    self.config, nb_name, multiple=False, show_date=True,
+                    show_uuid=True, clear_after_exit=True,
                 )
 
-                assert len(selected_notes) == 1
-                note = selected_notes[0]
+                if len(selected_notes) == 0:
+                    raise SafeExitException('No note was selected.')
             except UserCancelledException:
                 raise SafeExitException()
+
+            # Only headers are listed, so the full note is fetched here
+            note = storer.get_note(selected_notes[0].uuid)
         else:
-            note = storer.get_note(uuid)
+            note = self._get_note_by_uuid(storer, uuid)
 
         edited_note = NoteOperator(self.config).edit_note(
             note, editor_name=editor_name
@@ -135,18 +278,27 @@ class NoteManager(object):
         storer.update_note(note)
 
     def edit_note_from_selected(self, editor_name=None):
-        uuids = CachedNoteUUIDs.get()
+        uuids = CachedNoteUUIDs.get(self.config)
 
         if len(uuids) == 0:
-            raise SafeExitException('No selected note.')
-        if len(uuids) > 1:
-            # TODO: enter interactive mode
-            raise NotImplementedError
-        else:
-            uuid = uuids[0]
+            raise SafeExitException('No selected note.', exit_code=1)
 
         storer = get_storer(self.config)
-        note = storer.get_note(uuid)
+        if len(uuids) > 1:
+            # Let user pick one of selected notes to edit
+            notes = [storer.get_note(v) for v in uuids]
+            try:
+                selected_notes = NotebookOperator(self.config).select_notes(
+                    notes, multiple=False, show_date=True, show_uuid=True,
+                    clear_after_exit=True,
+                )
+            except UserCancelledException:
+                raise SafeExitException()
+            if len(selected_notes) == 0:
+                raise SafeExitException('No note is selected.')
+            note = selected_notes[0]
+        else:
+            note = storer.get_note(uuids[0])
         edited_note = NoteOperator(self.config).edit_note(
             note, editor_name=editor_name
         )
@@ -155,25 +307,27 @@ class NoteManager(object):
 
     def move_note(self, uuid, nb_name):
         storer = get_storer(self.config)
+        if not storer.check_notebook_exist(nb_name):
+            msg = 'Notebook `%s` does not exist' % nb_name
+            raise StorageCheckException(msg)
 
         if uuid is None:
             # Enter interactive mode and let user select note from current notebook
-            current_nb_name = HEAD.get()
-            notes = storer.get_notes_from_notebook(current_nb_name, n_limit=None)
-
+            current_nb_name = HEAD.get(self.config)
             try:
-                selected_notes = NotebookOperator(self.config).select_notes(
-                    notes, multiple=False, show_date=True, show_uuid=True,
-                    clear_after_exit=True,
+                selected_notes = select_notes_from_notebook(
+                    self.config, current_nb_name, multiple=False, show_date=True,
+                    show_uuid=True, clear_after_exit=True,
                 )
 
-                assert len(selected_notes) == 1
+                if len(selected_notes) == 0:
+                    raise SafeExitException('No note was selected.')
                 note = selected_notes[0]
             except UserCancelledException:
                 raise SafeExitException()
         else:
             # Check whether specific note exists
-            note = storer.get_note(uuid)
+            note = self._get_note_by_uuid(storer, uuid)
 
         n_moved = storer.move_note_by_uuid(note.uuid, nb_name)
 
@@ -187,10 +341,10 @@ class NoteManager(object):
 
     def move_note_from_selected(self, nb_name):
         # TODO: update update_time of notebook
-        uuids = CachedNoteUUIDs.get()
+        uuids = CachedNoteUUIDs.get(self.config)
 
         if len(uuids) == 0:
-            raise SafeExitException('No selected note.')
+            raise SafeExitException('No selected note.', exit_code=1)
 
         storer = get_storer(self.config)
         if not storer.check_notebook_exist(nb_name):
@@ -212,22 +366,21 @@ class NoteManager(object):
 
         if uuid is None:
             # Enter interactive mode and let user select note from current notebook
-            nb_name = HEAD.get()
-            notes = storer.get_notes_from_notebook(nb_name, n_limit=None)
-
+            nb_name = HEAD.get(self.config)
             try:
-                selected_notes = NotebookOperator(self.config).select_notes(
-                    notes, multiple=False, show_date=True, show_uuid=True,
-                    clear_after_exit=True,
+                selected_notes = select_notes_from_notebook(
+                    self.config, nb_name, multiple=False, show_date=True,
+                    show_uuid=True, clear_after_exit=True,
                 )
 
-                assert len(selected_notes) == 1
+                if len(selected_notes) == 0:
+                    raise SafeExitException('No note was selected.')
                 note = selected_notes[0]
             except UserCancelledException:
                 raise SafeExitException()
         else:
             # Check whether specific note exists
-            note = storer.get_note(uuid)
+            note = self._get_note_by_uuid(storer, uuid)
 
         n_removed = storer.remove_note_by_uuid(note.uuid)
 
@@ -240,12 +393,15 @@ class NoteManager(object):
 
     def remove_note_from_selected(self):
         storer = get_storer(self.config)
-        uuids = CachedNoteUUIDs.get()
+        uuids = CachedNoteUUIDs.get(self.config)
 
         if len(uuids) == 0:
-            raise SafeExitException('No selected note.')
+            raise SafeExitException('No selected note.', exit_code=1)
 
-        n_removed = storer.remove_note_by_uuid(uuids)
+        try:
+            n_removed = storer.remove_note_by_uuid(uuids)
+        except StorageCheckException as ex:
+            raise SafeExitException(str(ex), exit_code=1) from ex
 
         msg = '%s note%s ha%s been removed to trash can.' % (
             n_removed,
@@ -1,3 +1,4 @@
+from itertools import islice
 import textwrap as tw
 
 from qnote.cli.operator import NotebookOperator
@@ -10,18 +11,23 @@ from qnote.internal.exceptions import (
 )
 from qnote.storage import get_storer
 from qnote.status import HEAD, CachedNoteUUIDs
+from qnote.utils import write_records
 
 
 __all__ = ['NotebookManager']
 
 
+# Number of notes loaded at once in interactive mode
+N_NOTES_PER_PAGE = 100
+
+
 class NotebookManager(object):
     def __init__(self, config):
         self.config = config
 
-    def show_status(self, name):
+    def show_status(self, name, fmt=None):
         if name is None or name == '':
-            nb_name = HEAD.get()
+            nb_name = HEAD.get(self.config)
         else:
             nb_name = name
 
@@ -29,13 +35,21 @@ class NotebookManager(object):
         try:
             notebook = storer.get_notebook(nb_name)
         except StorageCheckException as ex_check:
-            raise SafeExitException(str(ex_check)) from ex_check
+            raise SafeExitException(str(ex_check), exit_code=1) from ex_check
         except Exception as ex:
             raise StorageRuntimeError(str(ex)) from ex
 
         # Get notebook status
         n_limit = self.config.notebook.status_n_limit
-        notes = storer.get_notes_from_notebook(nb_name, n_limit)
+        if fmt is not None:
+            notes = storer.iter_note_headers_from_notebook(nb_name)
+            write_records((
+                {'notebook': notebook.name, **v.to_dict()}
+                for v in islice(notes, n_limit)
+            ), fmt)
+            return
+
+        notes = storer.get_note_headers_from_notebook(nb_name, n_limit)
         msg_notes = '\n'.join(['  %s' % (str(v)) for v in notes])
 
         msg_status = (
@@ -55,7 +69,7 @@ class NotebookManager(object):
 
         if name in nb_names:
             msg = 'There is already a notebook called: %s' % name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
         storer.create_notebook_by_name(name)
 
@@ -66,9 +80,9 @@ class NotebookManager(object):
 
         if name not in nb_names:
             msg = 'Notebook "%s" does not exist, you have to create it first' % name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
-        HEAD.set(name)
+        HEAD.set(name, self.config)
 
     def list_all_notebooks(self, show_date=False, show_all=False):
         # TODO: mark up opening notebook (HEAD)
@@ -105,23 +119,23 @@ class NotebookManager(object):
         ]
         if old_name in non_editable:
             msg = 'Cannot rename notebook "%s", it\'s for special purpose.' % name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
         storer = get_storer(self.config)
         if not storer.check_notebook_exist(old_name):
             msg = 'Notebook "%s" does not exist, so that we cannot rename it' % old_name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
         if storer.check_notebook_exist(new_name):
             msg = 'Notebook "%s" already exist, please choose another name' % new_name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
         storer.rename_notebook(old_name, new_name)
         msg = 'Notebook "%s" has been renamed "%s"' % (old_name, new_name)
         print(msg)
 
         # If HEAD is pointing to current notebook, set HEAD to new notebook
-        if HEAD.get() == old_name:
-            HEAD.set(new_name)
+        if HEAD.get(self.config) == old_name:
+            HEAD.set(new_name, self.config)
 
     def delete_notebook(self, name, forcibly=False, skip_confirmation=False):
         non_deletable = [
@@ -130,12 +144,12 @@ class NotebookManager(object):
         ]
         if name in non_deletable:
             msg = 'Cannot delete notebook "%s", it\'s for special purpose.' % name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
         storer = get_storer(self.config)
         if not storer.check_notebook_exist(name):
             msg = 'Notebook "%s" does not exist' % name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
         # If there are still notes in a notebook, flag "-f" is required
         notebook = storer.get_notebook_with_notes(name)
@@ -144,7 +158,7 @@ class NotebookManager(object):
                 'Cannot delete notebook "%s", there are still notes in this '
                 'notebook. You can add "-f" flag to force delete it.' % name
             )
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
         if not skip_confirmation:
             if not NotebookOperator(self.config).confirm_to_clear(name):
@@ -154,9 +168,9 @@ class NotebookManager(object):
         storer.delete_notebook(notebook.name)
 
         # If HEAD is pointing to current notebook, redirect HEAD to [DEFAULTS]
-        if HEAD.get() == notebook.name:
+        if HEAD.get(self.config) == notebook.name:
             head_default = self.config.notebook.name_default
-            HEAD.set(head_default)
+            HEAD.set(head_default, self.config)
             msg = (
                 'Redirect to notebook "%s" because "%s" has been deleted but '
                 'it was opened.' % (head_default, notebook.name)
@@ -181,10 +195,11 @@ class NotebookManager(object):
         )
         print(msg)
 
-    def show_all_notes(self, show_date=False, show_uuid=False):
+    def show_all_notes(self, show_date=False, show_uuid=False, n_limit=None,
+        after=None, fmt=None):
         # TODO: functionality of this method is similar to `self.show_status`,
         # maybe we can rewrite this later?
-        nb_name = HEAD.get()
+        nb_name = HEAD.get(self.config)
 
         storer = get_storer(self.config)
         if not storer.check_notebook_exist(nb_name):
@@ -192,16 +207,30 @@ class NotebookManager(object):
                 'Current HEAD is pointing a notebook which does not exist, '
                 'there might be something wrong with HEAD pointer or database.'
             )
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
-        notes = storer.get_notes_from_notebook(nb_name, n_limit=None)
+        # Notes are fetched lazily while they are being shown. Whole notes
+        # are written for machine-readable output, and only headers are
+        # needed for showing notes with their content shortened.
+        if fmt is not None:
+            notes = storer.iter_notes_from_notebook(nb_name, after=after)
+        else:
+            notes = storer.iter_note_headers_from_notebook(nb_name, after=after)
+        if n_limit is not None:
+            notes = islice(notes, n_limit)
 
-        NotebookOperator(self.config).show_notes(
-            notes, show_date=show_date, show_uuid=show_uuid
-        )
+        try:
+            if fmt is not None:
+                write_records((v.to_dict() for v in notes), fmt)
+            else:
+                NotebookOperator(self.config).show_notes(
+                    notes, show_date=show_date, show_uuid=show_uuid
+                )
+        except StorageExecutionException as ex:
+            raise SafeExitException(str(ex), exit_code=1) from ex
 
     def select_notes(self, multiple=False, show_date=False, show_uuid=False):
-        nb_name = HEAD.get()
+        nb_name = HEAD.get(self.config)
 
         storer = get_storer(self.config)
         if not storer.check_notebook_exist(nb_name):
@@ -210,13 +239,12 @@ class NotebookManager(object):
                 'but it does not exist. There might be something wrong with '
                 'HEAD pointer or database.'
             )
-            raise SafeExitException(msg)
-
-        notes = storer.get_notes_from_notebook(nb_name, n_limit=None)
+            raise SafeExitException(msg, exit_code=1)
 
         try:
-            selected_notes = NotebookOperator(self.config).select_notes(
-                notes, multiple=multiple, show_date=show_date, show_uuid=show_uuid
+            selected_notes = select_notes_from_notebook(
+                self.config, nb_name, multiple=multiple, show_date=show_date,
+                show_uuid=show_uuid
             )
         except UserCancelledException:
             raise SafeExitException()
@@ -226,7 +254,7 @@ class NotebookManager(object):
 
         selected_uuids = [v.uuid for v in selected_notes]
         is_plural = len(selected_uuids) > 1
-        CachedNoteUUIDs.set(selected_uuids)
+        CachedNoteUUIDs.set(selected_uuids, self.config)
 
         msg = '%s note%s ha%s been selected.' % (
             len(selected_uuids),
@@ -236,29 +264,86 @@ class NotebookManager(object):
         print(msg)
 
     def clear_selected_notes(self):
-        uuids = CachedNoteUUIDs.get()
+        uuids = CachedNoteUUIDs.get(self.config)
 
         if len(uuids) == 0:
             print('No note was selected.')
         else:
-            CachedNoteUUIDs.clear()
+            CachedNoteUUIDs.clear(self.config)
             msg = 'The following records are cleared:\n%s' % (
                 '\n'.join([v for v in uuids])
             )
             print(msg)
 
-    def list_selected_notes(self, show_date=False, show_uuid=False):
-        uuids = CachedNoteUUIDs.get()
+    def list_selected_notes(self, show_date=False, show_uuid=False, fmt=None):
+        uuids = CachedNoteUUIDs.get(self.config)
 
-        if len(uuids) == 0:
+        if fmt is not None:
+            # Notes which are not found are written with an empty notebook
+            storer = get_storer(self.config)
+            notebook_names, _ = storer.get_locating_notebooks(uuids)
+            write_records((
+                {'uuid': v, 'notebook': notebook_names.get(v)} for v in uuids
+            ), fmt)
+        elif len(uuids) == 0:
             print('No note was selected.')
         else:
             storer = get_storer(self.config)
-            try:
-                notebook_names = [storer.get_locating_notebook(v) for v in uuids]
-            except StorageExecutionException as ex:
-                raise SafeExitException(str(ex))
+            notebook_names, missing = storer.get_locating_notebooks(uuids)
             msg = '\n'.join([
-                '%s  %s' % (v[0], v[1]) for v in zip(uuids, notebook_names)
+                '%s  %s' % (v, notebook_names[v]) for v in uuids
+                if v in notebook_names
             ])
             print(msg)
+
+            if len(missing) != 0:
+                is_plural = len(missing) > 1
+                msg = (
+                    '%s selected note%s ha%s not been found in any notebook, '
+                    'it might have been deleted:\n%s' % (
+                        len(missing),
+                        's' if is_plural else '',
+                        've' if is_plural else 's',
+                        '\n'.join([str(v) for v in missing]),
+                    )
+                )
+                raise SafeExitException(msg, exit_code=1)
+
+
+def select_notes_from_notebook(config, nb_name, **kwargs):
+    """Let user select notes from a notebook in interactive mode. Notes are
+    loaded page by page while the list is scrolled, and patterns typed in
+    search mode are searched in database.
+
+    Parameters
+    ----------
+    config : qnote.config.AppConfig
+    nb_name : str
+    **kwargs
+        Other arguments of `NotebookOperator.select_notes()`.
+
+    Returns
+    -------
+    notes : list of qnote.objects.NoteHeader
+    """
+    storer = get_storer(config)
+    if not storer.check_notebook_exist(nb_name):
+        raise StorageCheckException('Notebook `%s` does not exist' % nb_name)
+
+    if config.display.search_mode == 'fuzzy':
+        # Notes are ranked in memory by fuzzy search, so all of them are
+        # loaded at once.
+        notes = storer.get_note_headers_from_notebook(nb_name, n_limit=None)
+        return NotebookOperator(config).select_notes(notes, **kwargs)
+
+    def search_notes(pattern):
+        return storer.iter_note_headers_from_notebook(
+            nb_name, page_size=N_NOTES_PER_PAGE, pattern=pattern
+        )
+
+    notes = storer.iter_note_headers_from_notebook(
+        nb_name, page_size=N_NOTES_PER_PAGE
+    )
+    return NotebookOperator(config).select_notes(
+        notes, search_notes=search_notes, **kwargs
+    )
@@ -0,0 +1,43 @@
+from qnote.internal.exceptions import SafeExitException
+from qnote.storage import get_migration_plan, migrate_storage
+
+
+__all__ = ['StorageManager']
+
+
+class StorageManager(object):
+    def __init__(self, config):
+        self.config = config
+
+    def migrate(self, dry_run=False):
+        current, latest, pending = get_migration_plan(self.config)
+
+        if current is None:
+            msg = (
+                'Storage does not exist yet, it will be created with the '
+                'latest schema (version %s) on first use.' % latest
+            )
+            raise SafeExitException(msg)
+        if len(pending) == 0:
+            raise SafeExitException('Schema is up to date (version %s).' % current)
+
+        msg_plan = '\n'.join(['  %s' % v for v in pending])
+        print('Schema version: %s (latest: %s)' % (current, latest))
+        print('Pending migrations:\n%s' % msg_plan)
+
+        if dry_run:
+            print('Applying migrations to a copy of storage (dry run)...')
+        else:
+            print('Applying migrations...')
+
+        def report(migration, elapsed):
+            print('  %s ... done in %.2f ms' % (migration, elapsed * 1000))
+
+        applied = migrate_storage(self.config, dry_run=dry_run, callback=report)
+        total = sum([v[1] for v in applied])
+        print('%s of %s migration%s applied in %.2f ms.%s' % (
+            len(applied), len(pending),
+            's' if len(pending) > 1 else '',
+            total * 1000,
+            ' Nothing was written to storage.' if dry_run else ''
+        ))
@@ -5,6 +5,7 @@ from qnote.internal.exceptions import (
 )
 from qnote.objects import Tag, Tags
 from qnote.storage import get_storer
+from qnote.status import CachedNoteUUIDs
 
 
 __all__ = ['TagManager']
@@ -45,11 +46,50 @@ class TagManager(object):
 
         if not storer.check_tag_exist(old_name):
             msg = 'Tag "%s" does not exist, so that we cannot rename it' % old_name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
         if storer.check_tag_exist(new_name):
             msg = 'Tag "%s" already exist, please choose another name' % new_name
-            raise SafeExitException(msg)
+            raise SafeExitException(msg, exit_code=1)
 
         storer.rename_tag(old_name, new_name)
         msg = 'Tag "%s" has been renamed "%s"' % (old_name, new_name)
         print(msg)
+
+    def add_tags_to_selected_notes(self, raw_tags):
+        uuids, tags = self._prepare_selected_notes_and_tags(raw_tags)
+        storer = get_storer(self.config)
+        n_added = storer.add_tags_to_notes(uuids, tags)
+        msg = '%s ha%s been added to %s (%s added).' % (
+            _count(len(tags), 'tag'),
+            's' if len(tags) == 1 else 've',
+            _count(len(uuids), 'selected note'),
+            _count(n_added, 'note-tag pair'),
+        )
+        print(msg)
+
+    def remove_tags_from_selected_notes(self, raw_tags):
+        uuids, tags = self._prepare_selected_notes_and_tags(raw_tags)
+        storer = get_storer(self.config)
+        n_removed = storer.remove_tags_from_notes(uuids, tags)
+        msg = '%s ha%s been removed from %s (%s removed).' % (
+            _count(len(tags), 'tag'),
+            's' if len(tags) == 1 else 've',
+            _count(len(uuids), 'selected note'),
+            _count(n_removed, 'note-tag pair'),
+        )
+        print(msg)
+
+    def _prepare_selected_notes_and_tags(self, raw_tags):
+        uuids = CachedNoteUUIDs.get(self.config)
+        if len(uuids) == 0:
+            raise SafeExitException('No selected note.', exit_code=1)
+
+        tags = Tags.from_string_content(raw_tags)
+        if len(tags) == 0:
+            msg = 'No valid tag is given, tags should be like "#foo, #bar".'
+            raise SafeExitException(msg, exit_code=1)
+        return uuids, tags
+
+
+def _count(n, noun):
+    return '%s %s%s' % (n, noun, '' if n == 1 else 's')
@@ -2,6 +2,8 @@ __all__ = ['Content']
 
 
 class Content(object):
+    __slots__ = ('value',)
+
     def __init__(self, value):
         if value is None:
             value = ''
@@ -9,6 +11,13 @@ class Content(object):
             raise TypeError('`value` should be a string')
         self.value = value
 
+    @classmethod
+    def from_valid_value(cls, value):
+        """Create content from a string without checking its type."""
+        obj = cls.__new__(cls)
+        obj.value = value
+        return obj
+
     def __str__(self):
         return self.value
 
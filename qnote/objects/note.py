@@ -4,7 +4,7 @@ from uuid import UUID, uuid4
 from .content import Content
 from .tag import Tag, Tags
 
-__all__ = ['Note']
+__all__ = ['Note', 'NoteHeader']
 
 
 def is_valid_uuid4(x):
@@ -14,6 +14,8 @@ def is_valid_uuid4(x):
 
 
 class Note(object):
+    __slots__ = ('uuid', 'create_time', 'update_time', 'title', '_content', 'tags')
+
     required_fields = ['uuid', 'create_time', 'update_time', 'title', 'content', 'tags']
 
     def __init__(self, uuid, timestamp, title=None, content=None, tags=None):
@@ -84,6 +86,31 @@ class Note(object):
                 raise TypeError('Invalid type of %s' % attr_name)
         return obj
 
+    @classmethod
+    def from_row(cls, uuid, create_time, update_time, title, content, tags):
+        """Create a note from a row loaded from storage. Values are assumed
+        to be valid already, so that they are not validated and converted
+        as `from_dict()` does.
+
+        Parameters
+        ----------
+        uuid : str or uuid.UUID
+            Hex string of UUID is accepted.
+        create_time, update_time : int
+        title : str
+        content : str
+        tags : str or None
+            Names of tags joined by commas.
+        """
+        obj = cls.__new__(cls)
+        obj.uuid = uuid if isinstance(uuid, UUID) else UUID(hex=uuid)
+        obj.create_time = create_time
+        obj.update_time = update_time
+        obj.title = title
+        obj._content = Content.from_valid_value(content)
+        obj.tags = Tags.from_row(tags)
+        return obj
+
     def to_dict(self):
         return {
             'uuid': self.uuid.hex,
@@ -97,3 +124,85 @@ class Note(object):
     def update_content(self, raw_content):
         self.content = Content(raw_content)
         self.update_time = int(cls_dt.now().timestamp())
+
+
+class NoteHeader(object):
+    """Header of a note, which is a lightweight projection of `Note` for
+    listing notes. Instead of the whole content, only the leading characters
+    of it (`preview`) are kept, and the full note should be fetched by
+    `uuid` when it's needed."""
+    __slots__ = ('uuid', 'create_time', 'update_time', 'title', 'preview', 'tags')
+
+    required_fields = ['uuid', 'create_time', 'update_time', 'title', 'preview', 'tags']
+
+    # Maximal length of `preview`
+    preview_length = 1024
+
+    def __init__(self, uuid, create_time, update_time, title='', preview='',
+        tags=None):
+        self.uuid = uuid
+        self.create_time = create_time
+        self.update_time = update_time
+        self.title = title
+        self.preview = preview
+        self.tags = Tags(tags)
+
+    def __str__(self):
+        return Note.__str__(self)
+
+    @classmethod
+    def make_preview(cls, content):
+        return content[:cls.preview_length]
+
+    @classmethod
+    def from_note(cls, note):
+        return cls(
+            note.uuid, note.create_time, note.update_time, note.title,
+            cls.make_preview(note.content.to_format(str)), note.tags,
+        )
+
+    @classmethod
+    def from_dict(cls, x):
+        checked = [field in x for field in cls.required_fields]
+        if not all(checked):
+            msg = ', '.join([cls.required_fields[i] for i, v in enumerate(checked) if not v])
+            raise ValueError('Missing required field: %s' % msg)
+
+        raw_tags = x['tags']
+        if isinstance(raw_tags, str):
+            tags = Tags.from_string_content(raw_tags)
+        else:
+            tags = Tags(raw_tags)
+
+        times = []
+        for attr_name in ['create_time', 'update_time']:
+            if isinstance(x[attr_name], cls_dt):
+                times.append(int(x[attr_name].timestamp()))
+            elif isinstance(x[attr_name], int):
+                times.append(x[attr_name])
+            else:
+                raise TypeError('Invalid type of %s' % attr_name)
+        return cls(x['uuid'], *times, x['title'], x['preview'], tags)
+
+    @classmethod
+    def from_row(cls, uuid, create_time, update_time, title, preview, tags):
+        """Create a header from a row loaded from storage without validating
+        values, see also `Note.from_row()`."""
+        obj = cls.__new__(cls)
+        obj.uuid = uuid if isinstance(uuid, UUID) else UUID(hex=uuid)
+        obj.create_time = create_time
+        obj.update_time = update_time
+        obj.title = title
+        obj.preview = preview
+        obj.tags = Tags.from_row(tags)
+        return obj
+
+    def to_dict(self):
+        return {
+            'uuid': self.uuid.hex,
+            'create_time': self.create_time,
+            'update_time': self.update_time,
+            'title': self.title,
+            'preview': self.preview,
+            'tags': str(self.tags),
+        }
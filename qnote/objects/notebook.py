@@ -6,6 +6,8 @@ __all__ = ['Notebook']
 
 
 class Notebook(object):
+    __slots__ = ('name', 'notes', '_create_time', '_update_time')
+
     required_fields = ['name', 'create_time', 'update_time']
 
     def __init__(self, timestamp, name, notes=None):
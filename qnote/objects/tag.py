@@ -1,19 +1,44 @@
 import re
+import weakref
 
 __all__ = ['Tag', 'Tags']
 
 
 class Tag(object):
+    """Tag of notes.
+
+    Tags are flyweights: there is only one instance for each name, so that
+    a name is validated only once, and tags attached to lots of notes can
+    share the same object.
+    """
+    __slots__ = ('name', '__weakref__')
+
     regex_tag = re.compile(r'^#(\w+)')
 
-    def __init__(self, name):
-        if not self.is_valid_name(name):
+    # Created instances, keyed by name. They are referenced weakly, so tags
+    # which are no longer used are released (e.g. in a long-lived daemon).
+    _instances = weakref.WeakValueDictionary()
+
+    def __new__(cls, name):
+        obj = cls._instances.get(name, None)
+        if obj is not None:
+            return obj
+        if not cls.is_valid_name(name):
             raise ValueError('Invalid name')
-        self.name = name
+        return cls._create(name)
+
+    @classmethod
+    def _create(cls, name):
+        obj = super(Tag, cls).__new__(cls)
+        obj.name = name
+        return cls._instances.setdefault(name, obj)
 
     def __str__(self):
         return '%s' % self.name
 
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.name)
+
     def __hash__(self):
         return hash(self.name)
 
@@ -22,8 +47,26 @@ class Tag(object):
             raise TypeError
         return x.name == self.name
 
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (self.__class__, (self.name,))
+
+    @classmethod
+    def from_valid_name(cls, name):
+        """Get tag without validating its name. This should only be used for
+        names which are validated already (e.g. loaded from storage)."""
+        obj = cls._instances.get(name, None)
+        return cls._create(name) if obj is None else obj
+
     @classmethod
     def is_valid_name(cls, name):
+        if not isinstance(name, str):
+            return False
         matched = cls.regex_tag.match(name)
         if matched is None:
             return False
@@ -31,14 +74,22 @@ class Tag(object):
 
 
 class Tags(object):
+    """Collection of unique tags, which keeps the order of insertion."""
+    __slots__ = ('collection', '_list')
+
+    regex_tags = re.compile(r'(#\w+)')
+
     def __init__(self, tags=None):
+        # `collection` is a dict with tags as keys (values are unused), which
+        # works as an ordered set. `_list` caches tags for positional indexing.
+        self._list = None
         if tags:
             if isinstance(tags, Tags):
-                self.collection = tags.collection
+                self.collection = dict(tags.collection)
             elif all([isinstance(tag, Tag) for tag in tags]):
-                self.collection = tags
+                self.collection = dict.fromkeys(tags)
             elif all([isinstance(tag, str) for tag in tags]):
-                self.collection = [Tag(tag) for tag in tags]
+                self.collection = dict.fromkeys([Tag(tag) for tag in tags])
             else:
                 msg = (
                     '`tags` should be %s or a list of '
@@ -46,7 +97,7 @@ class Tags(object):
                 )
                 raise TypeError(msg)
         else:
-            self.collection = []
+            self.collection = {}
 
     def __str__(self):
         return ', '.join([str(tag) for tag in self.collection])
@@ -58,41 +109,55 @@ class Tags(object):
         return iter(self.collection)
 
     def __getitem__(self, idx):
-        return self.collection[idx]
+        if self._list is None:
+            self._list = list(self.collection)
+        return self._list[idx]
 
     def __contains__(self, tag):
         if not isinstance(tag, Tag):
             raise TypeError('`tag` should be a %s' % Tag)
-        return str(tag) in set([str(v) for v in self.collection])
+        return tag in self.collection
 
     def __add__(self, x):
-        if not isinstance(x, (Tag, Tags)):
-            raise TypeError('`x` should be %s or %s' % (Tag, Tags))
-
-        result = self.collection
-        if isinstance(x, Tag):
-            if x not in self:
-                result.append(x)
-        else:
-            result = list(set(result).union(set(x.collection)))
-        return Tags(result)
+        result = Tags(self)
+        result += x
+        return result
 
     def __iadd__(self, x):
         if not isinstance(x, (Tag, Tags)):
             raise TypeError('`x` should be %s or %s' % (Tag, Tags))
+        self._list = None
         if isinstance(x, Tag):
-            if x not in self:
-                self.collection.append(x)
+            self.collection[x] = None
         else:
-            union = set(self.collection).union(set(x.collection))
-            self.collection = list(union)
+            self.collection.update(x.collection)
         return self
 
+    def __sub__(self, x):
+        if not isinstance(x, Tags):
+            raise TypeError('`x` should be %s' % Tags)
+        result = Tags()
+        result.collection = {k: None for k in self.collection if k not in x.collection}
+        return result
+
     def add_tag(self, tag):
         self.__iadd__(tag)
 
+    @classmethod
+    def from_row(cls, value, sep=','):
+        """Create tags from valid names joined by `sep` (e.g. result of
+        `group_concat()` in SQL) without validating them."""
+        obj = cls.__new__(cls)
+        obj._list = None
+        if value:
+            obj.collection = dict.fromkeys(
+                [Tag.from_valid_name(v) for v in value.split(sep)]
+            )
+        else:
+            obj.collection = {}
+        return obj
+
     @classmethod
     def from_string_content(cls, content):
-        regex = re.compile(r'(#\w+)')
-        result = regex.findall(content)
+        result = cls.regex_tags.findall(content)
         return cls(tags=[Tag(v) for v in result])
@@ -18,8 +18,8 @@ class HEAD(object):
             f.write(name)
 
     @classmethod
-    def get(cls):
-        config = AppConfig.load()
+    def get(cls, config=None):
+        config = AppConfig.load() if config is None else config
         fn_head = config.notebook.fn_head
         name_default = config.notebook.name_default
 
@@ -30,8 +30,8 @@ class HEAD(object):
             return cls._read(fn_head)
 
     @classmethod
-    def set(cls, name):
-        config = AppConfig.load()
+    def set(cls, name, config=None):
+        config = AppConfig.load() if config is None else config
         fn_head = config.notebook.fn_head
         cls._write(fn_head, name)
 
@@ -40,7 +40,7 @@ class CachedNoteUUIDs(object):
     @classmethod
     def _read(cls, fn):
         with open(fn, 'r') as f:
-            uuids = f.readlines()
+            uuids = [v for v in f.read().splitlines() if v != '']
         return uuids
 
     @classmethod
@@ -49,8 +49,8 @@ class CachedNoteUUIDs(object):
             f.write(uuids)
 
     @classmethod
-    def get(cls):
-        config = AppConfig.load()
+    def get(cls, config=None):
+        config = AppConfig.load() if config is None else config
         fn = config.fn_cached_note_uuid
         if not osp.exists(fn):
             return []
@@ -58,14 +58,14 @@ class CachedNoteUUIDs(object):
             return cls._read(fn)
 
     @classmethod
-    def set(cls, uuids):
-        config = AppConfig.load()
+    def set(cls, uuids, config=None):
+        config = AppConfig.load() if config is None else config
         fn = config.fn_cached_note_uuid
         content = '\n'.join([str(v) for v in uuids])
         cls._write(fn, content)
 
     @classmethod
-    def clear(cls):
-        config = AppConfig.load()
+    def clear(cls, config=None):
+        config = AppConfig.load() if config is None else config
         fn = config.fn_cached_note_uuid
         cls._write(fn, '')
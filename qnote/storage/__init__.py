@@ -1,10 +1,46 @@
+import atexit
 import os.path as osp
 import importlib.util
+import sys
 
 from .base import BaseStorer
 
 
-__all__ = ['get_storer']
+__all__ = [
+    'get_storer', 'close_storer', 'close_all_storers',
+    'get_migration_plan', 'migrate_storage',
+]
+
+
+# Opened storers, keyed by `(type, dir_root)`. So that database connection
+# and initialization can be shared by all callers within a process.
+_storers = {}
+
+
+def _get_storer_key(config):
+    return (config.storage.type, osp.abspath(config.storage.dir_root))
+
+
+def _load_storer_module(_type):
+    """Import module of storer implementation without importing modules of
+    other storage types. Imported module is cached in `sys.modules`."""
+    module_name = 'qnote.storage.%s.storer' % _type
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    this_dir = osp.dirname(__file__)
+    fn = osp.join(this_dir, _type, 'storer.py')
+
+    spec = importlib.util.spec_from_file_location(module_name, fn)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = mod
+    try:
+        spec.loader.exec_module(mod)
+    except Exception as ex:
+        del sys.modules[module_name]
+        msg = 'Failed to load storer of storage type "%s".' % _type
+        raise ImportError(msg, name=module_name) from ex
+    return mod
 
 
 def get_storer(config):
@@ -12,6 +48,10 @@ def get_storer(config):
     external dependencies, or even database initialization of other storage
     implementation.
 
+    Storer is created only once for each storage (type and root directory
+    of storage) in a process, and the same instance will be returned until
+    it is closed by `close_storer()`.
+
     Parameters
     ----------
     config : `qnote.config.AppConfig`
@@ -20,14 +60,14 @@ def get_storer(config):
     -------
     storer : an instance of a subclass from `qnote.storage.BaseStorer`
     """
-    _type = config.storage.type
-    this_dir = osp.dirname(__file__)
-    fn = osp.join(this_dir, _type, 'storer.py')
-    module_name = 'qnote.storage.%s.storer' % _type
+    key = _get_storer_key(config)
+    storer = _storers.get(key, None)
+    if storer is not None:
+        storer.config = config
+        storer.activate()
+        return storer
 
-    spec = importlib.util.spec_from_file_location(module_name, fn)
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)
+    mod = _load_storer_module(config.storage.type)
 
     storer_name = getattr(mod, 'STORER_IMPL', None)
     if storer_name is None:
@@ -47,4 +87,66 @@ def get_storer(config):
         'Type of imported `storer` should be a subclass of %s, this might '
         'be an implementation error.' % BaseStorer
     )
+    _storers[key] = storer
     return storer
+
+
+def close_storer(config):
+    """Close storer of the storage specified in `config` if it's opened."""
+    storer = _storers.pop(_get_storer_key(config), None)
+    if storer is not None:
+        storer.close()
+
+
+def close_all_storers():
+    while _storers:
+        _, storer = _storers.popitem()
+        storer.close()
+
+
+atexit.register(close_all_storers)
+
+
+def _get_storage_function(config, name):
+    mod = _load_storer_module(config.storage.type)
+    func = getattr(mod, name, None)
+    if func is None:
+        raise NotImplementedError(
+            '`%s` is not supported by storage "%s".' % (name, config.storage.type)
+        )
+    return func
+
+
+def get_migration_plan(config):
+    """Get schema version and pending migrations of storage without opening
+    a storer (which upgrades schema automatically).
+
+    Returns
+    -------
+    current_version : int or None
+        None if storage has not been created yet.
+    latest_version : int
+    pending : list
+        Migrations to be applied.
+    """
+    return _get_storage_function(config, 'get_migration_plan')(config)
+
+
+def migrate_storage(config, dry_run=False, callback=None):
+    """Upgrade schema of storage to the latest version.
+
+    Parameters
+    ----------
+    config : `qnote.config.AppConfig`
+    dry_run : bool
+        If true, nothing would be written to storage.
+    callback : callable, optional
+        Function to be called with `(migration, elapsed_time)` after each
+        migration is applied.
+
+    Returns
+    -------
+    applied : list of (migration, elapsed_time)
+    """
+    func = _get_storage_function(config, 'migrate_storage')
+    return func(config, dry_run=dry_run, callback=callback)
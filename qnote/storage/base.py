@@ -5,5 +5,25 @@ class BaseStorer(object):
     def __init__(self, config):
         self.config = config
 
+    def activate(self):
+        """Make this storer ready for use. This is called every time a cached
+        storer is retrieved by `qnote.storage.get_storer()`."""
+        pass
+
+    def close(self):
+        """Release resources (e.g. connection of database) held by storer."""
+        pass
+
+    def transaction(self):
+        """Get a context manager running operations of storer in a
+        transaction. Transaction is committed when the context exits normally,
+        and it's rolled back if an exception is raised.
+
+        Transactions can be nested, and nested ones work as savepoints, i.e.
+        they can be rolled back without affecting the enclosing one. Returned
+        object should provide `commit()` and `rollback()`.
+        """
+        raise NotImplementedError
+
     def create_note(self, note):
         raise NotImplementedError
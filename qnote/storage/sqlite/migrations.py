@@ -0,0 +1,281 @@
+"""Schema migrations of SQLite storage.
+
+Version of schema is recorded in `PRAGMA user_version` of database. A newly
+created database has version 0, and databases created before this mechanism
+was introduced are also treated as version 0.
+
+To change the schema, update models in `models.py` (so that new databases
+are created with the latest schema directly) and append a `Migration` to
+`MIGRATIONS` for upgrading existing databases. Note that a migration should
+not rely on model definitions which might be changed later, and it should be
+safe to be applied to a database which is already (partially) migrated.
+
+Full-text index of notes is optional, since FTS5 extension might be not
+available in the SQLite library. Migrations are applied without it then, and
+whether it's available is determined by the existence of its table rather
+than the version of schema (see also `has_note_index()`).
+"""
+import time
+
+from .models import (
+    Note, Notebook, Tag, NoteToNotebook, NoteToTag, NoteIndex,
+    create_note_index, create_note_index_triggers, get_database,
+)
+
+
+__all__ = [
+    'Migration', 'MIGRATIONS', 'LATEST_VERSION',
+    'get_schema_version', 'get_pending_migrations', 'has_note_index',
+    'migrate', 'simulate',
+]
+
+
+ALL_MODELS = [Note, Notebook, Tag, NoteToNotebook, NoteToTag, NoteIndex]
+
+# Frozen here since migrations should not be changed along with objects
+PREVIEW_LENGTH = 1024
+
+
+class Migration(object):
+    """
+    version : int
+        Schema version after this migration is applied.
+    description : str
+    func : callable
+        A function accepting a database as the only argument. It can
+        return False to indicate that migration cannot be applied in current
+        environment, then migrating will stop and be retried next time.
+    atomic : bool
+        Whether to run this migration in a transaction. Migrations which
+        commit changes by themselves should set this to False.
+    """
+    def __init__(self, version, description, func, atomic=True):
+        self.version = version
+        self.description = description
+        self.func = func
+        self.atomic = atomic
+
+    def __str__(self):
+        return '[%s] %s' % (self.version, self.description)
+
+    def apply(self, db):
+        if not self.atomic:
+            return self._apply(db)
+        with db.atomic():
+            return self._apply(db)
+
+    def _apply(self, db):
+        if self.func(db) is False:
+            return False
+        set_schema_version(db, self.version)
+        return True
+
+
+def has_note_index(db):
+    """Check whether full-text index of notes exists in database."""
+    return NoteIndex._meta.table_name in db.get_tables()
+
+
+def _create_note_index(db):
+    # Storage is still usable without full-text index (notes are searched by
+    # REGEXP instead), so that following migrations are not blocked.
+    if not create_note_index(db):
+        import warnings
+        msg = (
+            'FTS5 extension is not available in SQLite library, full-text '
+            'index of notes is not created.'
+        )
+        warnings.warn(msg, RuntimeWarning)
+
+
+def _create_uuid_index(db):
+    # UUIDs of notes should be unique, but storage created by older versions
+    # might contain duplicate ones (e.g. notes imported twice). Creating an
+    # unique index would fail on every open then, so that a non-unique index
+    # is created instead to keep storage usable.
+    n_duplicates = db.execute_sql(
+        'SELECT count(*) FROM (SELECT uuid FROM "note_tbl" '
+        'GROUP BY uuid HAVING count(*) > 1)'
+    ).fetchone()[0]
+    if n_duplicates > 0:
+        import warnings
+        msg = (
+            '%s UUID%s shared by multiple notes, so that index on UUID is not '
+            'unique. Those notes cannot be opened by UUID, please check them '
+            'with `qnote search uuid <uuid>`.' % (
+                n_duplicates, 's are' if n_duplicates > 1 else ' is',
+            )
+        )
+        warnings.warn(msg, RuntimeWarning)
+
+    db.execute_sql(
+        'CREATE %sINDEX IF NOT EXISTS "note_tbl_uuid" ON "note_tbl" ("uuid")'
+        % ('UNIQUE ' if n_duplicates == 0 else '')
+    )
+
+
+def _create_lookup_indexes(db):
+    _create_uuid_index(db)
+    statements = [
+        'CREATE INDEX IF NOT EXISTS "note_tbl_update_time" '
+        'ON "note_tbl" ("update_time")',
+        'CREATE INDEX IF NOT EXISTS "note_to_notebook_tbl_notebook_id_note_id" '
+        'ON "note_to_notebook_tbl" ("notebook_id", "note_id")',
+        'CREATE INDEX IF NOT EXISTS "note_to_tag_tbl_tag_id_note_id" '
+        'ON "note_to_tag_tbl" ("tag_id", "note_id")',
+    ]
+    for sql in statements:
+        db.execute_sql(sql)
+    db.execute_sql('ANALYZE')
+
+
+def _add_note_preview(db):
+    # SQLite stores columns of a row in order, and `ALTER TABLE ADD COLUMN`
+    # can only append a column after `content`. Then reading `preview` would
+    # still go through the whole content, so the table is rebuilt to place
+    # `preview` before `content` instead.
+    # See also: https://www.sqlite.org/lang_altertable.html#otheralter
+    if 'preview' in [v.name for v in db.get_columns('note_tbl')]:
+        return
+
+    sql_uuid_index = db.execute_sql(
+        'SELECT sql FROM sqlite_master '
+        'WHERE type = "index" AND name = "note_tbl_uuid"'
+    ).fetchone()
+    sql_uuid_index = None if sql_uuid_index is None else sql_uuid_index[0]
+
+    statements = [
+        'CREATE TABLE "note_tbl_new" ("id" INTEGER NOT NULL PRIMARY KEY, '
+        '"uuid" TEXT NOT NULL, "title" VARCHAR(256) NOT NULL, '
+        '"create_time" INTEGER NOT NULL, "update_time" INTEGER NOT NULL, '
+        '"preview" TEXT NOT NULL, "content" TEXT NOT NULL)',
+        'INSERT INTO "note_tbl_new" '
+        'SELECT id, uuid, title, create_time, update_time, '
+        'substr(content, 1, %d), content FROM "note_tbl"' % PREVIEW_LENGTH,
+        # Triggers and indexes are dropped along with the table, and rowids
+        # are preserved, so that the full-text index is still valid.
+        'DROP TABLE "note_tbl"',
+        'ALTER TABLE "note_tbl_new" RENAME TO "note_tbl"',
+    ]
+
+    # Foreign key constraints have to be disabled while the referenced table
+    # is being dropped, and this pragma is a no-op inside a transaction.
+    db.pragma('foreign_keys', 0)
+    try:
+        with db.atomic():
+            for sql in statements:
+                db.execute_sql(sql)
+
+            # Indexes and triggers are created as they are defined in models,
+            # which are the same as the ones dropped above. Except the index
+            # on UUID, which might be not unique (see `_create_uuid_index()`).
+            if sql_uuid_index is not None:
+                db.execute_sql(sql_uuid_index)
+            Note._schema.create_indexes(safe=True)
+            if has_note_index(db):
+                create_note_index_triggers(db)
+            db.execute_sql('ANALYZE "note_tbl"')
+
+            if db.execute_sql('PRAGMA foreign_key_check').fetchone() is not None:
+                raise RuntimeError('Foreign key constraint failed.')
+    finally:
+        db.pragma('foreign_keys', 1)
+
+
+MIGRATIONS = [
+    Migration(
+        1, 'Create full-text index of notes.', _create_note_index,
+        atomic=False,
+    ),
+    Migration(
+        2, (
+            'Create indexes for looking up notes by UUID, ordering notes by '
+            'update time, and finding notes by notebook and tag.'
+        ), _create_lookup_indexes,
+    ),
+    Migration(
+        3, 'Store preview of content for listing notes.', _add_note_preview,
+        atomic=False,
+    ),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(db):
+    return db.pragma('user_version')
+
+
+def set_schema_version(db, version):
+    db.pragma('user_version', version)
+
+
+def get_pending_migrations(db):
+    current = get_schema_version(db)
+    return [v for v in MIGRATIONS if v.version > current]
+
+
+def create_latest_schema(db):
+    """Create tables of latest schema for a new database. Full-text index
+    is created only if it's available, see also `_create_note_index()`."""
+    with db.atomic():
+        db.create_tables([Note, Notebook, Tag, NoteToNotebook, NoteToTag])
+    _create_note_index(db)
+    set_schema_version(db, LATEST_VERSION)
+
+
+def migrate(db, callback=None):
+    """Upgrade schema of database to the latest version.
+
+    Parameters
+    ----------
+    db : peewee.Database
+    callback : callable, optional
+        Function to be called with `(migration, elapsed_time)` after each
+        migration is applied.
+
+    Returns
+    -------
+    applied : list of (Migration, float)
+        Applied migrations and elapsed time (in seconds) of each of them.
+    """
+    applied = []
+    with db.bind_ctx(ALL_MODELS):
+        if get_schema_version(db) == 0 and not Note.table_exists():
+            t_start = time.perf_counter()
+            create_latest_schema(db)
+            migration = Migration(
+                LATEST_VERSION, 'Create tables.', create_latest_schema
+            )
+            applied.append((migration, time.perf_counter() - t_start))
+            if callback is not None:
+                callback(*applied[-1])
+            return applied
+
+        for migration in get_pending_migrations(db):
+            t_start = time.perf_counter()
+            if not migration.apply(db):
+                break
+            applied.append((migration, time.perf_counter() - t_start))
+            if callback is not None:
+                callback(*applied[-1])
+    return applied
+
+
+def simulate(db, callback=None):
+    """Apply migrations to an in-memory copy of database. So that we can
+    know what would be done and how long it takes without modifying the
+    original one.
+
+    Returns
+    -------
+    applied : list of (Migration, float)
+        See also `migrate()`.
+    """
+    db_copy = get_database(':memory:')
+    db_copy.connect()
+    try:
+        db.connection().backup(db_copy.connection())
+        return migrate(db_copy, callback=callback)
+    finally:
+        db_copy.close()
@@ -1,17 +1,34 @@
 import re
 import peewee as pw
-from playhouse.sqlite_ext import SqliteExtDatabase
+from playhouse.sqlite_ext import (
+    SqliteExtDatabase, FTS5Model, RowIDField, SearchField,
+)
 
 
 __all__ = [
-    'Note', 'Notebook', 'Tag', 'NoteToNotebook', 'NoteToTag',
-    'get_database', 'proxy',
+    'Note', 'Notebook', 'Tag', 'NoteToNotebook', 'NoteToTag', 'NoteIndex',
+    'get_database', 'proxy', 'create_note_index', 'create_note_index_triggers',
 ]
 
 
 proxy = pw.Proxy()
 
-def get_database(storage_path):
+def get_database(storage_path, read_only=False):
+    """
+    Parameters
+    ----------
+    storage_path : str
+    read_only : bool
+        If true, database is opened in read-only mode without pragmas
+        modifying the file (e.g. `journal_mode`), so that it's left intact.
+    """
+    if read_only:
+        from urllib.request import pathname2url
+        return SqliteExtDatabase(
+            'file:%s?mode=ro' % pathname2url(storage_path), uri=True,
+            pragmas=(('foreign_keys', 1),), regexp_function=True,
+        )
+
     db = SqliteExtDatabase(
         storage_path,
         pragmas=(
@@ -48,10 +65,13 @@ class Tag(BaseModel):
 
 class Note(BaseModel):
     id = pw.AutoField()
-    uuid = pw.UUIDField()
+    uuid = pw.UUIDField(unique=True)
     title = pw.CharField(max_length=256)
     create_time = pw.TimestampField()
-    update_time = pw.TimestampField()
+    update_time = pw.TimestampField(index=True)
+    # Leading characters of content, so that notes can be listed without
+    # reading the whole content. See also `qnote.objects.NoteHeader`.
+    preview = pw.TextField(default='')
     content = pw.TextField()
 
 
@@ -61,6 +81,8 @@ class NoteToTag(BaseModel):
 
     class Meta:
         primary_key = pw.CompositeKey('note', 'tag')
+        # Covering index for finding notes by tag
+        indexes = ((('tag', 'note'), False),)
 
 
 class Notebook(BaseModel):
@@ -76,3 +98,123 @@ class NoteToNotebook(BaseModel):
 
     class Meta:
         primary_key = pw.CompositeKey('note', 'notebook')
+        # Covering index for finding notes in a notebook
+        indexes = ((('notebook', 'note'), False),)
+
+
+class NoteIndex(FTS5Model):
+    """Full-text index of `Note.title` and `Note.content`.
+
+    This is an external content table, so that texts are not duplicated in
+    database. Rows are kept in sync with `Note` by triggers, see also
+    `create_note_index()`.
+    """
+    rowid = RowIDField()
+    title = SearchField()
+    content = SearchField()
+
+    class Meta:
+        database = proxy
+        legacy_table_names = False
+        table_function = make_table_name
+        options = {
+            'content': Note._meta.table_name,
+            'content_rowid': Note.id.column_name,
+            'prefix': '2 3',    # speed up prefix queries like `foo*`
+        }
+
+
+_note_index_triggers = [
+    """CREATE TRIGGER IF NOT EXISTS {note}_ai AFTER INSERT ON {note} BEGIN
+        INSERT INTO {index}(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS {note}_ad AFTER DELETE ON {note} BEGIN
+        INSERT INTO {index}({index}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    # Only changes of indexed columns have to be synced
+    """CREATE TRIGGER IF NOT EXISTS {note}_au AFTER UPDATE OF title, content
+    ON {note} BEGIN
+        INSERT INTO {index}({index}, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO {index}(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+
+def create_note_index_triggers(db):
+    """Create triggers keeping full-text index in sync with notes. They are
+    dropped along with the table of notes, so that they have to be created
+    again once the table is rebuilt."""
+    names = {
+        'note': Note._meta.table_name,
+        'index': NoteIndex._meta.table_name,
+    }
+    for sql in _note_index_triggers:
+        db.execute_sql(sql.format(**names))
+
+
+def create_note_index(db, batch_size=1000):
+    """Create full-text index of notes and build it for existing notes.
+
+    Existing notes are indexed in batches (one transaction per batch), so
+    that an interrupted build can be resumed next time.
+
+    Parameters
+    ----------
+    db : peewee.Database
+    batch_size : int
+        Number of notes to be indexed in a transaction.
+
+    Returns
+    -------
+    created : bool
+        False if FTS5 extension is not available in current SQLite library.
+    """
+    if not NoteIndex.fts5_installed():
+        return False
+
+    names = {
+        'note': Note._meta.table_name,
+        'index': NoteIndex._meta.table_name,
+    }
+    with db.atomic():
+        NoteIndex.create_table(safe=True)
+        create_note_index_triggers(db)
+
+    # Rows already in `{index}_docsize` are indexed. Notes inserted after
+    # triggers were created are indexed automatically, so only those notes
+    # without a record in it have to be handled here.
+    max_note_id = db.execute_sql(
+        'SELECT max(id) FROM {note}'.format(**names)
+    ).fetchone()[0]
+    max_indexed_id = db.execute_sql(
+        'SELECT max(id) FROM {index}_docsize'.format(**names)
+    ).fetchone()[0]
+    if max_note_id is None or max_note_id == max_indexed_id:
+        return True
+
+    sql_unindexed = (
+        'SELECT id FROM {note} '
+        'WHERE id > ? AND id NOT IN (SELECT id FROM {index}_docsize) '
+        'ORDER BY id LIMIT ?'
+    ).format(**names)
+    sql_batch_end = 'SELECT max(id) FROM (%s)' % sql_unindexed
+    sql_backfill = (
+        'INSERT INTO {index}(rowid, title, content) '
+        'SELECT id, title, content FROM {note} WHERE id IN (%s)'
+    ).format(**names) % sql_unindexed
+
+    last_id = 0
+    while True:
+        with db.atomic():
+            batch_end = db.execute_sql(
+                sql_batch_end, (last_id, batch_size)
+            ).fetchone()[0]
+            if batch_end is None:
+                break
+            db.execute_sql(sql_backfill, (last_id, batch_size))
+        last_id = batch_end
+    return True
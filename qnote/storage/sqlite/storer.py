@@ -1,45 +1,78 @@
+from collections import Counter
+from functools import lru_cache, reduce
+from itertools import islice
+import operator
 import os
+from uuid import UUID
 import os.path as osp
 import peewee as pw
 
 from qnote import objects as qo
 from qnote.storage.base import BaseStorer
+from qnote.utils.query import TagTerm, TagAnd, TagOr, TagNot
 from qnote.internal.exceptions import (
     StorageCheckException,
     StorageExecutionException,
     StorageRuntimeError,
+    DuplicateUUIDException,
 )
 
 from .models import (
-    Note, Notebook, Tag, NoteToNotebook, NoteToTag,
+    Note, Notebook, Tag, NoteToNotebook, NoteToTag, NoteIndex,
     get_database, proxy,
 )
+from . import migrations
 
 
-__all__ = ['SQLiteStorer']
+__all__ = ['SQLiteStorer', 'get_migration_plan', 'migrate_storage']
 
 STORER_IMPL = 'SQLiteStorer'
 
+# Maximum number of host parameters in a single SQL statement, which is 999
+# for SQLite older than 3.32.0. Used to split bulk insertions and lookups.
+SQLITE_MAX_VARIABLES = 999
+
+
+def get_storage_path(config):
+    return osp.join(config.storage.dir_root, 'storage.db')
+
 
 class SQLiteStorer(BaseStorer):
     def __init__(self, config):
         super(SQLiteStorer, self).__init__(config)
         self.db = None
+        self.fts_enabled = False
         self._initialize_database()
 
-    def __delete__(self):
-        self.db.close()
+    def activate(self):
+        # Models are bound to database via a global proxy, so we have to
+        # rebind it in case there are multiple storers opened.
+        if proxy.obj is not self.db:
+            proxy.initialize(self.db)
+
+    def close(self):
+        if self.db is not None and not self.db.is_closed():
+            self.db.close()
+
+    def transaction(self):
+        return self.db.atomic()
 
     def _initialize_database(self):
-        dir_root = self.config.storage.dir_root
-        os.makedirs(dir_root, exist_ok=True)
+        os.makedirs(self.config.storage.dir_root, exist_ok=True)
 
-        storage_path = osp.join(dir_root, 'storage.db')
-        self.db = get_database(storage_path)
+        self.db = get_database(get_storage_path(self.config))
         proxy.initialize(self.db)
-        self.db.create_tables([Note, Notebook, Tag, NoteToNotebook, NoteToTag])
 
-        self._initialize_tables()
+        # Tables would be created (or upgraded) and initialized only when the
+        # version of schema recorded in database is not the latest one.
+        schema_version = migrations.get_schema_version(self.db)
+        if schema_version != migrations.LATEST_VERSION:
+            migrations.migrate(self.db)
+            self._initialize_tables()
+
+        # Full-text index is optional. If it's not available in this SQLite
+        # library, we can only search by REGEXP.
+        self.fts_enabled = migrations.has_note_index(self.db)
 
     def _initialize_tables(self):
         nb_names = [
@@ -65,12 +98,14 @@ class SQLiteStorer(BaseStorer):
         with self.db.atomic() as transaction:
             try:
                 # Insert note to table
+                content = note.content.to_format(str)
                 pw_note = Note(
                     uuid=str(note.uuid),
                     create_time=note.create_time,
                     update_time=note.update_time,
                     title=note.title,
-                    content=note.content.to_format(str),
+                    preview=qo.NoteHeader.make_preview(content),
+                    content=content,
                 )
                 pw_note.save()
 
@@ -90,16 +125,137 @@ class SQLiteStorer(BaseStorer):
                 transaction.rollback()
                 raise StorageExecutionException(str(ex)) from ex
 
+    def create_notes(self, notes, nb_name, batch_size=500, callback=None):
+        """Create notes in bulk.
+
+        Notes are consumed lazily from `notes` and inserted batch by batch,
+        each batch is committed in its own transaction.
+
+        Parameters
+        ----------
+        notes : iterable of qnote.objects.Note
+        nb_name : str
+            Name of notebook to put notes into.
+        batch_size : int
+            Number of notes to be inserted in a transaction.
+        callback : callable, optional
+            Function to be called with the number of created notes after
+            each batch is committed.
+
+        Returns
+        -------
+        n_created : int
+
+        Raises
+        ------
+        DuplicateUUIDException
+            If a UUID of notes in a batch is taken by an existing note or
+            repeated in the batch. Previous batches are committed already.
+        """
+        if batch_size <= 0:
+            raise ValueError('`batch_size` should be a positive integer.')
+
+        pw_notebook = self._query_get_notebook(nb_name).first()
+        if pw_notebook is None:
+            raise StorageCheckException('Notebook `%s` does not exist' % nb_name)
+
+        n_created = 0
+        iterator = iter(notes)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if len(batch) == 0:
+                break
+            for note in batch:
+                if not isinstance(note, qo.Note):
+                    raise TypeError('`note` should be an instance of %s' % qo.Note)
+
+            with self.db.atomic() as transaction:
+                try:
+                    self._check_duplicate_uuids(batch)
+                    self._insert_notes(batch, pw_notebook.id)
+                except DuplicateUUIDException:
+                    raise
+                except Exception as ex:
+                    transaction.rollback()
+                    raise StorageExecutionException(str(ex)) from ex
+
+            n_created += len(batch)
+            if callback is not None:
+                callback(n_created)
+        return n_created
+
+    def _check_duplicate_uuids(self, notes):
+        counts = Counter([note.uuid for note in notes])
+        duplicates = set([k for k, v in counts.items() if v > 1])
+        for chunk in pw.chunked(list(counts), SQLITE_MAX_VARIABLES):
+            query = Note.select(Note.uuid).where(Note.uuid.in_(chunk))
+            duplicates.update([v[0] for v in query.tuples()])
+        if len(duplicates) != 0:
+            raise DuplicateUUIDException([k for k in counts if k in duplicates])
+
+    def _insert_notes(self, notes, notebook_id):
+        """Insert notes and their relations with a few bulk queries. This
+        should be called inside a transaction."""
+        rows = []
+        for note in notes:
+            content = note.content.to_format(str)
+            rows.append({
+                Note.uuid: note.uuid,
+                Note.create_time: note.create_time,
+                Note.update_time: note.update_time,
+                Note.title: note.title,
+                Note.preview: qo.NoteHeader.make_preview(content),
+                Note.content: content,
+            })
+        for chunk in pw.chunked(rows, SQLITE_MAX_VARIABLES // len(rows[0])):
+            Note.insert_many(chunk).execute()
+
+        uuids = [note.uuid for note in notes]
+        note_ids = {}
+        for chunk in pw.chunked(uuids, SQLITE_MAX_VARIABLES):
+            query = Note.select(Note.id, Note.uuid).where(Note.uuid.in_(chunk))
+            note_ids.update({v.uuid: v.id for v in query.namedtuples()})
+
+        rows = [{
+            NoteToNotebook.note: note_ids[v], NoteToNotebook.notebook: notebook_id
+        } for v in uuids]
+        for chunk in pw.chunked(rows, SQLITE_MAX_VARIABLES // 2):
+            NoteToNotebook.insert_many(chunk).execute()
+
+        tag_names = list(set([str(tag) for note in notes for tag in note.tags]))
+        if len(tag_names) == 0:
+            return
+        tag_ids = self._get_or_create_tag_ids(tag_names)
+
+        rows = [{
+            NoteToTag.note: note_ids[note.uuid], NoteToTag.tag: tag_ids[str(tag)]
+        } for note in notes for tag in note.tags]
+        for chunk in pw.chunked(rows, SQLITE_MAX_VARIABLES // 2):
+            NoteToTag.insert_many(chunk).on_conflict_ignore().execute()
+
+    def _get_or_create_tag_ids(self, tag_names):
+        """Get ids of tags by names, and create those tags not existing yet.
+        This should be called inside a transaction.
+
+        Returns
+        -------
+        tag_ids : dict
+            Ids of tags keyed by name.
+        """
+        # There might be existing tags in database, so we ignore those
+        # conflicted ones while inserting.
+        for chunk in pw.chunked(tag_names, SQLITE_MAX_VARIABLES):
+            Tag.insert_many([{Tag.name: v} for v in chunk]).on_conflict_ignore().execute()
+
+        tag_ids = {}
+        for chunk in pw.chunked(tag_names, SQLITE_MAX_VARIABLES):
+            query = Tag.select(Tag.id, Tag.name).where(Tag.name.in_(chunk))
+            tag_ids.update({v.name: v.id for v in query.namedtuples()})
+        return tag_ids
+
     def get_note(self, note_uuid):
-        query = (
-            Note
-            .select(Note, pw.fn.group_concat(Tag.name).alias('tags'))
-            .where(Note.uuid == note_uuid)
-            .join(NoteToTag, join_type=pw.JOIN.LEFT_OUTER)
-            .join(Tag, join_type=pw.JOIN.LEFT_OUTER)
-            .group_by(Note.uuid)
-        )
-        result = list(query.namedtuples())
+        query = Note.select(*note_columns()).where(Note.uuid == note_uuid)
+        result = self._fetch_notes(query)
 
         if len(result) == 0:
             msg = 'Failed to find note with UUID: %s' % note_uuid
@@ -109,84 +265,176 @@ class SQLiteStorer(BaseStorer):
             msg = 'Duplicate notes found.'
             raise StorageExecutionException(msg)
 
-        return qo.Note.from_dict(result[0]._asdict())
+        return result[0]
 
-    def get_notes_by_uuid(self, pattern):
-        query = (
-            Note
-            .select(Note, pw.fn.group_concat(Tag.name).alias('tags'))
-            .where(Note.uuid.regexp(pattern))
-            .join(NoteToTag)
-            .join(Tag)
-            .group_by(Note.uuid)
-        )
-        result = list(query.dicts())
-        return [qo.Note.from_dict(v) for v in result]
+    def _fetch_notes(self, query, cls_note=qo.Note):
+        """Execute a query selecting `note_columns()` and create notes from
+        raw rows, so that values are not converted by fields of models."""
+        return [cls_note.from_row(*row) for row in self.db.execute(query)]
 
-    def get_notes_by_title(self, pattern):
-        if pattern.strip() == '':
-            raise ValueError('Pattern should not be only whitespace characters.')
+    def get_note_headers(self):
+        """Get headers of all notes, sorted by update time (most recently
+        updated first).
 
+        Returns
+        -------
+        headers : list of qnote.objects.NoteHeader
+        """
         query = (
             Note
-            .select(Note, pw.fn.group_concat(Tag.name).alias('tags'))
-            .where(Note.title.regexp(pattern))
-            .join(NoteToTag)
-            .join(Tag)
-            .group_by(Note.uuid)
+            .select(*note_columns(header_only=True))
+            .order_by(Note.update_time.desc(), Note.id.desc())
         )
-        result = list(query.dicts())
-        return [qo.Note.from_dict(v) for v in result]
+        return self._fetch_notes(query, cls_note=qo.NoteHeader)
+
+    def get_notes_by_uuid(self, pattern):
+        query = Note.select(*note_columns()).where(Note.uuid.regexp(pattern))
+        return self._fetch_notes(query)
 
-    def get_notes_by_content(self, pattern):
+    def get_notes_by_title(self, pattern, use_regex=False):
+        """
+        Parameters
+        ----------
+        pattern : str
+            Full-text query (tokens, "phrases" and prefixes like `foo*` are
+            supported), or a regular expression if `use_regex` is True.
+        use_regex : bool
+        """
+        return self._search_notes('title', pattern, use_regex=use_regex)
+
+    def get_notes_by_content(self, pattern, use_regex=False):
+        """
+        Parameters
+        ----------
+        pattern : str
+            Full-text query (tokens, "phrases" and prefixes like `foo*` are
+            supported), or a regular expression if `use_regex` is True.
+        use_regex : bool
+        """
+        return self._search_notes('content', pattern, use_regex=use_regex)
+
+    def _search_notes(self, field_name, pattern, use_regex=False):
         if pattern.strip() == '':
             raise ValueError('Pattern should not be only whitespace characters.')
 
+        query = Note.select(*note_columns())
+
+        if use_regex or not self.fts_enabled:
+            query = query.where(getattr(Note, field_name).regexp(pattern))
+            return self._fetch_notes(query)
+
+        # Notes are sorted by relevance (bm25) of the matched field.
         query = (
-            Note
-            .select(Note, pw.fn.group_concat(Tag.name).alias('tags'))
-            .where(Note.content.regexp(pattern))
-            .join(NoteToTag)
-            .join(Tag)
-            .group_by(Note.uuid)
+            query
+            .join(NoteIndex, on=(NoteIndex.rowid == Note.id))
+            .order_by(NoteIndex.rank())
         )
-        result = list(query.dicts())
-        return [qo.Note.from_dict(v) for v in result]
+        field = getattr(NoteIndex, field_name)
+        try:
+            return self._fetch_notes(query.where(field.match(pattern)))
+        except pw.OperationalError:
+            # `pattern` is not a valid full-text query (e.g. "foo-bar"
+            # or "a.b"), so we search it as a sequence of plain phrases.
+            fts_query = make_fts_query(pattern)
+            return self._fetch_notes(query.where(field.match(fts_query)))
 
     def get_notes_by_tags(self, tags):
-        """
+        """Get notes tagged with all of the given tags.
+
         Parameters
         ----------
         tags : qnote.object.Tags
+
+        Returns
+        -------
+        notes : list of qnote.objects.Note
+            Sorted by update time (most recently updated first). All tags of
+            notes are included, not only the given ones.
         """
         if len(tags) == 0:
             return []
 
-        str_tags = [str(v) for v in tags]
+        str_tags = list(set([str(v) for v in tags]))
+        query = Tag.select(Tag.id).where(Tag.name.in_(str_tags))
+        tag_ids = [v.id for v in query.namedtuples()]
+        if len(tag_ids) != len(str_tags):
+            # There is no note tagged with a non-existing tag
+            return []
 
-        condition = (Tag.name == str_tags[0])
-        for v in str_tags[1:]:
-            condition = condition | (Tag.name == v)
+        rarest_id, *other_ids = self._sort_tags_by_cardinality(tag_ids)
 
-        query = (
-            Tag
-            .select()
-            .where(Tag.name.in_(str_tags))
-            .select(
-                Note,
-                pw.fn.group_concat(Tag.name).alias('tags'),
-                pw.fn.count(Tag.name).alias('tag_count')
+        # Notes are found by walking through the notes of the rarest tag, and
+        # checking whether the other tags are attached to each of them by
+        # primary key. `CROSS JOIN` forces SQLite to keep this order of loops,
+        # so the cost depends on the rarest tag rather than popular ones.
+        NT1, NT2 = NoteToTag.alias('nt1'), NoteToTag.alias('nt2')
+        if len(other_ids) == 0:
+            query_ids = NT1.select(NT1.note_id).where(NT1.tag_id == rarest_id)
+        else:
+            query_ids = (
+                NT1
+                .select(NT1.note_id)
+                .join(NT2, join_type=pw.JOIN.CROSS)
+                .where(
+                    (NT1.tag_id == rarest_id) &
+                    (NT2.note_id == NT1.note_id) &
+                    (NT2.tag_id.in_(other_ids))
+                )
+                .group_by(NT1.note_id)
+                .having(pw.fn.count(NT2.tag_id.distinct()) == len(other_ids))
             )
-            .join(NoteToTag)
-            .join(Note)
-            .group_by(Note.uuid)
+
+        query = (
+            Note
+            .select(*note_columns())
+            .where(Note.id.in_(query_ids))
+            .order_by(Note.update_time.desc(), Note.id.desc())
         )
+        return self._fetch_notes(query)
 
-        result = list(query.dicts())
-        # NOTE: We want to get those results which met all conditions at
-        # the same time (AND), so we have to filter out the others here.
-        result = [v for v in result if v['tag_count'] >= len(tags)]
-        return [qo.Note.from_dict(v) for v in result]
+    def get_notes_by_tag_query(self, query):
+        """Get notes matching a boolean expression of tags.
+
+        Parameters
+        ----------
+        query : TagTerm, TagAnd, TagOr or TagNot
+            Syntax tree of tag query, see also `qnote.utils.parse_tag_query()`.
+
+        Returns
+        -------
+        notes : list of qnote.objects.Note
+            Sorted by update time (most recently updated first).
+        """
+        terms = query.operands if isinstance(query, TagAnd) else [query]
+        if all([isinstance(v, TagTerm) for v in terms]):
+            # A plain conjunction can be done faster by `get_notes_by_tags()`
+            return self.get_notes_by_tags(qo.Tags([v.name for v in terms]))
+
+        sql, params = compile_tag_query(query)
+        cursor = self.db.execute_sql(sql, params)
+        return [qo.Note.from_row(*row) for row in cursor]
+
+    def _sort_tags_by_cardinality(self, tag_ids):
+        """Sort tags by number of notes tagged with them in ascending order.
+
+        Tags are counted with a limit, which grows until the notes of one of
+        them are all counted. So that notes of popular tags are never counted
+        through, and only the first (rarest) tag is guaranteed to be in order.
+        """
+        limit = 64
+        while True:
+            counts = {}
+            for tag_id in tag_ids:
+                query = (
+                    NoteToTag
+                    .select(NoteToTag.note_id)
+                    .where(NoteToTag.tag_id == tag_id)
+                    .limit(limit)
+                )
+                counts[tag_id] = query.count()
+            if min(counts.values()) < limit:
+                return sorted(tag_ids, key=lambda x: counts[x])
+            limit *= 4
 
     def get_locating_notebook(self, note_uuid):
         query = (
@@ -208,6 +456,47 @@ class SQLiteStorer(BaseStorer):
 
         return result[0].notebook_name
 
+    def get_locating_notebooks(self, note_uuids):
+        """Get names of notebooks where notes are located in.
+
+        Parameters
+        ----------
+        note_uuids : list of str or uuid.UUID
+
+        Returns
+        -------
+        notebook_names : dict
+            Name of notebook keyed by the given UUID.
+        missing : list
+            Given UUIDs of those notes which are not found in any notebook.
+        """
+        uuids = {}
+        missing = []
+        for v in note_uuids:
+            try:
+                uuids[v] = v if isinstance(v, UUID) else UUID(str(v))
+            except ValueError:
+                missing.append(v)
+
+        found = {}
+        for chunk in pw.chunked(list(set(uuids.values())), SQLITE_MAX_VARIABLES):
+            query = (
+                Note
+                .select(Note.uuid, Notebook.name.alias('notebook_name'))
+                .join(NoteToNotebook)
+                .join(Notebook)
+                .where(Note.uuid.in_(chunk))
+            )
+            found.update({v.uuid: v.notebook_name for v in query.namedtuples()})
+
+        notebook_names = {}
+        for k, v in uuids.items():
+            if v in found:
+                notebook_names[k] = found[v]
+            else:
+                missing.append(k)
+        return notebook_names, missing
+
     def update_note(self, note):
         if not isinstance(note, qo.Note):
             raise TypeError('`note` should be an instance of %s' % qo.Note)
@@ -218,11 +507,12 @@ class SQLiteStorer(BaseStorer):
         data.pop('uuid')
         data.pop('create_time')
         data.pop('tags')
+        data['preview'] = qo.NoteHeader.make_preview(data['content'])
         data_to_update = {getattr(Note, k): v for k, v in data.items()}
 
         with self.db.atomic() as transaction:
             try:
-                pw_ori_note = list(Note.select().where(Note.uuid == note.uuid))
+                pw_ori_note = list(Note.select(Note.id).where(Note.uuid == note.uuid))
                 if len(pw_ori_note) > 1:
                     raise StorageExecutionException('Duplicate records.')
                 if len(pw_ori_note) == 0:
@@ -243,59 +533,180 @@ class SQLiteStorer(BaseStorer):
                     raise StorageExecutionException('No record got updated.')
 
                 # add new tags and delete removed tags
-                pw_ori_tags = list(
+                query = (
                     Tag
-                    .select()
+                    .select(Tag.name)
                     .join(NoteToTag)
                     .where(NoteToTag.note_id == pw_ori_note.id)
                 )
-                ori_tags = qo.Tags([v.name for v in pw_ori_tags])
+                ori_tags = qo.Tags(
+                    [qo.Tag.from_valid_name(v) for v, in query.tuples()]
+                )
 
-                tags_to_add = list(set(note.tags) - set(ori_tags))
-                tags_to_delete = list(set(ori_tags) - set(note.tags))
+                tags_to_add = note.tags - ori_tags
+                tags_to_delete = ori_tags - note.tags
 
                 if len(tags_to_add) != 0:
-                    tag_names = [str(v) for v in tags_to_add]
-                    pw_tags_to_add = list(Tag.select().where(Tag.name.in_(tag_names)))
-                    for v in tag_names:
-                        pw_tag, _ = Tag.get_or_create(name=str(v))
-                        pw_note2tag = NoteToTag.create(note=pw_ori_note, tag=pw_tag)
+                    tag_ids = self._get_or_create_tag_ids([str(v) for v in tags_to_add])
+                    rows = [{
+                        NoteToTag.note: pw_ori_note.id, NoteToTag.tag: v
+                    } for v in tag_ids.values()]
+                    for chunk in pw.chunked(rows, SQLITE_MAX_VARIABLES // 2):
+                        NoteToTag.insert_many(chunk).execute()
 
                 if len(tags_to_delete) != 0:
                     tag_names = [str(v) for v in tags_to_delete]
-                    pw_tags_to_delete = list(Tag.select().where(Tag.name.in_(tag_names)))
-                    query_delete_tags = NoteToTag.delete().where(
-                        (NoteToTag.note_id == pw_ori_note.id) &
-                        (NoteToTag.tag_id.in_([v.id for v in pw_tags_to_delete]))
-                    ).execute()
+                    for chunk in pw.chunked(tag_names, SQLITE_MAX_VARIABLES - 1):
+                        query_tag_ids = Tag.select(Tag.id).where(Tag.name.in_(chunk))
+                        NoteToTag.delete().where(
+                            (NoteToTag.note_id == pw_ori_note.id) &
+                            (NoteToTag.tag_id.in_(query_tag_ids))
+                        ).execute()
             except Exception as ex:
                 transaction.rollback()
                 raise StorageExecutionException(str(ex)) from ex
 
     def move_note_by_uuid(self, note_uuids, nb_name):
         """ Move notes to specific notebook. But what we actually do here is
-        to update notebook_id of those notes to the id of given notebook."""
+        to update notebook_id of those notes to the id of given notebook.
+
+        `StorageCheckException` is raised (and nothing is moved) if any of the
+        given notes does not exist. Repeated UUIDs are moved only once.
+
+        Returns
+        -------
+        n_updated : int
+            Number of moved notes. It might be more than the number of given
+            UUIDs if a UUID is shared by multiple notes.
+        """
         if not isinstance(note_uuids, list):
             note_uuids = [note_uuids]
 
+        # Given UUIDs keyed by the form stored in database
+        uuids, missing = {}, []
+        for v in note_uuids:
+            try:
+                uuids.setdefault((v if isinstance(v, UUID) else UUID(str(v))).hex, v)
+            except ValueError:
+                missing.append(v)
+
         pw_notebook = list(Notebook.select().where(Notebook.name == nb_name))[0]
 
         with self.db.atomic() as transaction:
             try:
-                pw_notes = list(Note.select().where(Note.uuid.in_(note_uuids)))
-                query = (
-                    NoteToNotebook
-                    .update({NoteToNotebook.notebook_id: pw_notebook.id})
-                    .where(NoteToNotebook.note_id.in_(pw_notes))
-                )
-                n_updated = query.execute()
-                assert n_updated == len(note_uuids)
+                # Notes are looked up in the same statement updating them,
+                # rather than being loaded into memory.
+                n_updated = 0
+                found = set()
+                for chunk in pw.chunked(list(uuids), SQLITE_MAX_VARIABLES - 1):
+                    query_found = Note.select(Note.uuid).where(Note.uuid.in_(chunk))
+                    found.update([v[0] for v in self.db.execute(query_found)])
+
+                    query_note_ids = Note.select(Note.id).where(Note.uuid.in_(chunk))
+                    n_updated += (
+                        NoteToNotebook
+                        .update({NoteToNotebook.notebook_id: pw_notebook.id})
+                        .where(NoteToNotebook.note_id.in_(query_note_ids))
+                        .execute()
+                    )
             except Exception as ex:
                 transaction.rollback()
                 raise StorageExecutionException(str(ex)) from ex
 
+            missing += [v for k, v in uuids.items() if k not in found]
+            if len(missing) != 0:
+                transaction.rollback()
+                msg = '%s note%s not found, it might have been deleted:\n%s' % (
+                    len(missing),
+                    's are' if len(missing) > 1 else ' is',
+                    '\n'.join([str(v) for v in missing]),
+                )
+                raise StorageCheckException(msg)
+
         return n_updated
 
+    def add_tags_to_notes(self, note_uuids, tags):
+        """Tag notes with all of the given tags. Notes and tags are paired in
+        SQL (`INSERT ... SELECT`), and existing pairs are ignored.
+
+        Parameters
+        ----------
+        note_uuids : list of str
+        tags : qnote.objects.Tags
+
+        Returns
+        -------
+        n_added : int
+            Number of (note, tag) pairs added.
+        """
+        tag_names = [str(v) for v in tags]
+        if len(note_uuids) == 0 or len(tag_names) == 0:
+            return 0
+
+        with self.db.atomic() as transaction:
+            try:
+                tag_ids = list(self._get_or_create_tag_ids(tag_names).values())
+
+                n_added = 0
+                chunk_size = max(SQLITE_MAX_VARIABLES - len(tag_ids), 1)
+                for chunk in pw.chunked(note_uuids, chunk_size):
+                    query = (
+                        Note
+                        .select(Note.id, Tag.id)
+                        .join(Tag, join_type=pw.JOIN.CROSS)
+                        .where(Note.uuid.in_(chunk) & Tag.id.in_(tag_ids))
+                    )
+                    n_added += (
+                        NoteToTag
+                        .insert_from(query, fields=[NoteToTag.note, NoteToTag.tag])
+                        .on_conflict_ignore()
+                        .as_rowcount()
+                        .execute()
+                    )
+            except Exception as ex:
+                transaction.rollback()
+                raise StorageExecutionException(str(ex)) from ex
+        return n_added
+
+    def remove_tags_from_notes(self, note_uuids, tags):
+        """Untag notes with the given tags. Tags are kept even if no notes are
+        tagged by them anymore.
+
+        Parameters
+        ----------
+        note_uuids : list of str
+        tags : qnote.objects.Tags
+
+        Returns
+        -------
+        n_removed : int
+            Number of (note, tag) pairs removed.
+        """
+        tag_names = [str(v) for v in tags]
+        if len(note_uuids) == 0 or len(tag_names) == 0:
+            return 0
+
+        with self.db.atomic() as transaction:
+            try:
+                n_removed = 0
+                chunk_size = max(SQLITE_MAX_VARIABLES - len(tag_names), 1)
+                query_tag_ids = Tag.select(Tag.id).where(Tag.name.in_(tag_names))
+                for chunk in pw.chunked(note_uuids, chunk_size):
+                    query_note_ids = Note.select(Note.id).where(Note.uuid.in_(chunk))
+                    n_removed += (
+                        NoteToTag
+                        .delete()
+                        .where(
+                            NoteToTag.note_id.in_(query_note_ids) &
+                            NoteToTag.tag_id.in_(query_tag_ids)
+                        )
+                        .execute()
+                    )
+            except Exception as ex:
+                transaction.rollback()
+                raise StorageExecutionException(str(ex)) from ex
+        return n_removed
+
     def remove_note_by_uuid(self, note_uuids):
         """Remove specific notes to trash can. But what we actually do here is
         to update notebook_id of those notes to the id of trash can."""
@@ -377,32 +788,175 @@ class SQLiteStorer(BaseStorer):
         return notebook
 
     def get_notes_from_notebook(self, nb_name, n_limit=None, order='descending'):
-        order_converter = {
-            'ascending': lambda x: x,
-            'descending': lambda x: -x,
-        }
+        if n_limit == 0:
+            return []
+        page_size = 500 if n_limit is None else min(n_limit, 500)
+        iterator = self.iter_notes_from_notebook(
+            nb_name, order=order, page_size=page_size
+        )
+        return list(islice(iterator, n_limit))
+
+    def iter_notes_from_notebook(self, nb_name, order='descending', after=None,
+        page_size=100):
+        """Iterate notes in a notebook sorted by update time. Notes are fetched
+        page by page (keyset pagination on `(update_time, id)`), so that the
+        whole notebook is never loaded into memory at once.
+
+        Parameters
+        ----------
+        nb_name : str
+        order : str
+            "descending" (most recently updated first) or "ascending".
+        after : str or uuid.UUID, optional
+            UUID of a note in this notebook. If it is given, only those notes
+            listed after it (in given order) will be yielded.
+        page_size : int
+            Number of notes to be fetched in a query.
+
+        Yields
+        ------
+        note : qnote.objects.Note
+        """
+        return self._iter_notebook(
+            nb_name, qo.Note, order=order, after=after, page_size=page_size,
+        )
+
+    def get_note_headers_from_notebook(self, nb_name, n_limit=None,
+        order='descending'):
+        if n_limit == 0:
+            return []
+        page_size = 500 if n_limit is None else min(n_limit, 500)
+        iterator = self.iter_note_headers_from_notebook(
+            nb_name, order=order, page_size=page_size
+        )
+        return list(islice(iterator, n_limit))
 
-        if order.lower() not in order_converter:
-            msg = '`order` should be one of %s' % list(order_converter.keys())
+    def iter_note_headers_from_notebook(self, nb_name, order='descending',
+        after=None, page_size=100, pattern=None):
+        """Same as `iter_notes_from_notebook()`, but only headers of notes
+        are fetched, and content of notes is never read from database.
+
+        Parameters
+        ----------
+        pattern : str, optional
+            If it is given, only notes containing it in title, name of tags
+            or preview of content are yielded. It is case-insensitive for
+            ASCII characters (like `LIKE` of SQLite).
+
+        Yields
+        ------
+        header : qnote.objects.NoteHeader
+        """
+        return self._iter_notebook(
+            nb_name, qo.NoteHeader, order=order, after=after,
+            page_size=page_size, pattern=pattern,
+        )
+
+    def _iter_notebook(self, nb_name, cls_note, order='descending', after=None,
+        page_size=100, pattern=None):
+        if order.lower() not in ('ascending', 'descending'):
+            msg = '`order` should be one of %s' % ['ascending', 'descending']
             raise ValueError(msg)
+        if page_size <= 0:
+            raise ValueError('`page_size` should be a positive integer.')
+        is_descending = order.lower() == 'descending'
 
+        pw_notebook = self._query_get_notebook(nb_name).first()
+        if pw_notebook is None:
+            raise StorageCheckException('Notebook `%s` does not exist' % nb_name)
+
+        cursor = None
+        if after is not None:
+            # Stored values are selected as they are in pages below, rather
+            # than being converted to `datetime` and back.
+            query_after = (
+                Note
+                .select(Note.update_time, Note.id)
+                .join(NoteToNotebook)
+                .where(
+                    (Note.uuid == after) &
+                    (NoteToNotebook.notebook_id == pw_notebook.id)
+                )
+                .limit(1)
+            )
+            cursor = self.db.execute(query_after).fetchone()
+            if cursor is None:
+                msg = 'Failed to find note in notebook `%s`: %s' % (nb_name, after)
+                raise StorageExecutionException(msg)
+
+        # NOTE: For a notebook holding a large part of notes, `+ 0` prevents
+        # SQLite from looking up notes by the index on `notebook_id` and
+        # sorting all of them for each page. Instead, notes are scanned in the
+        # order of index on `update_time` and membership is checked by primary
+        # key, so that every page costs the same. But it costs a scan of
+        # notes in other notebooks for a small notebook, so that its notes
+        # are looked up by index (and sorted) instead.
+        notebook_id = NoteToNotebook.notebook_id
+        if self._is_large_notebook(pw_notebook.id, page_size):
+            notebook_id = notebook_id + 0
+
+        keys = [Note.update_time, Note.id]
         query = (
             Note
-            .select()
+            .select(Note.id, *note_columns(cls_note is qo.NoteHeader))
             .join(NoteToNotebook)
-            .join(Notebook)
-            .where(Notebook.name == nb_name)
-            .order_by(order_converter[order](Note.update_time))
-            .limit(n_limit)
-            .select(Note, pw.fn.group_concat(Tag.name).alias('tags'))
-            .join(NoteToTag, join_type=pw.JOIN.LEFT_OUTER, on=(Note.id == NoteToTag.note_id))
-            .join(Tag, join_type=pw.JOIN.LEFT_OUTER)
-            .group_by(Note.uuid)
-            .namedtuples()
+            .where(notebook_id == pw_notebook.id)
+            .order_by(*[v.desc() if is_descending else v.asc() for v in keys])
+            .limit(page_size)
+        )
+        if pattern is not None:
+            # Notes are filtered while they are scanned in order, so a page
+            # costs as many rows as it takes to find `page_size` matches.
+            query_tagged = (
+                NoteToTag
+                .select(NoteToTag.note_id)
+                .join(Tag)
+                .where(Tag.name.contains(pattern))
+            )
+            content = Note.preview if cls_note is qo.NoteHeader else Note.content
+            query = query.where(
+                Note.title.contains(pattern) | content.contains(pattern) |
+                Note.id.in_(query_tagged)
+            )
+
+        while True:
+            if cursor is None:
+                page_query = query
+            elif is_descending:
+                page_query = query.where(pw.Tuple(*keys) < pw.Tuple(*cursor))
+            else:
+                page_query = query.where(pw.Tuple(*keys) > pw.Tuple(*cursor))
+
+            # Rows are fetched before they are yielded, so that the statement
+            # is not kept open while notes are consumed (e.g. an interactive
+            # list waiting for user to scroll down).
+            rows = self.db.execute(page_query).fetchall()
+            for row in rows:
+                note = cls_note.from_row(*row[1:])
+                cursor = (note.update_time, row[0])
+                yield note
+
+            if len(rows) < page_size:
+                break
+
+    def _is_large_notebook(self, notebook_id, page_size):
+        """Check whether scanning notes in the order of update time costs less
+        than sorting notes of a notebook to fetch a page of it. The former
+        scans about `page_size * n_total / n_notes` rows for a page, and the
+        latter reads all `n_notes` notes of the notebook. So that notes of
+        notebook are counted only up to `sqrt(page_size * n_total)`."""
+        # Number of notes is estimated by the largest id, which is cheaper
+        # than counting all of them.
+        n_total = Note.select(pw.fn.MAX(Note.id)).scalar() or 0
+        threshold = int((page_size * n_total) ** 0.5)
+        n_notes = (
+            NoteToNotebook
+            .select(NoteToNotebook.note_id)
+            .where(NoteToNotebook.notebook_id == notebook_id)
+            .limit(threshold)
+            .count()
         )
-        result = [v for v in query]
-        notes = [qo.Note.from_dict(v._asdict()) for v in query]
-        return notes
+        return n_notes >= threshold
 
     def rename_notebook(self, old_name, new_name):
         with self.db.atomic() as transaction:
@@ -510,7 +1064,7 @@ class SQLiteStorer(BaseStorer):
             .group_by(Tag.id)
         )
         result = list(query.dicts())
-        tags = [qo.Tag(v['name']) for v in result]
+        tags = [qo.Tag.from_valid_name(v['name']) for v in result]
         counts = [v['count'] for v in result]
         return tags, counts
 
@@ -541,3 +1095,148 @@ class SQLiteStorer(BaseStorer):
                 transaction.rollback()
                 raise StorageCheckException(str(ex)) from ex
         return n_deleted
+
+
+def get_migration_plan(config):
+    """
+    Returns
+    -------
+    current_version : int or None
+        Schema version of storage. None if storage has not been created yet.
+    latest_version : int
+    pending : list of `migrations.Migration`
+    """
+    storage_path = get_storage_path(config)
+    if not osp.exists(storage_path):
+        return None, migrations.LATEST_VERSION, []
+
+    db = get_database(storage_path, read_only=True)
+    try:
+        current_version = migrations.get_schema_version(db)
+        pending = migrations.get_pending_migrations(db)
+    finally:
+        db.close()
+    return current_version, migrations.LATEST_VERSION, pending
+
+
+def migrate_storage(config, dry_run=False, callback=None):
+    """Upgrade schema of storage to the latest version.
+
+    Parameters
+    ----------
+    config : qnote.config.AppConfig
+    dry_run : bool
+        If true, migrations are applied to an in-memory copy of storage.
+    callback : callable, optional
+        See also `migrations.migrate()`.
+
+    Returns
+    -------
+    applied : list of (Migration, float)
+        Applied migrations and elapsed time (in seconds) of each of them.
+    """
+    storage_path = get_storage_path(config)
+    if not osp.exists(storage_path):
+        return []
+
+    db = get_database(storage_path, read_only=dry_run)
+    try:
+        if dry_run:
+            return migrations.simulate(db, callback=callback)
+        return migrations.migrate(db, callback=callback)
+    finally:
+        db.close()
+
+
+def note_columns(header_only=False):
+    """Columns to be selected for creating notes by `qo.Note.from_row()` (or
+    `qo.NoteHeader.from_row()` if `header_only` is True), they are listed in
+    the order of arguments of it."""
+    # Tags are concatenated in a correlated subquery instead of joining and
+    # grouping, so that SQLite can walk through notes in the order of index
+    # (e.g. while paginating) and stop as soon as enough rows are found.
+    query_tags = (
+        NoteToTag
+        .select(pw.fn.group_concat(Tag.name))
+        .join(Tag)
+        .where(NoteToTag.note_id == Note.id)
+    )
+    return [
+        Note.uuid, Note.create_time, Note.update_time, Note.title,
+        Note.preview if header_only else Note.content,
+        query_tags.alias('tags'),
+    ]
+
+
+def _select_note_ids(node):
+    """Make a query selecting ids of notes matching given node of tag query.
+    Operators are mapped to compound select operators (UNION, INTERSECT,
+    EXCEPT) of queries on the index of `NoteToTag`."""
+    if isinstance(node, TagTerm):
+        return (
+            NoteToTag
+            .select(NoteToTag.note_id)
+            .join(Tag)
+            .where(Tag.name == node.name)
+        )
+    if isinstance(node, TagOr):
+        operands = [_select_note_ids(v) for v in node.operands]
+        return reduce(operator.or_, [_as_operand(v) for v in operands])
+    if isinstance(node, TagNot):
+        return Note.select(Note.id) - _as_operand(_select_note_ids(node.operand))
+    if isinstance(node, TagAnd):
+        # Negative operands are subtracted from the intersection of positive
+        # ones, so that all notes are involved only if there is no positive
+        # operand, e.g. `NOT #foo AND NOT #bar`.
+        positives = [v for v in node.operands if not isinstance(v, TagNot)]
+        negatives = [v.operand for v in node.operands if isinstance(v, TagNot)]
+        if len(positives) != 0:
+            query = reduce(operator.and_, [
+                _as_operand(_select_note_ids(v)) for v in positives
+            ])
+        else:
+            query = Note.select(Note.id)
+        for v in negatives:
+            query = query - _as_operand(_select_note_ids(v))
+        return query
+    raise TypeError('Invalid node of tag query: %s' % (node,))
+
+
+def _as_operand(query):
+    # SQLite does not support parenthesized compound select, and operators of
+    # compound select are evaluated from left to right. So a compound select
+    # has to be wrapped as a subquery to be an operand of another one.
+    if isinstance(query, pw.CompoundSelectQuery):
+        return pw.Select(from_list=[query.alias('q')], columns=[pw.SQL('*')])
+    return query
+
+
+@lru_cache(maxsize=128)
+def compile_tag_query(node):
+    """Compile tag query into a single SQL statement selecting notes.
+
+    Returns
+    -------
+    sql : str
+    params : tuple
+    """
+    query = (
+        Note
+        .select(*note_columns())
+        .where(Note.id.in_(_select_note_ids(node)))
+        .order_by(Note.update_time.desc(), Note.id.desc())
+    )
+    sql, params = query.sql()
+    return sql, tuple(params)
+
+
+def make_fts_query(text):
+    """Convert a plain text into a full-text query which matches all words
+    in it. Trailing asterisk of a word is kept for prefix query."""
+    phrases = []
+    for word in text.split():
+        is_prefix = word.endswith('*') and len(word) > 1
+        word = word.rstrip('*') if is_prefix else word
+        phrase = '"%s"' % word.replace('"', '""')
+        phrases.append(phrase + '*' if is_prefix else phrase)
+    return ' '.join(phrases)
@@ -1,6 +1,34 @@
-from .misc import *
-from .text import *
+import importlib
 
-__all__ = []
-__all__.extend(misc.__all__)
-__all__.extend(text.__all__)
+
+# Utilities and the modules implementing them. Modules are imported lazily, so
+# that importing one of them (e.g. `OUTPUT_FORMATS` for parsing arguments)
+# doesn't import the others.
+_util_modules = {
+    'query_yes_no': 'misc',
+    'NoteFormatter': 'text',
+    'show_notes': 'text',
+    'get_note_text': 'text',
+    'TagTerm': 'query',
+    'TagAnd': 'query',
+    'TagOr': 'query',
+    'TagNot': 'query',
+    'parse_tag_query': 'query',
+    'OUTPUT_FORMATS': 'output',
+    'write_records': 'output',
+    'RenderCache': 'cache',
+    'open_render_cache': 'cache',
+    'IncrementalSearch': 'search',
+    'FuzzySearch': 'search',
+    'fold_case': 'search',
+    'fuzzy_score': 'search',
+}
+
+__all__ = list(_util_modules.keys())
+
+
+def __getattr__(name):
+    if name in _util_modules:
+        module = importlib.import_module('.%s' % _util_modules[name], __name__)
+        return getattr(module, name)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
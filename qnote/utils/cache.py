@@ -0,0 +1,158 @@
+from collections import OrderedDict
+import os
+import os.path as osp
+import time
+
+
+__all__ = ['RenderCache', 'open_render_cache']
+
+
+class RenderCache(object):
+    """Cache of formatted notes.
+
+    Entries are kept in a bounded LRU in memory, which is shared by all
+    formatters in a process (e.g. repaints of interactive list, commands run
+    by `qnote batch` or `qnote daemon`). Optionally, entries are also saved
+    in a SQLite file, so that they can be reused by later processes. File is
+    opened by `open()` and changes are committed by `close()`, access time
+    of entries read from file is also updated then.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximal number of entries kept in memory.
+    fn : str, optional
+        Path of file to save entries.
+    max_file_entries : int
+        Maximal number of entries kept in file, least recently used entries
+        are removed while the file is closed.
+    """
+
+    def __init__(self, maxsize=4096, fn=None, max_file_entries=100000):
+        self.maxsize = maxsize
+        self.fn = fn
+        self.max_file_entries = max_file_entries
+        self._entries = OrderedDict()
+        self._accessed = set()
+        self._conn = None
+        self._n_opened = 0
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            return value
+        if self._conn is not None:
+            value = self._execute(
+                'SELECT value FROM render_cache WHERE key = ?', (key,)
+            )
+            value = value[0] if value else None
+            if value is not None:
+                self._accessed.add(key)
+                self._put_memory(key, value)
+        return value
+
+    def put(self, key, value):
+        self._put_memory(key, value)
+        if self._conn is not None:
+            self._execute(
+                'INSERT OR REPLACE INTO render_cache (key, value, access_time) '
+                'VALUES (?, ?, ?)', (key, value, time.time())
+            )
+
+    def _put_memory(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _execute(self, sql, params=()):
+        # File cache is an optimization only, it is disabled for the rest of
+        # session if it cannot be used (e.g. locked by another process).
+        import sqlite3
+        try:
+            return self._conn.execute(sql, params).fetchone()
+        except sqlite3.Error:
+            self._close_file(commit=False)
+            return None
+
+    def open(self):
+        """Open file of cache. It can be called multiple times, and file is
+        closed once `close()` is called the same number of times."""
+        self._n_opened += 1
+        if self.fn is None or self._conn is not None or self._n_opened > 1:
+            return self
+
+        import sqlite3
+        try:
+            os.makedirs(osp.dirname(self.fn), exist_ok=True)
+            self._conn = sqlite3.connect(self.fn, timeout=0.1)
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS render_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'access_time REAL NOT NULL)'
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error):
+            self._close_file(commit=False)
+        return self
+
+    def close(self):
+        self._n_opened = max(self._n_opened - 1, 0)
+        if self._n_opened == 0:
+            self._close_file(commit=True)
+
+    def _close_file(self, commit=True):
+        import sqlite3
+
+        conn, self._conn = self._conn, None
+        accessed, self._accessed = self._accessed, set()
+        if conn is None:
+            return
+        try:
+            if commit:
+                access_time = time.time()
+                conn.executemany(
+                    'UPDATE render_cache SET access_time = ? WHERE key = ?',
+                    [(access_time, k) for k in accessed]
+                )
+                conn.execute(
+                    'DELETE FROM render_cache WHERE key IN ('
+                    'SELECT key FROM render_cache ORDER BY access_time DESC, rowid DESC '
+                    'LIMIT -1 OFFSET ?)', (self.max_file_entries,)
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass
+        finally:
+            conn.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Cache shared in process, see also `open_render_cache()`
+_render_cache = RenderCache()
+
+
+def open_render_cache(app_config):
+    """Get the render cache shared in process. It should be used as a context
+    manager, so that the file of cache is opened (if `display.render_cache`
+    is enabled) and closed properly.
+
+    Parameters
+    ----------
+    app_config : qnote.config.AppConfig
+
+    Returns
+    -------
+    cache : RenderCache
+    """
+    cfg = app_config.display
+    fn = cfg.fn_render_cache if cfg.render_cache else None
+    if _render_cache._n_opened == 0:
+        _render_cache.fn = fn
+    return _render_cache
@@ -0,0 +1,92 @@
+import json
+import os
+import sys
+
+
+__all__ = ['OUTPUT_FORMATS', 'write_records']
+
+
+# Formats of machine-readable output
+OUTPUT_FORMATS = ['ndjson', 'json', 'tsv']
+
+_tsv_escapes = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def _fmt_tsv_value(value):
+    if value is None:
+        return ''
+    return str(value).translate(_tsv_escapes)
+
+
+def _iter_ndjson(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _iter_json(records):
+    # Array is written element by element, so that nothing has to be kept
+    # in memory.
+    sep = '[\n'
+    for record in records:
+        yield sep + json.dumps(record, ensure_ascii=False)
+        sep = ',\n'
+    yield '[]\n' if sep == '[\n' else '\n]\n'
+
+
+def _iter_tsv(records):
+    # Backslash, tab and line breaks in values are escaped, so that each
+    # record takes exactly one line.
+    fields = None
+    for record in records:
+        header = ''
+        if fields is None:
+            fields = list(record.keys())
+            header = '\t'.join(fields) + '\n'
+        yield header + '\t'.join([_fmt_tsv_value(record[k]) for k in fields]) + '\n'
+
+
+_writers = {
+    'ndjson': _iter_ndjson,
+    'json': _iter_json,
+    'tsv': _iter_tsv,
+}
+
+
+def write_records(records, fmt, file=None):
+    """Write records as machine-readable text without paging.
+
+    Records are written as soon as they are produced, so that consumers can
+    process the first one before the rest of them are (queried and) created.
+    Writing stops silently if the reader of output is closed (e.g. piped to
+    `head`).
+
+    Parameters
+    ----------
+    records : iterable of dict
+        Records with the same keys. For "tsv", a header is written with keys
+        of the first record, and nothing is written if there is no record.
+    fmt : str
+        One of `OUTPUT_FORMATS`.
+    file : file object, optional
+        Default: `sys.stdout`.
+    """
+    if fmt not in _writers:
+        raise ValueError('Unknown output format: %s' % fmt)
+    file = sys.stdout if file is None else file
+
+    try:
+        for i, chunk in enumerate(_writers[fmt](records)):
+            file.write(chunk)
+            if i == 0:
+                # Make the first record available to reader immediately
+                file.flush()
+        file.flush()
+    except BrokenPipeError:
+        # Redirect remaining output to devnull, so that Python won't complain
+        # about flushing stdout at exit.
+        if file is sys.stdout:
+            fd_devnull = os.open(os.devnull, os.O_WRONLY)
+            try:
+                os.dup2(fd_devnull, sys.stdout.fileno())
+            finally:
+                os.close(fd_devnull)
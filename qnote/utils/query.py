@@ -0,0 +1,136 @@
+from collections import namedtuple
+from functools import lru_cache
+import re
+
+
+__all__ = ['TagTerm', 'TagAnd', 'TagOr', 'TagNot', 'parse_tag_query']
+
+
+# Nodes of syntax tree of tag query. They are immutable and hashable, so
+# they can be used as keys for caching compiled queries.
+TagTerm = namedtuple('TagTerm', ['name'])
+TagAnd = namedtuple('TagAnd', ['operands'])
+TagOr = namedtuple('TagOr', ['operands'])
+TagNot = namedtuple('TagNot', ['operand'])
+
+
+_regex_token = re.compile(r'\s*(?:(?P<tag>#\w+)|(?P<op>[(),])|(?P<word>\w+)|(?P<other>\S))')
+_keywords = ['AND', 'OR', 'NOT']
+
+
+def _tokenize(text):
+    tokens = []
+    for matched in _regex_token.finditer(text):
+        kind = matched.lastgroup
+        value = matched.group(kind)
+        if kind == 'word':
+            if value.upper() not in _keywords:
+                msg = 'Unexpected word "%s", tags should start with "#"' % value
+                raise ValueError(msg)
+            tokens.append(('op', value.upper()))
+        elif kind == 'other':
+            raise ValueError('Unexpected character "%s"' % value)
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class _Parser(object):
+    """Recursive descent parser of tag query.
+
+    Grammar (keywords are case-insensitive, and comma is an alias of AND):
+        query    := or_expr
+        or_expr  := and_expr ("OR" and_expr)*
+        and_expr := not_expr (("AND" | ",") not_expr)*
+        not_expr := "NOT" not_expr | atom
+        atom     := TAG | "(" or_expr ")"
+    """
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def accept(self, *values):
+        kind, value = self.peek()
+        if kind == 'op' and value in values:
+            self.pos += 1
+            return True
+        return False
+
+    def parse(self):
+        if len(self.tokens) == 0:
+            raise ValueError('Tag query should not be empty')
+        node = self.parse_or()
+        if self.pos != len(self.tokens):
+            raise ValueError('Unexpected token "%s"' % self.peek()[1])
+        return node
+
+    def parse_or(self):
+        operands = [self.parse_and()]
+        while self.accept('OR'):
+            operands.append(self.parse_and())
+        return _make_node(TagOr, operands)
+
+    def parse_and(self):
+        operands = [self.parse_not()]
+        while self.accept('AND', ','):
+            operands.append(self.parse_not())
+        return _make_node(TagAnd, operands)
+
+    def parse_not(self):
+        if self.accept('NOT'):
+            operand = self.parse_not()
+            # Double negation is eliminated
+            return operand.operand if isinstance(operand, TagNot) else TagNot(operand)
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, value = self.peek()
+        if kind == 'tag':
+            self.pos += 1
+            return TagTerm(value)
+        if self.accept('('):
+            node = self.parse_or()
+            if not self.accept(')'):
+                raise ValueError('Missing closing parenthesis')
+            return node
+        if kind is None:
+            raise ValueError('Unexpected end of tag query')
+        raise ValueError('Unexpected token "%s"' % value)
+
+
+def _make_node(cls_node, operands):
+    if len(operands) == 1:
+        return operands[0]
+
+    # Flatten nested nodes of the same operator, e.g. `#a AND (#b AND #c)`,
+    # and remove duplicate operands while keeping their order.
+    flattened = []
+    for v in operands:
+        flattened.extend(v.operands if isinstance(v, cls_node) else [v])
+    flattened = list(dict.fromkeys(flattened))
+    return flattened[0] if len(flattened) == 1 else cls_node(tuple(flattened))
+
+
+@lru_cache(maxsize=128)
+def parse_tag_query(text):
+    """Parse a boolean expression of tags, e.g.
+    `#work AND (#urgent OR #review) AND NOT #done`.
+
+    Parameters
+    ----------
+    text : str
+
+    Returns
+    -------
+    node : TagTerm, TagAnd, TagOr or TagNot
+        Root of syntax tree.
+
+    Raises
+    ------
+    ValueError
+        If `text` is not a valid tag query.
+    """
+    return _Parser(_tokenize(text)).parse()
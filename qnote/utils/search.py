@@ -0,0 +1,219 @@
+import heapq
+import string
+
+from .text import get_note_text
+
+
+__all__ = ['IncrementalSearch', 'FuzzySearch', 'fold_case', 'fuzzy_score']
+
+
+# Scores of fuzzy matching, which are the same as the ones of fzf
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_BOUNDARY = 8
+BONUS_CONSECUTIVE = -(SCORE_GAP_START + SCORE_GAP_EXTENSION)
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+
+_ascii_lowercase = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def fold_case(text):
+    """Lowercase ASCII letters in text. Other letters are kept as they are,
+    which is the same as how `LIKE` of SQLite ignores case, so that patterns
+    are matched the same way in memory and in storage."""
+    return text.lower() if text.isascii() else text.translate(_ascii_lowercase)
+
+
+def fuzzy_score(pattern, text):
+    """Score of matching characters of `pattern` in `text` in order (but not
+    necessarily consecutively), like fzf does. Higher score is given to a
+    match with characters closer to each other and at beginning of words.
+
+    Parameters
+    ----------
+    pattern : str
+    text : str
+
+    Returns
+    -------
+    score : int or None
+        None if `text` does not match `pattern`.
+    """
+    # Find the first match by scanning forward, then find a shorter one by
+    # scanning backward from the end of it. Score of a matched character is
+    # added once the position of the character on its left is found.
+    pos = -1
+    for ch in pattern:
+        pos = text.find(ch, pos + 1)
+        if pos < 0:
+            return None
+
+    score = SCORE_MATCH * len(pattern)
+    right = pos
+    bonus = BONUS_BOUNDARY if pos == 0 or not text[pos - 1].isalnum() else 0
+    for ch in pattern[-2::-1]:
+        pos = text.rfind(ch, 0, right)
+        if pos == right - 1:
+            score += max(bonus, BONUS_CONSECUTIVE)
+        else:
+            score += bonus + SCORE_GAP_START + SCORE_GAP_EXTENSION * (right - pos - 2)
+        right = pos
+        bonus = BONUS_BOUNDARY if pos == 0 or not text[pos - 1].isalnum() else 0
+    return score + bonus * BONUS_FIRST_CHAR_MULTIPLIER
+
+
+class IncrementalSearch(object):
+    """Case-insensitive (for ASCII letters, see also `fold_case()`) search of
+    notes for searching as user types.
+
+    Title, tags and content (or preview of content) of notes are lowercased
+    and indexed once, when the first search is done. Results of the previous
+    patterns are kept, so that a pattern extended from them (e.g. "fo" ->
+    "foo") is searched within their results only, and searching a shortened
+    pattern (e.g. backspace is pressed) takes no time.
+
+    Parameters
+    ----------
+    notes : list of `qnote.objects.Note` or `qnote.objects.NoteHeader`
+    """
+
+    # Separator of fields in index, so that a pattern won't match text across
+    # fields.
+    sep = '\0'
+
+    def __init__(self, notes):
+        self.notes = notes
+        self._texts = None
+
+        # Stack of (pattern, indices of matched notes), each pattern in it is
+        # extended from the previous one.
+        self._results = []
+
+    def _build_index(self):
+        # Tags are separated as well, like notes are searched in storage
+        self._texts = [
+            fold_case(self.sep.join([
+                v.title, *[str(tag) for tag in v.tags], get_note_text(v)
+            ]))
+            for v in self.notes
+        ]
+
+    def search(self, pattern):
+        """Search notes containing the given pattern.
+
+        Parameters
+        ----------
+        pattern : str
+
+        Returns
+        -------
+        indices : list of int
+            Indices of matched notes in `notes`.
+        """
+        pattern = fold_case(pattern)
+        if pattern == '':
+            return list(range(len(self.notes)))
+        if self._texts is None:
+            self._build_index()
+
+        # Drop results which cannot be reused
+        while self._results and not pattern.startswith(self._results[-1][0]):
+            self._results.pop()
+
+        if self._results:
+            prev_pattern, candidates = self._results[-1]
+            if prev_pattern == pattern:
+                return candidates
+        else:
+            candidates = range(len(self._texts))
+
+        indices = self._filter(pattern, candidates)
+        self._results.append((pattern, indices))
+        return indices
+
+    def _filter(self, pattern, candidates):
+        texts = self._texts
+        return [i for i in candidates if pattern in texts[i]]
+
+
+class FuzzySearch(IncrementalSearch):
+    """Case-insensitive (for ASCII letters) fuzzy search of notes, results
+    are sorted by score of the best matched field (see also `fuzzy_score()`).
+    Title, tags and the first `n_content_chars` characters of content are
+    searched.
+
+    Like `IncrementalSearch`, an extended pattern is matched against notes
+    matched by the previous pattern only. Scores are kept with the matched
+    notes, and only the best `n_results` notes are picked from them by a
+    bounded heap rather than sorting all of them.
+
+    Parameters
+    ----------
+    notes : list of `qnote.objects.Note` or `qnote.objects.NoteHeader`
+    n_results : int, optional
+        Maximal number of results. All matched notes are returned if it's
+        not given.
+    """
+
+    n_content_chars = 256
+
+    def __init__(self, notes, n_results=None):
+        super(FuzzySearch, self).__init__(notes)
+        self.n_results = n_results
+
+        # Scores of notes matched by the patterns in `_results`
+        self._scores = {}
+
+    def _build_index(self):
+        # Fields are scored separately, so they are not joined
+        self._texts = [
+            (fold_case(v.title), fold_case(str(v.tags)),
+             fold_case(get_note_text(v)[:self.n_content_chars]))
+            for v in self.notes
+        ]
+
+    def _filter(self, pattern, candidates):
+        # A note is matched if any of its fields is scored, so matching and
+        # scoring are done at once.
+        texts = self._texts
+        indices, scores = [], []
+        for i in candidates:
+            best = None
+            for v in texts[i]:
+                score = fuzzy_score(pattern, v)
+                if score is not None and (best is None or score > best):
+                    best = score
+            if best is not None:
+                indices.append(i)
+                scores.append(best)
+
+        patterns = set([v[0] for v in self._results])
+        self._scores = {k: v for k, v in self._scores.items() if k in patterns}
+        self._scores[pattern] = scores
+        return indices
+
+    def search(self, pattern):
+        """Search notes matching the given pattern.
+
+        Parameters
+        ----------
+        pattern : str
+
+        Returns
+        -------
+        indices : list of int
+            Indices of matched notes in `notes`, sorted by score. Notes with
+            the same score are listed in their original order.
+        """
+        indices = super(FuzzySearch, self).search(pattern)
+        pattern = fold_case(pattern)
+        if pattern == '':
+            return indices[:self.n_results]
+
+        ranked = zip(self._scores[pattern], [-v for v in indices])
+        if self.n_results is None:
+            ranked = sorted(ranked, reverse=True)
+        else:
+            ranked = heapq.nlargest(self.n_results, ranked)
+        return [-v for _, v in ranked]
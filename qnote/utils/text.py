@@ -1,15 +1,90 @@
 from datetime import datetime as dt
 import textwrap as tw
 
+from .cache import open_render_cache
 
-__all__ = ['NoteFormatter', 'show_notes']
+
+__all__ = ['NoteFormatter', 'show_notes', 'get_note_text']
+
+
+def get_note_text(note):
+    """Get content of a note, or preview of content if it's a header
+    (`qnote.objects.NoteHeader`)."""
+    preview = getattr(note, 'preview', None)
+    if preview is not None:
+        return preview
+    return note.content.to_format(str)
+
+
+class TruncatingTextWrapper(tw.TextWrapper):
+    """`TextWrapper` processing only the leading part of text which is enough
+    to fill `max_lines` lines, so that the cost of wrapping a huge text is
+    proportional to the number of lines shown. Output is the same as
+    `TextWrapper.wrap()`."""
+
+    # Chunks ending in this number of trailing characters of a prefix are not
+    # used, since splitting them may depend on characters after the prefix.
+    n_chars_margin = 16
+
+    def wrap(self, text):
+        if self.max_lines is None:
+            return super(TruncatingTextWrapper, self).wrap(text)
+
+        # Size of prefix is doubled until it's enough to fill `max_lines`
+        # lines (whitespace dropped at line breaks can be arbitrarily long).
+        size = 2 * self.width * (self.max_lines + 1) + self.n_chars_margin
+        while size < len(text):
+            lines = self._wrap_prefix(text[:size])
+            if lines is not None:
+                return lines
+            size *= 2
+        return super(TruncatingTextWrapper, self).wrap(text)
+
+    def _wrap_prefix(self, prefix):
+        """Wrap a prefix of text. Return None if the prefix is not long enough
+        to determine the result."""
+        chunks = self._split_chunks(prefix)
+        limit = sum(map(len, chunks)) - self.n_chars_margin
+        n_chunks, offset = 0, 0
+        for chunk in chunks:
+            offset += len(chunk)
+            if offset > limit:
+                break
+            n_chunks += 1
+
+        if self.fix_sentence_endings:
+            self._fix_sentence_endings(chunks)
+
+        # `_wrap_chunks()` pops chunks it consumed. Result is the same as the
+        # one of the whole text only if it is truncated and the remaining
+        # chunks still make the last line end with a placeholder.
+        remaining = chunks[:n_chunks]
+        lines = self._wrap_chunks(remaining)
+        if len(remaining) == 0 or (
+            self.drop_whitespace and len(remaining) == 1 and
+            not remaining[0].strip()
+        ):
+            return None
+        return lines
 
 
 class NoteFormatter(object):
-    def __init__(self, app_config, tw_config=None, show_date=False, show_uuid=False):
+    """Formatter of notes.
+
+    If `render_cache` (`qnote.utils.cache.RenderCache`) is given, formatted
+    notes are cached with keys consisting of uuid, update time, title, tags
+    of note and a digest of settings of formatter. So that unchanged notes are
+    not formatted again, and entries are invalidated once notes are updated
+    or display settings are changed.
+    """
+
+    def __init__(self, app_config, tw_config=None, show_date=False, show_uuid=False,
+        render_cache=None):
         self.app_config = app_config
+        self.render_cache = render_cache
         self._prepare_textwrapper(**tw_config)
         self._prepare_subformatter(show_date=show_date, show_uuid=show_uuid)
+        self._prepare_settings_digest(show_date=show_date, show_uuid=show_uuid)
 
     def _prepare_textwrapper(self, **kwargs):
         cfg = self.app_config.display
@@ -18,7 +93,7 @@ class NoteFormatter(object):
             'max_lines', 'placeholder', 'initial_indent', 'subsequent_indent',
         ]
         self.tw_config = {k: getattr(cfg, k) for k in keys}
-        self.text_wrapper = tw.TextWrapper(**self.tw_config)
+        self.text_wrapper = TruncatingTextWrapper(**self.tw_config)
 
     def _prepare_subformatter(self, show_date=False, show_uuid=False):
         fmt_time = '%Y-%m-%d %H:%M:%S'
@@ -30,7 +105,7 @@ class NoteFormatter(object):
         fmt_uuid = lambda x: 'UUID: %s' % x.uuid
         fmt_title = lambda x: 'Title: %s' % text_shortener(x.title)
         fmt_tags = lambda x: 'Tags: %s' % text_shortener(str(x.tags))
-        fmt_content = lambda x: 'Content:\n%s' % text_indenter(x.content.to_format(str))
+        fmt_content = lambda x: 'Content:\n%s' % text_indenter(get_note_text(x))
         fmt_cuime = lambda x: 'Created: %s, Updated: %s' % (
             dt.fromtimestamp(x.create_time).strftime(fmt_time),
             dt.fromtimestamp(x.update_time).strftime(fmt_time)
@@ -44,11 +119,50 @@ class NoteFormatter(object):
         formatters.append(fmt_content)
         self.formatter = formatters
 
-    def __call__(self, note):
+    def _prepare_settings_digest(self, show_date=False, show_uuid=False):
+        import hashlib
+        import json
+        import time
+
+        # Timezone is included since times are formatted in local time
+        settings = json.dumps(
+            [self.tw_config, show_date, show_uuid, time.tzname], sort_keys=True
+        )
+        self.settings_digest = hashlib.sha1(settings.encode()).hexdigest()[:16]
+
+    def get_cache_key(self, note):
+        import zlib
+
+        # Update time is in seconds, so that shown text is also checksummed
+        # in case a note is updated more than once in a second.
+        text = get_note_text(note)
+        checksum = zlib.crc32(
+            ('%s\0%s\0%s' % (note.title, note.tags, text)).encode()
+        )
+        return '%s:%s:%s:%s:%s:%08x' % (
+            self.settings_digest, note.uuid, note.update_time,
+            type(note).__name__, len(text), checksum,
+        )
+
+    def format(self, note):
         return '\n'.join([fmt(note) for fmt in self.formatter])
 
+    def __call__(self, note):
+        if self.render_cache is None:
+            return self.format(note)
+
+        key = self.get_cache_key(note)
+        text = self.render_cache.get(key)
+        if text is None:
+            text = self.format(note)
+            self.render_cache.put(key, text)
+        return text
+
 
 class Pager(object):
+    """Pager showing content, which can be a string or an iterable of strings
+    (chunks of content)."""
+
     def __init__(self, app_config):
         self.app_config = app_config
 
@@ -57,35 +171,60 @@ class Pager(object):
 
 
 class LessPager(Pager):
+    """Pager writing chunks of content to `less` as they are produced, so that
+    the first screen is shown before the rest of content is ready. Once `less`
+    is quitted, remaining chunks are not produced anymore."""
+
     # Reference of redirecting content to `less` (without creating a tempfile)
     # https://chase-seibert.github.io/blog/2012/10/31/python-fork-exec-vim-raw-input.html
+    cmd = ['less', '-F', '-R', '-S', '-X', '-K']
+
+    # Chunks are flushed one by one until this number of bytes are written, so
+    # that the first screen won't wait for the buffer of pipe to be filled.
+    n_bytes_first_screen = 16384
 
     def __call__(self, content):
         from subprocess import Popen, PIPE
         from sys import stdout
 
-        if not isinstance(content, (str, bytes)):
+        if isinstance(content, (str, bytes)):
+            chunks = [content]
+        elif hasattr(content, '__iter__'):
+            chunks = content
+        else:
             raise TypeError('Unknown input type for paging.')
 
+        proc = Popen(self.cmd, stdin=PIPE, stdout=stdout)
         try:
-            cmd = ['less', '-F', '-R', '-S', '-X', '-K']
-            proc = Popen(cmd, stdin=PIPE, stdout=stdout)
-
-            if isinstance(content, str):
-                proc._stdin_write(content.encode())
-            else:
-                proc._stdin_write(content)
-
-            proc.stdin.close()
-            proc.wait()
-        except KeyboardInterrupt:
+            n_written = 0
+            for chunk in chunks:
+                data = chunk.encode() if isinstance(chunk, str) else chunk
+                proc.stdin.write(data)
+                if n_written < self.n_bytes_first_screen:
+                    proc.stdin.flush()
+                n_written += len(data)
+        except (BrokenPipeError, KeyboardInterrupt):
+            # `less` is quitted, so that we can stop producing content
             pass
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            try:
+                proc.wait()
+            except KeyboardInterrupt:
+                proc.wait()
 
 
 class PydocPager(Pager):
     def __call__(self, content):
         import pydoc
 
+        if not isinstance(content, str):
+            content = ''.join(content)
         pydoc.pager(content)
 
 
@@ -101,18 +240,20 @@ def prepare_pager(app_config):
 
 
 def show_notes(notes, app_config, tw_config, show_date=True, show_uuid=True):
+    """Show notes with pager. Notes are formatted lazily while they are being
+    written to pager, so `notes` can be a generator fetching notes from
+    storage on demand."""
     pager = prepare_pager(app_config)
 
-    # Setup formatter
-    formatter = NoteFormatter(
-        app_config,
-        tw_config=tw_config,
-        show_date=show_date,
-        show_uuid=show_uuid
-    )
-
-    # Print notes
-    output = ''
-    for note in notes:
-        output += '\n%s\n' % formatter(note)
-    pager(output)
+    with open_render_cache(app_config) as render_cache:
+        # Setup formatter
+        formatter = NoteFormatter(
+            app_config,
+            tw_config=tw_config,
+            show_date=show_date,
+            show_uuid=show_uuid,
+            render_cache=render_cache,
+        )
+
+        # Print notes
+        pager(('\n%s\n' % formatter(note) for note in notes))
@@ -29,9 +29,15 @@ def setup_package():
         install_requires=get_requirements(),
         classifiers=[
             'Programming Language :: Python :: 3',
+            'Programming Language :: Python :: 3 :: Only',
+            'Programming Language :: Python :: 3.7',
+            'Programming Language :: Python :: 3.8',
+            'Programming Language :: Python :: 3.9',
+            'Programming Language :: Python :: 3.10',
+            'Programming Language :: Python :: 3.11',
             'License :: OSI Approved :: MIT License',
         ],
-        python_requires='>=3.4',
+        python_requires='>=3.7',
         license='MIT',
     )
 
@@ -0,0 +1,75 @@
+import json
+import os
+import os.path as osp
+import subprocess
+import sys
+
+import pytest
+
+
+DIR_REPO = osp.abspath(osp.join(osp.dirname(__file__), '..'))
+
+# Budget of the total self import time (in microseconds) of `qnote` modules.
+# It's generous enough to tolerate slow machines, but it would be exceeded if
+# modules of all subcommands (and their dependencies) are imported eagerly.
+IMPORT_TIME_BUDGET = 60000
+
+SCRIPT = """
+import json, sys
+from qnote.app import Application
+
+sys.argv = ['qnote'] + sys.argv[1:]
+try:
+    Application().run()
+except SystemExit:
+    pass
+with open(%r, 'w') as f:
+    json.dump(sorted(sys.modules), f)
+"""
+
+
+def run_qnote(tmp_path, *args):
+    """Run qnote in a subprocess with `-X importtime`, and return names of
+    imported modules and self import time of each `qnote` module."""
+    fn_modules = str(tmp_path / 'modules.json')
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', SCRIPT % fn_modules, *args],
+        env=env, cwd=str(tmp_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+
+    import_times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        if name.startswith('qnote'):
+            import_times[name] = int(self_time)
+
+    with open(fn_modules, 'r') as f:
+        modules = json.load(f)
+    return modules, import_times
+
+
+class TestStartup:
+    def test_help(self, tmp_path):
+        modules, import_times = run_qnote(tmp_path, '--help')
+        for name in [
+            'peewee', 'qnote.cli.operator', 'qnote.editor', 'qnote.manager',
+            'qnote.storage', 'qnote.utils.text',
+        ]:
+            assert name not in modules
+        assert sum(import_times.values()) < IMPORT_TIME_BUDGET
+
+    @pytest.mark.parametrize('cmd, module', [
+        ('status', 'qnote.commands.status'),
+        ('storage', 'qnote.commands.storage'),
+    ])
+    def test_only_invoked_command_is_imported(self, tmp_path, cmd, module):
+        modules, import_times = run_qnote(tmp_path, cmd)
+        imported = [v for v in modules if v.startswith('qnote.commands.')]
+        assert sorted(imported) == sorted(['qnote.commands.base_command', module])
+        assert sum(import_times.values()) < IMPORT_TIME_BUDGET
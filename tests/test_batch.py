@@ -0,0 +1,139 @@
+import os
+import os.path as osp
+import subprocess
+import sys
+
+import pytest
+
+from qnote.config import AppConfig
+from qnote.manager.batch import BatchManager, parse_commands
+from qnote.objects import Note
+from qnote.storage import get_storer, close_storer
+
+
+DIR_REPO = osp.abspath(osp.join(osp.dirname(__file__), '..'))
+
+
+class TestParseCommands:
+    def test_lines(self):
+        text = '\n'.join([
+            '# comment',
+            'add -t "a title" -c content --tags "#foo, #bar"',
+            '',
+            '  search tags #foo  ',
+        ])
+        assert parse_commands(text) == [
+            ['add', '-t', 'a title', '-c', 'content', '--tags', '#foo, #bar'],
+            ['search', 'tags', '#foo'],
+        ]
+
+    def test_json(self):
+        text = '["search tags \\"#foo AND #bar\\"", ["tag", "list"], []]'
+        assert parse_commands(text) == [
+            ['search', 'tags', '#foo AND #bar'], ['tag', 'list'],
+        ]
+
+    @pytest.mark.parametrize('text', ['[1]', '[["tag", 1]]', '[', 'add -t "foo'])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError):
+            parse_commands(text)
+
+
+class TestBatchManager:
+    @pytest.fixture
+    def config(self, tmp_path):
+        config = AppConfig(storage={'dir_root': str(tmp_path)})
+        yield config
+        close_storer(config)
+
+    def test_failed_command_is_rolled_back(self, config, tmp_path, monkeypatch, capsys):
+        import qnote.app
+
+        def run_command(argv, config):
+            # Note is created before the command fails
+            note = Note.create(argv[1], 'foo')
+            get_storer(config).create_note(note, '[DEFAULT]')
+            return 0 if argv[0] == 'ok' else 1
+
+        monkeypatch.setattr(qnote.app, 'run_command', run_command)
+        fn = tmp_path / 'commands.txt'
+        fn.write_text('ok a\nfail b\nok c\nfail d\nok e\n')
+
+        with pytest.raises(SystemExit):
+            BatchManager(config).run_commands(str(fn), commit_every=2, stop_on_error=True)
+
+        notes = get_storer(config).get_notes_from_notebook('[DEFAULT]')
+        assert [v.title for v in notes] == ['a']
+
+        lines = capsys.readouterr().err.splitlines()
+        assert lines[0].startswith('[ok] 1: ok a')
+        assert lines[1].startswith('[failed, exit code: 1] 2: fail b')
+        assert lines[-1] == '1 of 5 commands succeeded, 1 failed, 3 skipped.'
+
+    def test_failed_command_restores_status(self, config, tmp_path, monkeypatch, capsys):
+        import qnote.app
+        from qnote.status import HEAD, CachedNoteUUIDs
+
+        config.notebook.fn_head = str(tmp_path / 'HEAD')
+        config.fn_cached_note_uuid = str(tmp_path / 'CACHED_NOTE_UUID')
+
+        def run_command(argv, config):
+            HEAD.set(argv[1], config)
+            CachedNoteUUIDs.set([argv[1]], config)
+            return 0 if argv[0] == 'ok' else 1
+
+        monkeypatch.setattr(qnote.app, 'run_command', run_command)
+        fn = tmp_path / 'commands.txt'
+        fn.write_text('ok a\nfail b\n')
+        with pytest.raises(SystemExit):
+            BatchManager(config).run_commands(str(fn))
+        assert HEAD.get(config) == 'a'
+        assert CachedNoteUUIDs.get(config) == ['a']
+
+        # Files not existing before the failed command are removed
+        os.remove(config.notebook.fn_head)
+        os.remove(config.fn_cached_note_uuid)
+        fn.write_text('fail c\n')
+        with pytest.raises(SystemExit):
+            BatchManager(config).run_commands(str(fn))
+        assert not osp.exists(config.notebook.fn_head)
+        assert not osp.exists(config.fn_cached_note_uuid)
+
+    @pytest.mark.parametrize('argv, expected', [
+        (['add', '--from-ndjson', '-'], True),
+        (['add', '--from-ndjson=-'], True),
+        (['add', '--from-nd', '-'], True),
+        (['add', '--from-ndjson', 'notes.ndjson'], False),
+        (['add', '-c', '-'], False),
+        (['search', 'title', '-'], False),
+    ])
+    def test_reads_stdin(self, argv, expected):
+        from qnote.manager.batch import _reads_stdin
+        assert _reads_stdin(argv) == expected
+
+    def test_run_commands(self, tmp_path):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO)
+        text = '\n'.join([
+            'add -t foo -c bar --tags "#foo"',
+            'add -t baz -c qux --tags "#foo, #baz"',
+            'notebook create work',
+            'bogus',
+            'select',
+            'remove',
+            'notebook open missing',
+            'add --from-ndjson -',
+            'search tags "#foo AND #baz"',
+        ])
+        proc = subprocess.run(
+            [sys.executable, '-m', 'qnote', 'batch', '--commit-every', '0'],
+            input=text, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        assert proc.returncode == 1
+        statuses = [v.split(']')[0] for v in proc.stderr.splitlines() if v.startswith('[')]
+        assert statuses == [
+            '[ok', '[ok', '[ok', '[failed, exit code: 2', '[failed, exit code: 2',
+            '[failed, exit code: 2', '[failed, exit code: 1',
+            '[failed, exit code: 2', '[ok',
+        ]
+        assert 'Title: baz' in proc.stdout and 'Title: foo' not in proc.stdout
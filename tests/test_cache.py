@@ -0,0 +1,75 @@
+from qnote.config import AppConfig
+from qnote.objects import Note, Tags
+from qnote.utils import NoteFormatter, RenderCache
+
+
+class TestRenderCache:
+    def test_lru(self):
+        cache = RenderCache(maxsize=2)
+        cache.put('a', '1')
+        cache.put('b', '2')
+        assert cache.get('a') == '1'
+        cache.put('c', '3')     # "b" is the least recently used one
+        assert cache.get('b') is None
+        assert cache.get('a') == '1' and cache.get('c') == '3'
+
+    def test_file(self, tmp_path):
+        fn = str(tmp_path / 'render_cache.db')
+        with RenderCache(fn=fn, max_file_entries=2) as cache:
+            for k in ['a', 'b', 'c']:
+                cache.put(k, k * 2)
+
+        # Entries are loaded from file by another instance
+        with RenderCache(fn=fn) as cache:
+            assert cache.get('c') == 'cc'
+            assert cache.get('a') is None       # removed since file is full
+
+        # Access time of entries read from file is updated while it's closed
+        with RenderCache(fn=fn, max_file_entries=2) as cache:
+            assert cache.get('b') == 'bb'
+            cache.put('d', 'dd')
+        with RenderCache(fn=fn) as cache:
+            assert cache.get('b') == 'bb' and cache.get('d') == 'dd'
+            assert cache.get('c') is None
+
+    def test_nested_open(self, tmp_path):
+        cache = RenderCache(fn=str(tmp_path / 'render_cache.db'))
+        with cache:
+            with cache:
+                cache.put('a', 'b')
+            assert cache._conn is not None
+        assert cache._conn is None
+
+
+class TestFormatterWithCache:
+    def test_same_output(self):
+        config = AppConfig()
+        notes = [Note.create('note %s' % i, 'content ' * 100 * i, Tags(['#foo'])) for i in range(5)]
+        expected = [NoteFormatter(config, tw_config={})(v) for v in notes]
+
+        formatter = NoteFormatter(config, tw_config={}, render_cache=RenderCache())
+        assert [formatter(v) for v in notes] == expected
+        assert [formatter(v) for v in notes] == expected
+
+    def test_invalidation(self):
+        config = AppConfig()
+        cache = RenderCache()
+        note = Note.create('foo', 'bar', Tags(['#foo']))
+        formatter = NoteFormatter(config, tw_config={}, render_cache=cache)
+        assert 'bar' in formatter(note)
+
+        note.update_content('baz')
+        note.update_time += 1
+        assert 'baz' in formatter(note)
+
+        note.tags = Tags(['#bar'])
+        assert '#bar' in formatter(note)
+
+        # Content is updated in the same second
+        note.update_content('qux')
+        assert 'qux' in formatter(note)
+
+        # Changing display settings results in a different key
+        config.display.width = 40
+        other = NoteFormatter(config, tw_config={}, render_cache=cache)
+        assert other.get_cache_key(note) != formatter.get_cache_key(note)
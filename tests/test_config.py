@@ -0,0 +1,43 @@
+import json
+import os
+
+import pytest
+
+from qnote.config import AppConfig
+from qnote.config.app import AppDefaults
+
+
+@pytest.fixture
+def fn_config(tmp_path, monkeypatch):
+    fn = str(tmp_path / 'config.json')
+    monkeypatch.setattr(AppDefaults, 'dir_config', str(tmp_path))
+    monkeypatch.setattr(AppDefaults, 'fn_config', fn)
+    monkeypatch.setattr(AppConfig, '_cache', None)
+    return fn
+
+
+class TestLoadConfig:
+    def test_cached_until_modified(self, fn_config):
+        config = AppConfig.load()
+        assert os.path.exists(fn_config)
+        assert AppConfig.load() is config
+
+        with open(fn_config, 'r') as f:
+            content = json.load(f)
+        content['display']['width'] = 120
+        with open(fn_config, 'w') as f:
+            json.dump(content, f, indent=4)
+
+        reloaded = AppConfig.load()
+        assert reloaded is not config
+        assert reloaded.display.width == 120
+
+    def test_detected_pager_is_saved(self, fn_config, monkeypatch):
+        import shutil
+
+        monkeypatch.setattr(shutil, 'which', lambda x: None)
+        config = AppConfig.load()
+        assert config.display.pager == 'pydoc'
+
+        with open(fn_config, 'r') as f:
+            assert json.load(f)['display']['pager'] == 'pydoc'
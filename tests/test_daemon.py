@@ -0,0 +1,108 @@
+from io import BytesIO
+import os
+import os.path as osp
+import subprocess
+import sys
+
+import pytest
+
+from qnote.daemon import can_serve, read_message, write_message
+
+
+DIR_REPO = osp.abspath(osp.join(osp.dirname(__file__), '..'))
+
+
+class TestProtocol:
+    def test_message_roundtrip(self):
+        f = BytesIO()
+        messages = [{'op': 'run', 'argv': ['search', 'tags', '#標籤']}, {'op': 'stop'}]
+        for v in messages:
+            write_message(f, v)
+        f.seek(0)
+        assert [read_message(f), read_message(f)] == messages
+        with pytest.raises(EOFError):
+            read_message(f)
+
+    def test_truncated_message(self):
+        f = BytesIO()
+        write_message(f, {'op': 'status'})
+        with pytest.raises(EOFError):
+            read_message(BytesIO(f.getvalue()[:-1]))
+
+    @pytest.mark.parametrize('argv, expected', [
+        (['list', '--limit', '5'], True),
+        (['status'], True),
+        (['search', 'tags', '#foo'], True),
+        (['tag', 'list'], True),
+        (['tag', 'add', '#foo'], True),
+        (['tag', 'clear_empty'], False),
+        (['notebook', 'delete', 'foo'], False),
+        (['select'], False),
+        (['select', 'list'], True),
+        (['remove', '--uuid', 'abc'], True),
+        (['remove', '--uuid=abc'], True),
+        (['remove'], False),
+        (['open', 'selected'], True),
+        (['edit', '--uuid', 'abc'], False),
+        (['move', 'foo'], False),
+        (['add', '-t', 'foo'], False),
+        (['daemon', 'stop'], False),
+        ([], False),
+    ])
+    def test_can_serve(self, argv, expected):
+        assert can_serve(argv) == expected
+
+
+class TestDaemon:
+    def run_qnote(self, env, *args):
+        proc = subprocess.run(
+            [sys.executable, '-m', 'qnote', *args], env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        )
+        return proc.returncode, proc.stdout, proc.stderr
+
+    def test_serve_commands(self, tmp_path):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO)
+        env.pop('QNOTE_NO_DAEMON', None)
+        env_no_daemon = dict(env, QNOTE_NO_DAEMON='1')
+
+        for i in range(3):
+            self.run_qnote(env, 'add', '-t', 'note %s' % i, '-c', 'foo', '--tags', '#foo')
+
+        code, stdout, _ = self.run_qnote(env, 'daemon', 'start')
+        assert code == 0 and 'started' in stdout
+        try:
+            for args in [['list'], ['search', 'tags', '#foo'], ['list', '--bogus']]:
+                assert self.run_qnote(env, *args) == self.run_qnote(env_no_daemon, *args)
+
+            _, stdout, _ = self.run_qnote(env, 'daemon', 'status')
+            assert 'Served commands: 3' in stdout
+        finally:
+            code, stdout, _ = self.run_qnote(env, 'daemon', 'stop')
+        assert code == 0 and 'stopped' in stdout
+
+        _, stdout, _ = self.run_qnote(env, 'daemon', 'status')
+        assert 'not running' in stdout
+
+    def test_terminate(self, tmp_path):
+        import re
+        import signal
+        import stat
+        import time
+
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO)
+        env.pop('QNOTE_NO_DAEMON', None)
+        fn_socket = osp.join(str(tmp_path), '.qnote', 'daemon.sock')
+
+        code, stdout, _ = self.run_qnote(env, 'daemon', 'start')
+        assert code == 0
+        pid = int(re.search(r'pid: (\d+)', stdout).group(1))
+        try:
+            assert stat.S_IMODE(os.stat(fn_socket).st_mode) == 0o600
+        finally:
+            os.kill(pid, signal.SIGTERM)
+
+        t_start = time.time()
+        while osp.exists(fn_socket) and time.time() - t_start < 5:
+            time.sleep(0.05)
+        assert not osp.exists(fn_socket)
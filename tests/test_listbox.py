@@ -0,0 +1,187 @@
+from readchar import key
+
+from qnote.vendor.inquirer import (
+    ListBoxQuestion, ListBoxRender, PagedChoices, prompt,
+)
+from inquirer import events
+
+
+class KeyEventGenerator(object):
+    def __init__(self, keys):
+        self.keys = iter(keys)
+
+    def next(self):
+        return events.KeyPressed(next(self.keys))
+
+
+def select(n_choices, keys, message_handler=lambda choice: choice.value,
+    choices_searcher=None, choices=None, multiple=False, **render_config):
+    if choices is None:
+        choices = [(i, 'note %s' % i) for i in range(n_choices)]
+    question = ListBoxQuestion(
+        'selected', message='List', choices=choices, multiple=multiple
+    )
+    render = ListBoxRender(
+        event_generator=KeyEventGenerator(keys),
+        render_config=dict(
+            render_config, message_handler=message_handler,
+            choices_searcher=choices_searcher,
+        ),
+    )
+    return prompt([question], render=render, raise_keyboard_interrupt=True)['selected']
+
+
+class TestListBox:
+    def test_select(self, capsys):
+        formatted = []
+
+        def message_handler(choice):
+            formatted.append(choice.value)
+            return choice.value
+
+        keys = [key.DOWN] * 6 + [key.UP] * 2 + [key.ENTER]
+        assert select(100, keys, message_handler) == 'note 4'
+
+        # Only choices in window are formatted, and each of them only once
+        assert sorted(formatted) == ['note %s' % i for i in range(9)]
+
+    def test_boundaries(self, capsys):
+        assert select(3, [key.UP, key.ENTER]) == 'note 0'
+        assert select(3, [key.DOWN] * 5 + [key.ENTER]) == 'note 2'
+
+    def test_constant_cost(self, capsys, monkeypatch):
+        n_wrapped = []
+        generator = ListBoxQuestion.choices_generator
+
+        def choices_generator(self):
+            n_wrapped.append(1)
+            return generator.fget(self)
+
+        monkeypatch.setattr(ListBoxQuestion, 'choices_generator', property(choices_generator))
+
+        n_formatted = []
+
+        def message_handler(choice):
+            n_formatted.append(1)
+            return choice.value
+
+        keys = [key.DOWN] * 1000 + [key.ENTER]
+        assert select(100000, keys, message_handler) == 'note 1000'
+        assert len(n_wrapped) == 1
+        assert len(n_formatted) == 1000 + 3
+
+    def test_search_as_typing(self, capsys):
+        patterns = []
+
+        def choices_searcher(choices, pattern):
+            patterns.append(pattern)
+            return [v for v in choices if pattern in v.value]
+
+        # Search "note 12", then shorten it to "note 1"
+        keys = ['/', *'note 12', key.BACKSPACE, key.DOWN, key.ENTER]
+        assert select(20, keys, choices_searcher=choices_searcher) == 'note 10'
+        assert patterns == ['n', 'no', 'not', 'note', 'note ', 'note 1', 'note 12', 'note 1']
+
+        # Search mode is quitted by backspace, and all choices are listed again
+        keys = ['/', '9', key.BACKSPACE, key.BACKSPACE, key.DOWN, key.ENTER]
+        assert select(20, keys, choices_searcher=choices_searcher) == 'note 1'
+
+        # Pattern is cleared by CTRL+U
+        keys = ['/', '9', key.CTRL_U, '3', key.ENTER]
+        assert select(20, keys, choices_searcher=choices_searcher) == 'note 3'
+
+    def test_paged_choices(self, capsys):
+        loaded = []
+
+        def generate(n, prefix='note'):
+            for i in range(n):
+                loaded.append(i)
+                yield (i, '%s %s' % (prefix, i))
+
+        # Pages are loaded as cursor is moved near the end of loaded choices
+        keys = [key.DOWN] * 25 + [key.ENTER]
+        choices = PagedChoices(generate(10 ** 6), page_size=10)
+        assert select(None, keys, choices=choices) == 'note 25'
+        assert len(loaded) == 40
+
+        # Cursor stops at the last choice
+        keys = [key.DOWN] * 30 + [key.UP, key.ENTER]
+        assert select(None, keys, choices=PagedChoices(generate(23), page_size=10)) == 'note 21'
+        assert select(None, [key.ENTER], choices=PagedChoices(generate(0))) is None
+
+        # Results of search can be paged as well
+        def choices_searcher(choices, pattern):
+            return PagedChoices(generate(10 ** 6, prefix=pattern), page_size=10)
+
+        del loaded[:]
+        keys = ['/', 'x', key.DOWN, key.DOWN, key.ENTER]
+        choices = PagedChoices(generate(10 ** 6), page_size=10)
+        assert select(None, keys, choices_searcher=choices_searcher, choices=choices) == 'x 2'
+        assert len(loaded) == 20
+
+    def test_messages_keyed_by_choice_key(self, capsys):
+        formatted = []
+
+        def message_handler(choice):
+            formatted.append(choice.value)
+            return choice.value
+
+        # Searched choices are new objects, so that messages are memoized by
+        # `choice_key` instead of `id()` which might be reused.
+        def choices_searcher(choices, pattern):
+            return PagedChoices((i, '%s %s' % (pattern, i)) for i in range(3))
+
+        keys = ['/', 'x', 'y', key.BACKSPACE, key.DOWN, key.ENTER]
+        assert select(
+            3, keys, message_handler, choices_searcher=choices_searcher,
+            choice_key=lambda choice: choice.value,
+        ) == 'x 1'
+        assert formatted == [
+            *['note %s' % i for i in range(3)], *['x %s' % i for i in range(3)],
+            *['xy %s' % i for i in range(3)],
+        ]
+
+
+class TestMultipleChoices:
+    def test_toggle(self, capsys):
+        keys = [key.TAB, key.TAB, key.DOWN, ' ', key.ENTER]
+        assert select(20, keys, multiple=True) == ['note 0', 'note 1', 'note 3']
+
+        # Checked choices are returned in the order they were checked
+        keys = [key.DOWN, key.DOWN, key.SHIFT_TAB, key.SHIFT_TAB, key.ENTER]
+        assert select(20, keys, multiple=True) == ['note 2', 'note 1']
+
+        # Checked choice is unchecked by pressing again
+        keys = [key.TAB, key.TAB, key.UP, key.UP, key.TAB, key.ENTER]
+        assert select(20, keys, multiple=True) == ['note 1']
+
+        # Choice under cursor is returned if nothing is checked
+        assert select(20, [key.DOWN, key.ENTER], multiple=True) == 'note 1'
+
+    def test_check_range(self, capsys):
+        keys = [key.DOWN, key.TAB] + [key.DOWN] * 3 + [key.CTRL_R, key.ENTER]
+        assert select(20, keys, multiple=True) == ['note %s' % i for i in range(1, 6)]
+
+        # Range is checked upwards as well
+        keys = [key.DOWN] * 5 + [key.SHIFT_TAB, key.UP, key.CTRL_R, key.ENTER]
+        assert select(20, keys, multiple=True) == ['note %s' % i for i in [5, 3, 4]]
+
+    def test_check_matched(self, capsys):
+        def choices_searcher(choices, pattern):
+            # Searched choices are new objects, e.g. created by a query
+            return PagedChoices(
+                (v.tag, v.value) for v in choices if pattern in v.value
+            )
+
+        select_multiple = lambda n, keys: select(
+            n, keys, choices_searcher=choices_searcher, multiple=True,
+            choice_key=lambda choice: choice.value,
+        )
+
+        keys = [key.TAB, '/', '1', key.CTRL_A, key.CTRL_U, key.ENTER]
+        expected = ['note 0', 'note 1'] + ['note %s' % i for i in range(10, 20)]
+        assert select_multiple(20, keys) == expected
+
+        # All matched choices are unchecked if they are all checked
+        keys = [key.TAB, '/', '1', key.TAB, key.CTRL_A, key.CTRL_A, key.ENTER]
+        assert select_multiple(20, keys) == ['note 0']
@@ -1,6 +1,9 @@
+import tracemalloc
+from uuid import uuid4
+
 import pytest
 
-from qnote.objects import Tag, Tags
+from qnote.objects import Note, NoteHeader, Tag, Tags
 
 
 class TestTag:
@@ -33,6 +36,24 @@ class TestTag:
         assert Tag('#foo') in tags_set
 
 
+    def test_flyweight(self):
+        assert Tag('#foo') is Tag('#foo')
+        assert Tag.from_valid_name('#foo') is Tag('#foo')
+
+        import copy, pickle
+        tag = Tag('#foo')
+        assert copy.deepcopy(tag) is tag
+        assert pickle.loads(pickle.dumps(tag)) is tag
+
+    def test_release_unused(self):
+        import gc
+        tag = Tag('#unused_tag')
+        assert '#unused_tag' in Tag._instances
+        del tag
+        gc.collect()
+        assert '#unused_tag' not in Tag._instances
+
+
 class TestTags:
     def test_create(self):
         tags = Tags()
@@ -62,3 +83,87 @@ class TestTags:
 
         tags = set([Tag('#foo'), Tag('#bar')])
         assert Tag('#foo') in tags
+
+
+    def test_keep_order(self):
+        tags = Tags(['#c', '#a', '#c'])
+        assert [v.name for v in tags] == ['#c', '#a']
+
+        tags += Tags(['#b', '#a'])
+        assert [v.name for v in tags] == ['#c', '#a', '#b']
+        assert str(tags) == '#c, #a, #b'
+        assert tags[-1] is Tag('#b')
+
+        tags += Tag('#d')
+        assert tags[-1] is Tag('#d')
+        assert (tags - Tags(['#d']))[-1] is Tag('#b')
+
+    def test_add_and_sub(self):
+        tags = Tags(['#a', '#b'])
+        added = tags + Tag('#c')
+        assert [v.name for v in tags] == ['#a', '#b']
+        assert [v.name for v in added] == ['#a', '#b', '#c']
+
+        removed = added - Tags(['#b', '#not_included'])
+        assert [v.name for v in removed] == ['#a', '#c']
+
+    def test_copy_is_independent(self):
+        tags = Tags(['#a'])
+        copied = Tags(tags)
+        copied += Tag('#b')
+        assert len(tags) == 1
+
+
+class TestNote:
+    def test_from_row(self):
+        note = Note.create('foo', 'bar', Tags(['#a', '#b']))
+        row = (
+            note.uuid.hex, note.create_time, note.update_time, note.title,
+            'bar', '#a,#b',
+        )
+        loaded = Note.from_row(*row)
+        assert loaded.to_dict() == note.to_dict()
+        assert loaded.uuid == note.uuid
+
+        loaded = Note.from_row(*row[:-1], None)
+        assert len(loaded.tags) == 0
+
+
+class TestMemoryUsage:
+    # Budget of memory (in bytes) of a loaded note with 2 tags, excluding
+    # its texts which are allocated by database driver.
+    budget_per_note = 512
+    n_notes = 10000
+
+    def make_rows(self):
+        return [(
+            uuid4().hex, 1600000000 + i, 1600000000 + i, 'note %s' % i,
+            'content of note %s' % i, '#foo,#bar',
+        ) for i in range(self.n_notes)]
+
+    def measure(self, func, rows):
+        tracemalloc.start()
+        try:
+            loaded = [func(*v) for v in rows]
+            size, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return size / len(loaded)
+
+    def test_note(self):
+        size = self.measure(Note.from_row, self.make_rows())
+        assert size < self.budget_per_note
+
+    def test_note_header(self):
+        size = self.measure(NoteHeader.from_row, self.make_rows())
+        assert size < self.budget_per_note
+
+    def test_objects_are_slotted(self):
+        note = Note.create('foo', 'bar', Tags(['#foo']))
+        for obj in [note, note.content, note.tags, note.tags[0]]:
+            assert not hasattr(obj, '__dict__')
+
+    def test_tag_names_are_interned(self):
+        tags = [Tags.from_row('#foo,#bar'), Tags(['#foo']), Tags.from_string_content('#foo')]
+        names = [v[0].name for v in tags]
+        assert all([v is names[0] for v in names])
@@ -0,0 +1,155 @@
+from io import StringIO
+import json
+import os
+import os.path as osp
+import subprocess
+import sys
+from uuid import UUID
+
+import pytest
+
+from qnote.utils import write_records
+
+
+DIR_REPO = osp.abspath(osp.join(osp.dirname(__file__), '..'))
+
+RECORDS = [
+    {'uuid': 'a', 'title': 'foo', 'content': 'line 1\nline 2\twith tab', 'tags': '#x'},
+    {'uuid': 'b', 'title': 'bar', 'content': 'back\\slash', 'tags': None},
+]
+
+
+class TestWriteRecords:
+    def write(self, records, fmt):
+        f = StringIO()
+        write_records(iter(records), fmt, file=f)
+        return f.getvalue()
+
+    def test_ndjson(self):
+        lines = self.write(RECORDS, 'ndjson').splitlines()
+        assert [json.loads(v) for v in lines] == RECORDS
+
+    @pytest.mark.parametrize('records', [RECORDS, RECORDS[:1], []])
+    def test_json(self, records):
+        assert json.loads(self.write(records, 'json')) == records
+
+    def test_tsv(self):
+        lines = self.write(RECORDS, 'tsv').splitlines()
+        assert lines == [
+            'uuid\ttitle\tcontent\ttags',
+            'a\tfoo\tline 1\\nline 2\\twith tab\t#x',
+            'b\tbar\tback\\\\slash\t',
+        ]
+        assert self.write([], 'tsv') == ''
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            write_records([], 'xml')
+
+    @pytest.mark.parametrize('fmt', ['ndjson', 'json', 'tsv'])
+    def test_first_record_is_flushed(self, fmt):
+        class File(StringIO):
+            def flush(self):
+                self.flushed = self.getvalue()
+
+        f = File()
+
+        def generate():
+            yield RECORDS[0]
+            # First record should be readable before the next one is created
+            assert RECORDS[0]['uuid'] in f.flushed
+            yield RECORDS[1]
+
+        write_records(generate(), fmt, file=f)
+
+
+class TestFormatOption:
+    def run_qnote(self, env, *args):
+        proc = subprocess.run(
+            [sys.executable, '-m', 'qnote', *args], env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        )
+        assert proc.returncode == 0, proc.stderr
+        return proc.stdout
+
+    def test_list_and_search(self, tmp_path):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO, QNOTE_NO_DAEMON='1')
+        content = 'a long line ' * 50
+        for i in range(3):
+            self.run_qnote(env, 'add', '-t', 'note %s' % i, '-c', content, '--tags', '#t%s' % i)
+
+        rows = [json.loads(v) for v in self.run_qnote(env, 'list', '--format', 'ndjson').splitlines()]
+        assert [v['title'] for v in rows] == ['note 2', 'note 1', 'note 0']
+        # Content is neither wrapped nor shortened
+        assert all([v['content'] == content for v in rows])
+
+        rows = json.loads(self.run_qnote(env, 'search', 'tags', '#t1', '--format', 'json'))
+        assert [v['title'] for v in rows] == ['note 1']
+
+        rows = json.loads(self.run_qnote(env, 'search', 'fuzzy', 'nt1', '--format', 'json'))
+        assert [v['title'] for v in rows] == ['note 1']
+        assert rows[0]['content'] == content
+
+        lines = self.run_qnote(env, 'status', '--format', 'tsv').splitlines()
+        assert lines[0].split('\t')[:2] == ['notebook', 'uuid']
+        assert len(lines) == 4
+
+    def test_selected_notes(self, tmp_path):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO, QNOTE_NO_DAEMON='1')
+        for i in range(3):
+            self.run_qnote(env, 'add', '-t', 'note %s' % i, '-c', 'content %s' % i, '--tags', '#t')
+
+        rows = [json.loads(v) for v in self.run_qnote(env, 'list', '--format', 'ndjson').splitlines()]
+        with open(str(tmp_path / '.qnote' / 'CACHED_NOTE_UUID'), 'w') as f:
+            f.write('\n'.join([v['uuid'] for v in rows[:2]]))
+
+        assert 'note 2' in self.run_qnote(env, 'open', 'selected')
+        assert 'note 1' in self.run_qnote(env, 'open', 'selected')
+
+        out = self.run_qnote(env, 'tag', 'add', '#x, #t')
+        assert out.strip() == '2 tags have been added to 2 selected notes (2 note-tag pairs added).'
+        out = self.run_qnote(env, 'tag', 'remove', '#t')
+        assert out.strip() == '1 tag has been removed from 2 selected notes (2 note-tag pairs removed).'
+        out = self.run_qnote(env, 'tag', 'remove', '#t')
+        assert out.strip() == '1 tag has been removed from 2 selected notes (0 note-tag pairs removed).'
+        rows = [json.loads(v) for v in self.run_qnote(env, 'list', '--format', 'ndjson').splitlines()]
+        assert [v['tags'] for v in rows] == ['#x', '#x', '#t']
+
+
+    @pytest.mark.parametrize('value', ['0', '-1'])
+    @pytest.mark.parametrize('command', [['list'], ['search', 'fuzzy', 'foo']])
+    def test_invalid_limit(self, tmp_path, command, value):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO, QNOTE_NO_DAEMON='1')
+        proc = subprocess.run(
+            [sys.executable, '-m', 'qnote', *command, '--limit', value], env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        )
+        assert proc.returncode == 2
+        assert 'is not a positive integer' in proc.stderr
+
+
+class TestImport:
+    def run_qnote(self, env, *args, input=None):
+        return subprocess.run(
+            [sys.executable, '-m', 'qnote', *args], env=env, input=input,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+        )
+
+    def test_batch_size(self, tmp_path):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO, QNOTE_NO_DAEMON='1')
+        for value in ['0', '-1', 'foo']:
+            proc = self.run_qnote(env, 'add', '--from-ndjson', '-', '--batch-size', value, input='')
+            assert proc.returncode == 2
+            assert 'is not a positive integer' in proc.stderr
+
+    def test_duplicate_uuid(self, tmp_path):
+        env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=DIR_REPO, QNOTE_NO_DAEMON='1')
+        uuids = ['%032x' % i for i in range(1, 4)]
+        lines = [json.dumps({'uuid': v, 'content': 'note %s' % v}) for v in uuids]
+        lines.append(lines[1])
+        proc = self.run_qnote(
+            env, 'add', '--from-ndjson', '-', '--batch-size', '2', input='\n'.join(lines),
+        )
+        assert proc.returncode == 1
+        assert 'line 4, its UUID is duplicate: %s' % UUID(uuids[1]) in proc.stdout
+        assert '2 notes have been imported' in proc.stdout
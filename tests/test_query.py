@@ -0,0 +1,35 @@
+import pytest
+
+from qnote.utils.query import TagTerm, TagAnd, TagOr, TagNot, parse_tag_query
+
+
+class TestParseTagQuery:
+    def test_precedence(self):
+        query = parse_tag_query('#a OR #b AND NOT #c')
+        assert query == TagOr((
+            TagTerm('#a'), TagAnd((TagTerm('#b'), TagNot(TagTerm('#c')))),
+        ))
+
+        query = parse_tag_query('#work and (#urgent or #review) and not #done')
+        assert query == TagAnd((
+            TagTerm('#work'),
+            TagOr((TagTerm('#urgent'), TagTerm('#review'))),
+            TagNot(TagTerm('#done')),
+        ))
+
+    def test_comma_as_and(self):
+        assert parse_tag_query('#a, #b') == parse_tag_query('#a AND #b')
+        assert parse_tag_query('#a') == TagTerm('#a')
+
+    def test_normalization(self):
+        assert parse_tag_query('#a AND (#b AND #a)') == TagAnd((
+            TagTerm('#a'), TagTerm('#b'),
+        ))
+        assert parse_tag_query('NOT NOT #a') == TagTerm('#a')
+
+    @pytest.mark.parametrize('text', [
+        '', '#a AND', '(#a OR #b', '#a #b', 'foo', '#a & #b', '#a)',
+    ])
+    def test_invalid_query(self, text):
+        with pytest.raises(ValueError):
+            parse_tag_query(text)
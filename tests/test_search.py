@@ -0,0 +1,194 @@
+import random
+
+import pytest
+
+from qnote.config import AppConfig
+from qnote.objects import Note, Tags
+from qnote.utils import FuzzySearch, IncrementalSearch, fold_case, fuzzy_score
+
+
+def make_notes(n_notes, seed=0):
+    rng = random.Random(seed)
+    words = ['Foo', 'bar', 'baz', 'QUX', 'food', 'barn']
+    return [
+        Note.create(
+            rng.choice(words), ' '.join(rng.choice(words) for _ in range(5)),
+            Tags(['#%s' % rng.choice(words).lower()]),
+        )
+        for _ in range(n_notes)
+    ]
+
+
+def search_all(notes, pattern):
+    pattern = pattern.lower()
+    return [
+        i for i, v in enumerate(notes)
+        if any([pattern in x.lower() for x in [v.title, *map(str, v.tags), v.content.to_format(str)]])
+    ]
+
+
+def test_fold_case():
+    # Only ASCII letters are folded, like `LIKE` of SQLite
+    assert fold_case('FOO bar') == 'foo bar'
+    assert fold_case('ÄPFEL Äpfel') == 'Äpfel Äpfel'
+
+
+class TestIncrementalSearch:
+    def test_typing(self):
+        notes = make_notes(500)
+        searcher = IncrementalSearch(notes)
+
+        # Type, delete and retype patterns
+        for pattern in ['f', 'fo', 'foo', 'food', 'foo', 'f', '', 'b', 'ba', 'bar', 'barn', 'q', 'qux', '#b']:
+            assert searcher.search(pattern) == search_all(notes, pattern)
+
+    def test_reuse_results(self):
+        notes = make_notes(100)
+        searcher = IncrementalSearch(notes)
+        searcher.search('ba')
+
+        # Extended pattern is searched within results of the previous one
+        searcher._texts = [
+            v if i in searcher._results[-1][1] else None
+            for i, v in enumerate(searcher._texts)
+        ]
+        assert searcher.search('bar') == search_all(notes, 'bar')
+        assert searcher.search('ba') == search_all(notes, 'ba')
+
+    def test_no_field_crossing(self):
+        notes = [Note.create('foo', 'bar', Tags(['#baz']))]
+        searcher = IncrementalSearch(notes)
+        assert searcher.search('FOO') == [0]
+        assert searcher.search('foo#') == []
+
+    def test_non_ascii(self):
+        notes = [Note.create('Äpfel', 'ÖL', Tags(['#grüße']))]
+        searcher = IncrementalSearch(notes)
+        assert searcher.search('äpfel') == []
+        assert searcher.search('ÄPFEL') == [0]
+        assert searcher.search('öl') == []
+        assert searcher.search('#GRÜSSE') == []
+        assert searcher.search('#GRüßE') == [0]
+
+
+def is_subsequence(pattern, text):
+    it = iter(text)
+    return all([ch in it for ch in pattern])
+
+
+class TestFuzzySearch:
+    def test_score(self):
+        assert fuzzy_score('abc', 'xaxbxc') is not None
+        assert fuzzy_score('abc', 'acb') is None
+
+        # Consecutive characters and characters at beginning of words are
+        # preferred.
+        assert fuzzy_score('foo', 'foobar') > fuzzy_score('foo', 'fxoxo')
+        assert fuzzy_score('fb', 'foo bar') > fuzzy_score('fb', 'xfxb')
+        assert fuzzy_score('bar', 'foo bar') > fuzzy_score('bar', 'foobar')
+
+    def test_ranking(self):
+        notes = [
+            Note.create('my eye test', 'garden', Tags(['#health'])),
+            Note.create('unrelated', 'nothing here', Tags(['#misc'])),
+            Note.create('meeting', 'content', Tags(['#work'])),
+            Note.create('Notes of Meeting', 'content', Tags(['#work'])),
+        ]
+        # Notes with the same score are listed in original order
+        assert FuzzySearch(notes).search('meet') == [2, 3, 0]
+        assert FuzzySearch(notes, n_results=1).search('meet') == [2]
+        assert FuzzySearch(notes).search('#wk') == [2, 3]
+
+        # Scores are reused when pattern is shortened (e.g. backspace)
+        searcher = FuzzySearch(notes)
+        for pattern in ['m', 'me', 'mee', 'meet', 'meetx', 'meet']:
+            result = searcher.search(pattern)
+        assert result == [2, 3, 0]
+        assert searcher.search('mx') == []
+
+    def test_matched_notes(self):
+        notes = make_notes(300)
+        searcher = FuzzySearch(notes)
+        fields = [
+            [v.title.lower(), str(v.tags).lower(), v.content.to_format(str).lower()]
+            for v in notes
+        ]
+        for pattern in ['f', 'fd', 'fod', 'b', 'bz', 'q', 'qx', '#b', 'fbr']:
+            expected = [
+                i for i, v in enumerate(fields)
+                if any([is_subsequence(pattern, x) for x in v])
+            ]
+            assert sorted(searcher.search(pattern)) == expected
+            assert len(FuzzySearch(notes, n_results=5).search(pattern)) == min(5, len(expected))
+
+
+class TestSearchAsTyping:
+    def select(self, monkeypatch, tmp_path, notes, patterns, page_size=100):
+        from qnote.cli.operator import NotebookOperator
+        import qnote.vendor.inquirer as inquirer
+
+        queried = []
+
+        def search_notes(pattern):
+            queried.append(pattern)
+            return iter([v for v in notes if pattern in fold_case(v.title)])
+
+        searched = []
+
+        def prompt(questions, render=None, **kwargs):
+            choices_searcher = render.render_config['choices_searcher']
+            for pattern in patterns:
+                choices = choices_searcher(questions[0].choices, pattern)
+                choices.load(page_size)
+                searched.append([v.value.title for v in choices])
+            return {'selected': None}
+
+        monkeypatch.setattr(inquirer, 'prompt', prompt)
+        config = AppConfig(storage={'dir_root': str(tmp_path)})
+        NotebookOperator(config).select_notes(notes, search_notes=search_notes)
+        return queried, searched
+
+    def test_search_within_loaded_notes(self, monkeypatch, tmp_path):
+        notes = [Note.create(v, '', Tags()) for v in ['foo', 'Food', 'bar']]
+        queried, searched = self.select(
+            monkeypatch, tmp_path, notes, ['f', 'fo', 'FOOD', 'foo', 'b'],
+        )
+        # Results of "f" are loaded entirely, so extended patterns are
+        # searched within them rather than queried again
+        assert queried == ['f', 'b']
+        assert searched == [['foo', 'Food'], ['foo', 'Food'], ['Food'], ['foo', 'Food'], ['bar']]
+
+    def test_query_if_not_exhausted(self, monkeypatch, tmp_path):
+        # Only the first page of results is loaded
+        notes = [Note.create('foo %s' % i, '', Tags()) for i in range(150)]
+        queried, searched = self.select(
+            monkeypatch, tmp_path, notes, ['f', 'fo'], page_size=1,
+        )
+        assert queried == ['f', 'fo']
+        assert [len(v) for v in searched] == [100, 100]
+
+
+class TestEmptySelection:
+    @pytest.mark.parametrize('method, args', [
+        ('show_note', (None,)),
+        ('edit_note', (None,)),
+        ('move_note', (None, '[DEFAULT]')),
+        ('remove_note', (None,)),
+    ])
+    def test_no_note_selected(self, monkeypatch, tmp_path, method, args):
+        from qnote.internal.exceptions import SafeExitException
+        from qnote.manager import NoteManager
+        from qnote.storage import close_storer
+        import qnote.vendor.inquirer as inquirer
+
+        # ENTER is pressed on an empty list (or an empty search result)
+        monkeypatch.setattr(inquirer, 'prompt', lambda *args, **kwargs: {'selected': None})
+        config = AppConfig(storage={'dir_root': str(tmp_path)})
+        config.notebook.fn_head = str(tmp_path / 'HEAD')
+        try:
+            with pytest.raises(SafeExitException) as ex:
+                getattr(NoteManager(config), method)(*args)
+        finally:
+            close_storer(config)
+        assert str(ex.value) == 'No note was selected.'
+        assert ex.value.exit_code == 0
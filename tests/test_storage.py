@@ -0,0 +1,601 @@
+import os
+
+import pytest
+
+from qnote.config import AppConfig
+from qnote.objects import Note, Tags
+from qnote.storage import get_storer, close_storer
+
+
+@pytest.fixture
+def config(tmp_path):
+    return AppConfig(storage={'dir_root': str(tmp_path)})
+
+
+@pytest.fixture
+def storer(config):
+    yield get_storer(config)
+    close_storer(config)
+
+
+def add_notes(storer, contents, nb_name='[DEFAULT]'):
+    notes = []
+    for title, content, tags in contents:
+        note = Note.create(title, content, Tags.from_string_content(tags))
+        storer.create_note(note, nb_name)
+        notes.append(note)
+    return notes
+
+
+class TestStorerRegistry:
+    def test_storer_is_cached(self, config, storer):
+        assert get_storer(config) is storer
+
+        close_storer(config)
+        assert storer.db.is_closed()
+        assert get_storer(config) is not storer
+
+    def test_failed_to_load_storer(self):
+        import sys
+        from qnote.storage import _load_storer_module
+        with pytest.raises(ImportError) as ex:
+            _load_storer_module('unknown')
+        assert isinstance(ex.value.__cause__, OSError)
+        assert 'qnote.storage.unknown.storer' not in sys.modules
+
+    def test_schema_version(self, config, storer):
+        from qnote.storage.sqlite.migrations import LATEST_VERSION
+
+        assert storer.db.pragma('user_version') == LATEST_VERSION
+
+        # Schema initialization is skipped for an up-to-date database
+        storer.db.execute_sql('DELETE FROM notebook_tbl')
+        close_storer(config)
+        storer = get_storer(config)
+        assert storer.get_all_notebooks() == []
+
+
+class TestMigration:
+    def create_legacy_storage(self, config):
+        # Schema of storage created before migration was introduced
+        import sqlite3, os
+
+        statements = [
+            'CREATE TABLE "note_tbl" ("id" INTEGER NOT NULL PRIMARY KEY, '
+            '"uuid" TEXT NOT NULL, "title" VARCHAR(256) NOT NULL, '
+            '"create_time" INTEGER NOT NULL, "update_time" INTEGER NOT NULL, '
+            '"content" TEXT NOT NULL)',
+            'CREATE TABLE "notebook_tbl" ("id" INTEGER NOT NULL PRIMARY KEY, '
+            '"name" VARCHAR(255) NOT NULL, "create_time" INTEGER NOT NULL, '
+            '"update_time" INTEGER NOT NULL)',
+            'CREATE UNIQUE INDEX "notebook_tbl_name" ON "notebook_tbl" ("name")',
+            'CREATE TABLE "note_to_notebook_tbl" ("note_id" INTEGER NOT NULL, '
+            '"notebook_id" INTEGER NOT NULL, PRIMARY KEY ("note_id", "notebook_id"))',
+            'CREATE TABLE "tag_tbl" ("id" INTEGER NOT NULL PRIMARY KEY, '
+            '"name" VARCHAR(255) NOT NULL)',
+            'CREATE UNIQUE INDEX "tag_tbl_name" ON "tag_tbl" ("name")',
+            'CREATE TABLE "note_to_tag_tbl" ("note_id" INTEGER NOT NULL, '
+            '"tag_id" INTEGER NOT NULL, PRIMARY KEY ("note_id", "tag_id"))',
+            'INSERT INTO notebook_tbl VALUES (1, "[DEFAULT]", 0, 0)',
+            'INSERT INTO notebook_tbl VALUES (2, "[TRASH]", 0, 0)',
+            'INSERT INTO note_tbl VALUES '
+            '(1, "2b5ffa8e5b6e4c8c9dbd8cd0c3b13bd4", "foo", 0, 0, "legacy note")',
+            'INSERT INTO note_to_notebook_tbl VALUES (1, 1)',
+        ]
+        os.makedirs(config.storage.dir_root, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(config.storage.dir_root, 'storage.db'))
+        for sql in statements:
+            conn.execute(sql)
+        conn.commit()
+        conn.close()
+
+    def get_index_names(self, db):
+        cursor = db.execute_sql('SELECT name FROM sqlite_master WHERE type = "index"')
+        return set(v[0] for v in cursor)
+
+    def test_migrate(self, config):
+        from qnote.storage import get_migration_plan, migrate_storage
+        from qnote.storage.sqlite.migrations import LATEST_VERSION
+
+        self.create_legacy_storage(config)
+        fn_db = os.path.join(config.storage.dir_root, 'storage.db')
+        with open(fn_db, 'rb') as f:
+            content = f.read()
+
+        current, latest, pending = get_migration_plan(config)
+        assert current == 0
+        assert latest == LATEST_VERSION
+        assert [v.version for v in pending] == list(range(1, LATEST_VERSION + 1))
+
+        # Nothing should be changed in dry run, including journal mode
+        applied = migrate_storage(config, dry_run=True)
+        assert len(applied) == len(pending)
+        assert get_migration_plan(config)[0] == 0
+        with open(fn_db, 'rb') as f:
+            assert f.read() == content
+        assert os.listdir(config.storage.dir_root) == ['storage.db']
+
+        applied = migrate_storage(config)
+        assert len(applied) == len(pending)
+        assert get_migration_plan(config)[0] == LATEST_VERSION
+
+        storer = get_storer(config)
+        index_names = self.get_index_names(storer.db)
+        assert {'note_tbl_uuid', 'note_tbl_update_time'} <= index_names
+        assert [v.title for v in storer.get_notes_by_content('legacy')] == ['foo']
+
+        # Column `preview` should be placed before `content`
+        columns = [v.name for v in storer.db.get_columns('note_tbl')]
+        assert columns.index('preview') < columns.index('content')
+        header, = storer.get_note_headers_from_notebook('[DEFAULT]')
+        assert header.preview == 'legacy note'
+
+        # Full-text index is still synced after the table is rebuilt
+        note = storer.get_note(header.uuid)
+        note.update_content('migrated note')
+        storer.update_note(note)
+        assert storer.get_notes_by_content('legacy') == []
+        assert len(storer.get_notes_by_content('migrated')) == 1
+        close_storer(config)
+
+    def test_migrate_with_duplicate_uuids(self, config):
+        import sqlite3, os
+
+        self.create_legacy_storage(config)
+        conn = sqlite3.connect(os.path.join(config.storage.dir_root, 'storage.db'))
+        conn.execute(
+            'INSERT INTO note_tbl VALUES '
+            '(2, "2b5ffa8e5b6e4c8c9dbd8cd0c3b13bd4", "bar", 0, 0, "duplicate")'
+        )
+        conn.execute('INSERT INTO note_to_notebook_tbl VALUES (2, 1)')
+        conn.commit()
+        conn.close()
+
+        # Storage can still be opened, with a non-unique index on UUID
+        with pytest.warns(RuntimeWarning, match='1 UUID is shared') as record:
+            storer = get_storer(config)
+        assert len(record) == 1
+        sql, = storer.db.execute_sql(
+            'SELECT sql FROM sqlite_master WHERE name = "note_tbl_uuid"'
+        ).fetchone()
+        assert 'UNIQUE' not in sql
+        assert len(storer.get_note_headers_from_notebook('[DEFAULT]')) == 2
+        close_storer(config)
+
+    @pytest.mark.parametrize('legacy', [True, False])
+    def test_migrate_without_fts5(self, config, monkeypatch, legacy):
+        from qnote.storage.sqlite.migrations import LATEST_VERSION
+        from qnote.storage.sqlite.models import NoteIndex
+
+        monkeypatch.setattr(NoteIndex, 'fts5_installed', classmethod(lambda cls: False))
+        if legacy:
+            self.create_legacy_storage(config)
+
+        # Following migrations are not blocked by the missing full-text index
+        with pytest.warns(RuntimeWarning, match='FTS5'):
+            storer = get_storer(config)
+        assert storer.db.pragma('user_version') == LATEST_VERSION
+        assert not storer.fts_enabled
+        assert 'note_tbl_update_time' in self.get_index_names(storer.db)
+
+        # Notes are searched by REGEXP instead
+        add_notes(storer, [('bar', 'new note', '')])
+        expected = ['foo', 'bar'] if legacy else ['bar']
+        assert sorted(v.title for v in storer.get_notes_by_content('note')) == sorted(expected)
+        close_storer(config)
+
+        # Storage is not migrated again
+        storer = get_storer(config)
+        assert not storer.fts_enabled
+        close_storer(config)
+
+    def test_migrate_on_open(self, config):
+        self.create_legacy_storage(config)
+        storer = get_storer(config)
+        assert 'note_to_tag_tbl_tag_id_note_id' in self.get_index_names(storer.db)
+        close_storer(config)
+
+
+class TestBulkCreation:
+    def test_create_notes(self, storer):
+        existing, = add_notes(storer, [('existing', 'foo', '#tag_0')])
+
+        def generate_notes(n):
+            for i in range(n):
+                tags = Tags(['#tag_%s' % (i % 3), '#bulk'])
+                yield Note.create('note %s' % i, 'content %s' % i, tags)
+
+        progress = []
+        n_created = storer.create_notes(
+            generate_notes(25), '[DEFAULT]', batch_size=10,
+            callback=progress.append,
+        )
+        assert n_created == 25
+        assert progress == [10, 20, 25]
+
+        notes = storer.get_notes_from_notebook('[DEFAULT]')
+        assert len(notes) == 26
+
+        tags, counts = storer.get_all_tags_with_count()
+        counts = dict(zip([str(v) for v in tags], counts))
+        assert counts == {'#tag_0': 10, '#tag_1': 8, '#tag_2': 8, '#bulk': 25}
+
+        note = storer.get_note(notes[-1].uuid)
+        assert set(str(v) for v in note.tags) == set(str(v) for v in notes[-1].tags)
+
+    def test_create_notes_with_duplicate_uuids(self, storer):
+        from qnote.internal.exceptions import DuplicateUUIDException
+
+        existing, = add_notes(storer, [('existing', 'foo', '')])
+        notes = [Note.create('note %s' % i, '') for i in range(4)]
+
+        # Batches before the failed one are committed
+        with pytest.raises(DuplicateUUIDException) as ex:
+            storer.create_notes(notes + [existing], '[DEFAULT]', batch_size=2)
+        assert ex.value.uuids == [existing.uuid]
+        assert len(storer.get_notes_from_notebook('[DEFAULT]')) == 5
+
+        repeated = Note.create('repeated', '')
+        with pytest.raises(DuplicateUUIDException) as ex:
+            storer.create_notes([repeated, Note.create(), repeated], '[DEFAULT]')
+        assert ex.value.uuids == [repeated.uuid]
+        assert len(storer.get_notes_from_notebook('[DEFAULT]')) == 5
+
+    def test_create_notes_in_missing_notebook(self, storer):
+        from qnote.internal.exceptions import StorageCheckException
+
+        with pytest.raises(StorageCheckException):
+            storer.create_notes([Note.create('foo', 'bar')], 'not_existing')
+
+
+class TestTransaction:
+    def test_nested_rollback(self, storer):
+        with storer.transaction():
+            add_notes(storer, [('kept', 'foo', '#foo')])
+            with storer.transaction() as savepoint:
+                add_notes(storer, [('discarded', 'bar', '#bar')])
+                savepoint.rollback()
+
+        notes = storer.get_notes_from_notebook('[DEFAULT]')
+        assert [v.title for v in notes] == ['kept']
+        tags, _ = storer.get_all_tags_with_count()
+        assert [str(v) for v in tags] == ['#foo']
+
+    def test_rollback_on_exception(self, storer):
+        with pytest.raises(ValueError):
+            with storer.transaction():
+                add_notes(storer, [('discarded', 'bar', '#bar')])
+                raise ValueError()
+        assert storer.get_notes_from_notebook('[DEFAULT]') == []
+
+
+class TestNotesFromNotebook:
+    def create_notes(self, storer, n):
+        notes = []
+        for i in range(n):
+            note = Note.create('note %s' % i, 'content %s' % i)
+            # Notes with the same update time should also be paginated properly
+            note.update_time = 1600000000 + i // 3
+            notes.append(note)
+        storer.create_notes(notes, '[DEFAULT]')
+        return notes
+
+    def test_iter_notes(self, storer):
+        notes = self.create_notes(storer, 20)
+        expected = [v.uuid for v in reversed(notes)]
+
+        iterated = storer.iter_notes_from_notebook('[DEFAULT]', page_size=3)
+        assert [v.uuid for v in iterated] == expected
+
+        iterated = storer.iter_notes_from_notebook(
+            '[DEFAULT]', order='ascending', page_size=4
+        )
+        assert [v.uuid for v in iterated] == expected[::-1]
+
+        iterated = storer.iter_notes_from_notebook(
+            '[DEFAULT]', after=expected[6], page_size=5
+        )
+        assert [v.uuid for v in iterated] == expected[7:]
+
+        notes = storer.get_notes_from_notebook('[DEFAULT]', n_limit=4)
+        assert [v.uuid for v in notes] == expected[:4]
+        assert storer.get_notes_from_notebook('[DEFAULT]', n_limit=0) == []
+        assert storer.get_note_headers_from_notebook('[DEFAULT]', n_limit=0) == []
+
+    def test_iter_notes_of_small_notebook(self, storer):
+        # Notes of a notebook holding a small part of all notes are looked up
+        # by index instead of being scanned in the order of update time
+        notes = self.create_notes(storer, 20)
+        storer.create_notebook_by_name('small')
+        storer.move_note_by_uuid([notes[1].uuid, notes[5].uuid, notes[4].uuid], 'small')
+
+        notebook_id = storer._query_get_notebook('small').first().id
+        assert not storer._is_large_notebook(notebook_id, 2)
+        iterated = storer.iter_note_headers_from_notebook('small', page_size=2)
+        assert [v.uuid for v in iterated] == [notes[i].uuid for i in [5, 4, 1]]
+
+    def test_iter_notes_after_missing_note(self, storer):
+        from qnote.internal.exceptions import StorageExecutionException
+
+        self.create_notes(storer, 2)
+        with pytest.raises(StorageExecutionException):
+            list(storer.iter_notes_from_notebook('[TRASH]', after=Note.create().uuid))
+
+
+class TestLocatingNotebooks:
+    def test_get_locating_notebooks(self, storer):
+        storer.create_notebook_by_name('foo')
+        note_0, = add_notes(storer, [('note 0', '', '')])
+        note_1, = add_notes(storer, [('note 1', '', '')], nb_name='foo')
+        not_existing = Note.create().uuid
+
+        uuids = [str(note_0.uuid), note_1.uuid, str(not_existing), 'invalid']
+        notebook_names, missing = storer.get_locating_notebooks(uuids)
+        assert notebook_names == {uuids[0]: '[DEFAULT]', uuids[1]: 'foo'}
+        assert set(missing) == set(uuids[2:])
+
+
+class TestNoteHeaders:
+    def test_iter_note_headers(self, storer):
+        from qnote.objects import NoteHeader
+
+        long_content = 'x' * (NoteHeader.preview_length + 10)
+        notes = add_notes(storer, [
+            ('foo', 'short content', '#a, #b'),
+            ('bar', long_content, ''),
+        ])
+
+        headers = list(storer.iter_note_headers_from_notebook('[DEFAULT]'))
+        assert all(isinstance(v, NoteHeader) for v in headers)
+        assert set(v.uuid for v in headers) == set(v.uuid for v in notes)
+
+        headers = {v.title: v for v in headers}
+        assert headers['foo'].preview == 'short content'
+        assert set(str(v) for v in headers['foo'].tags) == set(['#a', '#b'])
+        assert headers['bar'].preview == long_content[:NoteHeader.preview_length]
+
+    def test_search_note_headers(self, storer):
+        storer.create_notebook_by_name('other')
+        notes = add_notes(storer, [
+            ('Meeting', 'agenda', '#work'),
+            ('lunch', 'about the meeting', ''),
+            ('misc', 'nothing', '#meetings'),
+            ('100% done', 'under_score', ''),
+            ('other', 'meeting', ''),
+            ('Äpfel', 'apples', ''),
+        ])
+        notes += add_notes(storer, [('meeting', 'other notebook', '')], nb_name='other')
+
+        def search(pattern, page_size=100):
+            return [v.title for v in storer.iter_note_headers_from_notebook(
+                '[DEFAULT]', page_size=page_size, pattern=pattern
+            )]
+
+        # Title, preview and tags are searched case-insensitively
+        expected = ['other', 'misc', 'lunch', 'Meeting']
+        assert search('MEET') == expected
+        assert search('meet', page_size=1) == expected
+        assert search('meetings') == ['misc']
+
+        # Only ASCII letters are folded, like `qnote.utils.fold_case`
+        assert search('ÄPFEL') == ['Äpfel']
+        assert search('äpfel') == []
+
+        # Wildcards of `LIKE` are matched literally
+        assert search('%') == ['100% done']
+        assert search('r_s') == ['100% done']
+        assert search('r_') == ['100% done']
+        assert search('nope') == []
+
+    def test_get_note_headers(self, storer):
+        storer.create_notebook_by_name('other')
+        notes = add_notes(storer, [('foo', 'a', ''), ('bar', 'b', '')])
+        notes += add_notes(storer, [('baz', 'c', '#c')], nb_name='other')
+
+        # Headers of notes in all notebooks, most recently updated first
+        headers = storer.get_note_headers()
+        assert [v.uuid for v in headers] == [v.uuid for v in notes[::-1]]
+        assert [v.preview for v in headers] == ['c', 'b', 'a']
+
+    def test_preview_updated_with_content(self, storer):
+        note, = add_notes(storer, [('foo', 'old content', '')])
+        note.update_content('new content')
+        storer.update_note(note)
+
+        header, = storer.get_note_headers_from_notebook('[DEFAULT]')
+        assert header.preview == 'new content'
+
+    def test_preview_of_bulk_created_notes(self, storer):
+        storer.create_notes([Note.create('foo', 'bar')], '[DEFAULT]')
+        header, = storer.get_note_headers_from_notebook('[DEFAULT]', n_limit=1)
+        assert header.preview == 'bar'
+
+
+class TestBulkUpdate:
+    def test_move_notes(self, storer):
+        notes = [Note.create('note %s' % i, '') for i in range(1200)]
+        storer.create_notes(notes, '[DEFAULT]')
+
+        # More notes than the limit of variables in a statement
+        uuids = [str(v.uuid) for v in notes[:1100]]
+        assert storer.move_note_by_uuid(uuids, '[TRASH]') == 1100
+        assert len(storer.get_note_headers_from_notebook('[DEFAULT]')) == 100
+        assert len(storer.get_note_headers_from_notebook('[TRASH]')) == 1100
+
+    def test_move_repeated_and_missing_notes(self, storer):
+        from qnote.internal.exceptions import StorageCheckException
+
+        note_a, note_b = add_notes(storer, [('a', '', ''), ('b', '', '')])
+        uuids = [str(note_a.uuid), note_a.uuid, str(note_b.uuid)]
+        assert storer.move_note_by_uuid(uuids, '[TRASH]') == 2
+
+        # Nothing is moved if any of notes does not exist
+        missing = Note.create('c', '').uuid
+        with pytest.raises(StorageCheckException, match='1 note is not found'):
+            storer.move_note_by_uuid([note_a.uuid, missing], '[DEFAULT]')
+        with pytest.raises(StorageCheckException, match='1 note is not found'):
+            storer.move_note_by_uuid([note_a.uuid, 'not an uuid'], '[DEFAULT]')
+        assert len(storer.get_note_headers_from_notebook('[TRASH]')) == 2
+
+    def test_add_and_remove_tags(self, storer):
+        notes = add_notes(storer, [
+            ('foo', '', '#a'), ('bar', '', ''), ('baz', '', '#b'),
+        ])
+        uuids = [str(v.uuid) for v in notes[:2]]
+
+        def get_tags():
+            return {
+                v.title: set(str(t) for t in v.tags)
+                for v in storer.get_notes_from_notebook('[DEFAULT]')
+            }
+
+        # Existing pairs of note and tag are ignored
+        assert storer.add_tags_to_notes(uuids, Tags(['#a', '#new'])) == 3
+        assert get_tags() == {
+            'foo': {'#a', '#new'}, 'bar': {'#a', '#new'}, 'baz': {'#b'},
+        }
+        assert storer.get_notes_by_tags(Tags(['#new'])) != []
+
+        assert storer.remove_tags_from_notes(uuids, Tags(['#a', '#b'])) == 2
+        assert get_tags() == {'foo': {'#new'}, 'bar': {'#new'}, 'baz': {'#b'}}
+        assert storer.remove_tags_from_notes([], Tags(['#new'])) == 0
+
+        # Tags are kept even if no notes are tagged by them
+        tags, counts = storer.get_all_tags_with_count()
+        assert dict(zip([str(v) for v in tags], counts))['#a'] == 0
+
+
+class TestSearchByTags:
+    def test_get_notes_by_tags(self, storer):
+        add_notes(storer, [
+            ('foo', 'foo', '#a, #b, #c'),
+            ('bar', 'bar', '#a, #b'),
+            ('buzz', 'buzz', '#a'),
+        ])
+
+        found = storer.get_notes_by_tags(Tags(['#a']))
+        assert set(v.title for v in found) == set(['foo', 'bar', 'buzz'])
+
+        found = storer.get_notes_by_tags(Tags(['#a', '#b']))
+        assert set(v.title for v in found) == set(['foo', 'bar'])
+
+        found = storer.get_notes_by_tags(Tags(['#c', '#a', '#c']))
+        assert [v.title for v in found] == ['foo']
+        # All tags of found notes should be returned
+        assert set(str(v) for v in found[0].tags) == set(['#a', '#b', '#c'])
+
+        assert storer.get_notes_by_tags(Tags(['#a', '#not_existing'])) == []
+
+    def test_sort_tags_by_cardinality(self, storer):
+        notes = [Note.create('note %s' % i, '', Tags(['#popular'])) for i in range(300)]
+        for note in notes[:5]:
+            note.tags = Tags(['#popular', '#rare'])
+        storer.create_notes(notes, '[DEFAULT]')
+
+        popular_id, rare_id = self.get_tag_ids(storer, ['#popular', '#rare'])
+        assert storer._sort_tags_by_cardinality([popular_id, rare_id])[0] == rare_id
+
+        found = storer.get_notes_by_tags(Tags(['#popular', '#rare']))
+        assert set(v.uuid for v in found) == set(v.uuid for v in notes[:5])
+
+    def test_update_tags(self, storer):
+        note, = add_notes(storer, [('foo', '', '#a, #b')])
+        note.tags = Tags(['#b', '#c', '#d'])
+        storer.update_note(note)
+
+        tags = storer.get_note(note.uuid).tags
+        assert set(str(v) for v in tags) == set(['#b', '#c', '#d'])
+        assert storer.get_notes_by_tags(Tags(['#a'])) == []
+
+    def test_get_notes_by_tag_query(self, storer):
+        from qnote.utils.query import parse_tag_query
+
+        all_tags = ['#a', '#b', '#c']
+        contents = []
+        for i in range(2 ** len(all_tags)):
+            tags = [v for j, v in enumerate(all_tags) if i & (1 << j)]
+            contents.append(('note %s' % i, '', ', '.join(tags)))
+        add_notes(storer, contents)
+
+        expected = {
+            '#a OR #b': lambda x: '#a' in x or '#b' in x,
+            'NOT #a': lambda x: '#a' not in x,
+            '#c AND (#a OR #b)': lambda x: '#c' in x and ('#a' in x or '#b' in x),
+            '(#a OR #b) AND #c': lambda x: '#c' in x and ('#a' in x or '#b' in x),
+            '#a AND NOT (#b OR #c)': lambda x: x == '#a',
+            'NOT #a AND NOT #b': lambda x: '#a' not in x and '#b' not in x,
+            '#a, #b': lambda x: '#a' in x and '#b' in x,
+            '#a OR #not_existing': lambda x: '#a' in x,
+        }
+        for text, predicate in expected.items():
+            found = storer.get_notes_by_tag_query(parse_tag_query(text))
+            titles = set(v.title for v in found)
+            assert titles == set(v[0] for v in contents if predicate(v[2])), text
+
+    def get_tag_ids(self, storer, names):
+        from qnote.storage.sqlite.models import Tag
+        return [Tag.get(Tag.name == v).id for v in names]
+
+
+class TestFullTextSearch:
+    def test_search_content(self, storer):
+        add_notes(storer, [
+            ('foo', 'quick brown fox', '#a'),
+            ('bar', 'lazy dog jumps', ''),
+            ('buzz', 'a foxtrot and a dog', '#b'),
+        ])
+
+        found = storer.get_notes_by_content('dog')
+        assert set(v.title for v in found) == set(['bar', 'buzz'])
+
+        found = storer.get_notes_by_content('fox*')
+        assert set(v.title for v in found) == set(['foo', 'buzz'])
+
+        found = storer.get_notes_by_content('"brown fox"')
+        assert [v.title for v in found] == ['foo']
+
+        # Invalid full-text query should be searched as plain words
+        found = storer.get_notes_by_content('lazy-dog')
+        assert [v.title for v in found] == ['bar']
+
+    def test_search_title(self, storer):
+        add_notes(storer, [
+            ('meeting notes', 'foo', ''),
+            ('shopping list', 'meeting', ''),
+        ])
+        found = storer.get_notes_by_title('meeting')
+        assert [v.title for v in found] == ['meeting notes']
+
+    def test_search_by_regex(self, storer):
+        add_notes(storer, [
+            ('foo', 'version 1.2.3', ''),
+            ('bar', 'version 123', ''),
+        ])
+        found = storer.get_notes_by_content(r'\d\.\d', use_regex=True)
+        assert [v.title for v in found] == ['foo']
+
+    def test_index_synced_with_notes(self, storer):
+        note, = add_notes(storer, [('foo', 'old content', '')])
+
+        note.update_content('new content')
+        storer.update_note(note)
+        assert storer.get_notes_by_content('old') == []
+        assert len(storer.get_notes_by_content('new')) == 1
+
+        storer.remove_note_by_uuid([note.uuid])
+        storer.clear_notebook('[TRASH]')
+        assert storer.get_notes_by_content('new') == []
+
+    def test_build_index_for_existing_notes(self, config, storer):
+        from qnote.storage.sqlite.models import NoteIndex, create_note_index
+
+        add_notes(storer, [('note %d' % i, 'content %d' % i, '') for i in range(10)])
+
+        # Simulate a database created before full-text index was introduced
+        storer.db.execute_sql('DROP TABLE %s' % NoteIndex._meta.table_name)
+        for suffix in ['ai', 'ad', 'au']:
+            storer.db.execute_sql('DROP TRIGGER note_tbl_%s' % suffix)
+
+        assert create_note_index(storer.db, batch_size=3)
+        found = storer.get_notes_by_content('content')
+        assert len(found) == 10
@@ -0,0 +1,94 @@
+import random
+import sys
+import textwrap as tw
+
+import pytest
+
+from qnote.config import AppConfig
+from qnote.utils.text import LessPager, TruncatingTextWrapper
+
+
+def generate_chunks(n, produced):
+    for i in range(n):
+        produced.append(i)
+        yield 'chunk %s\n' % i
+
+
+class TestLessPager:
+    def run_pager(self, cmd, content, tmp_path, monkeypatch):
+        pager = LessPager(AppConfig())
+        pager.cmd = cmd
+
+        # Output of pager process is written to a real file
+        fn = tmp_path / 'stdout.txt'
+        with open(str(fn), 'w') as f:
+            monkeypatch.setattr(sys, 'stdout', f)
+            pager(content)
+            monkeypatch.undo()
+        return fn.read_text()
+
+    def test_write_chunks(self, tmp_path, monkeypatch):
+        produced = []
+        output = self.run_pager(
+            ['cat'], generate_chunks(5000, produced), tmp_path, monkeypatch
+        )
+        assert len(produced) == 5000
+        assert output == ''.join(['chunk %s\n' % i for i in range(5000)])
+
+    def test_write_string(self, tmp_path, monkeypatch):
+        assert self.run_pager(['cat'], 'foo\nbar\n', tmp_path, monkeypatch) == 'foo\nbar\n'
+
+    def test_stop_when_pager_quits(self, tmp_path, monkeypatch):
+        # Pager quits after reading a few bytes, like `less` quitted by user
+        produced = []
+        output = self.run_pager(
+            ['head', '-c', '64'], generate_chunks(10 ** 6, produced),
+            tmp_path, monkeypatch
+        )
+        assert output == ''.join(['chunk %s\n' % i for i in range(10)])[:64]
+        assert len(produced) < 10 ** 5
+
+
+def generate_text(rng, n_words):
+    seps = [' ', ' ', ' ', '  ', '\t', '\n', ' ' * 50, '. ', '-', '--', ' -- ']
+    words = []
+    for _ in range(n_words):
+        length = rng.choice([1, 3, 5, 8, 12, 30, 100])
+        words.append(''.join(rng.choice('abcxyz-.') for _ in range(length)))
+        words.append(rng.choice(seps))
+    return ''.join(words)
+
+
+class TestTruncatingTextWrapper:
+    @pytest.mark.parametrize('seed', range(20))
+    def test_same_as_textwrapper(self, seed):
+        rng = random.Random(seed)
+        for _ in range(50):
+            config = dict(
+                width=rng.choice([10, 20, 40, 80]),
+                max_lines=rng.choice([None, 1, 2, 3, 5, 10]),
+                tabsize=rng.choice([4, 8]),
+                replace_whitespace=rng.choice([True, False]),
+                drop_whitespace=rng.choice([True, False]),
+                break_long_words=rng.choice([True, False]),
+                break_on_hyphens=rng.choice([True, False]),
+                fix_sentence_endings=rng.choice([True, False]),
+                placeholder=rng.choice([' [...]', '...']),
+                initial_indent=rng.choice(['', '  ']),
+                subsequent_indent=rng.choice(['', '    ']),
+            )
+            text = generate_text(rng, rng.choice([0, 5, 50, 500]))
+            expected = tw.TextWrapper(**config).wrap(text)
+            assert TruncatingTextWrapper(**config).wrap(text) == expected, config
+
+    def test_huge_text_is_not_fully_processed(self):
+        processed = []
+
+        class Wrapper(TruncatingTextWrapper):
+            def _split_chunks(self, text):
+                processed.append(text)
+                return super(Wrapper, self)._split_chunks(text)
+
+        text = 'word ' * 10 ** 6
+        assert Wrapper(width=40, max_lines=3).wrap(text) == tw.TextWrapper(width=40, max_lines=3).wrap(text)
+        assert sum(map(len, processed)) < 1000